@@ -50,7 +50,7 @@ class ConversationHandler:
             if not messages:
                 return ":warning: I couldn't fetch messages from this thread!"
 
-            summary = self.gemini_service.generate_summary(messages, "thread")
+            summary = self.gemini_service.generate_summary(messages, "thread", request_type='thread')
             if summary:
                 # Store context for follow-up questions about the thread
                 self.state_manager.update_context(user_id, "thread", channel_id, summary, messages, thread_ts=thread_ts)
@@ -175,7 +175,7 @@ class ConversationHandler:
                 }
 
             enriched_messages = self.slack_service.enrich_messages_with_usernames(messages)
-            summary = self.gemini_service.summarize_messages(enriched_messages, channel_name)
+            summary = self.gemini_service.summarize_messages(enriched_messages, channel_name, channel_id=channel_id)
             
             return {
                 'text': summary,
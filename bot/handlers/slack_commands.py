@@ -1,10 +1,14 @@
 from django.http import JsonResponse
+import asyncio
 import time
 import logging
 import threading
 import requests
 from django.conf import settings
 from ..utils.channel_utils import parse_channel_name
+from ..utils.fan_out import fan_out
+from ..utils.progressive_message import ProgressiveMessage
+from ..utils.single_flight import single_flight
 from ..utils.summary_utils import (
     handle_summary_command,
     handle_summary_command_background,
@@ -12,11 +16,11 @@ from ..utils.summary_utils import (
 )
 from ..utils.intent_recognition import IntentRecognizer
 from .conversation_handler import ConversationHandler
-from ..services.slack_service import SlackService
-from ..services.gemini_service import GeminiService
+from ..services.registry import get_slack_service, get_async_slack_service, get_gemini_service
 from ..services.filter_service import FilterService
 from ..services.category_service import CategoryService
 from ..services.block_kit_service import BlockKitService
+from ..services.channel_stats_service import ChannelStatsService
 
 logger = logging.getLogger(__name__)
 
@@ -33,9 +37,9 @@ def slack_commands_handler(request):
         channel_id = request.POST.get('channel_id', '')
         response_url = request.POST.get('response_url', '')
         
-        # Initialize services
-        slack_service = SlackService()
-        gemini_service = GeminiService()
+        # Shared services: clients and model handles are built once per process
+        slack_service = get_slack_service()
+        gemini_service = get_gemini_service()
         filter_service = FilterService()
         category_service = CategoryService()
         block_kit_service = BlockKitService()
@@ -145,6 +149,61 @@ def slack_commands_handler(request):
             threading.Thread(target=background_thread_summary, daemon=True).start()
             return immediate_response
 
+        # /summary stats [#channel] - activity numbers only, no AI
+        if cmd == '/summary' and (txt_lower == 'stats' or txt_lower.startswith('stats ')):
+            stats_channel = parse_channel_name(text[len('stats'):].strip())
+            immediate_response = JsonResponse({
+                'response_type': 'ephemeral',
+                'blocks': block_kit_service.create_loading_message()['blocks']
+            })
+
+            def background_stats_process():
+                try:
+                    if stats_channel:
+                        stats_channel_id = slack_service.find_channel_id(stats_channel)
+                        if not stats_channel_id:
+                            if response_url:
+                                error = block_kit_service.create_error_message(f"Channel #{stats_channel} not found.")
+                                requests.post(response_url, json=error, timeout=5)
+                            return
+                        channels = [{'id': stats_channel_id, 'name': stats_channel}]
+                    else:
+                        channels = slack_service.list_bot_channels()
+                        if not channels:
+                            if response_url:
+                                error = block_kit_service.create_error_message(
+                                    "No channels found or bot is not in any channels."
+                                )
+                                requests.post(response_url, json=error, timeout=5)
+                            return
+
+                    channel_messages = asyncio.run(
+                        get_async_slack_service().fetch_many_channels(channel['id'] for channel in channels)
+                    )
+                    stats = ChannelStatsService(slack_service).compute(
+                        channel_messages, {channel['id']: channel['name'] for channel in channels}
+                    )
+                    scope = f"#{stats_channel}" if stats_channel else "all channels"
+                    if response_url:
+                        requests.post(response_url, json={
+                            'response_type': 'ephemeral',
+                            'blocks': block_kit_service.create_stats_blocks(stats, scope),
+                            'replace_original': True
+                        }, timeout=10)
+
+                except Exception as e:
+                    logger.error(f"Background stats processing error: {str(e)}")
+                    if response_url:
+                        error = block_kit_service.create_error_message(
+                            f"Error computing stats: {str(e)[:100]}..."
+                        )
+                        requests.post(response_url, json=error, timeout=5)
+
+            background_thread = threading.Thread(target=background_stats_process)
+            background_thread.daemon = True
+            background_thread.start()
+            return immediate_response
+
         # /summary all
         if cmd in ['/summary', '/unread'] and txt_lower == 'all':
             immediate_response = JsonResponse({
@@ -174,18 +233,26 @@ def slack_commands_handler(request):
                             requests.post(response_url, json=error_payload, timeout=5)
                         return
 
+                    channel_messages = asyncio.run(
+                        get_async_slack_service().fetch_many_channels(channel['id'] for channel in channels)
+                    )
+                    def summarize_channel(channel):
+                        messages = channel_messages.get(channel['id'], [])
+                        if not messages:
+                            return None
+                        enriched_messages = slack_service.enrich_messages_with_usernames(messages)
+                        summary = gemini_service.generate_summary(enriched_messages, channel['name'], channel_id=channel['id'], request_type='all')
+                        return summary.get('text', '') if summary else None
+
+                    # Channels are summarized in parallel; results come back in channel order
                     summaries = []
-                    for channel in channels:
-                        try:
-                            messages = slack_service.fetch_channel_messages(channel['id'])
-                            if messages:
-                                enriched_messages = slack_service.enrich_messages_with_usernames(messages)
-                                summary = gemini_service.generate_summary(enriched_messages, channel['name'])
-                                if summary:
-                                    summaries.append(f"*#{channel['name']}*\n{summary.get('text', '')}\n")
-                        except Exception as e:
-                            logger.error(f"Error summarizing channel {channel['name']}: {str(e)}")
-                            continue
+                    for result in fan_out(summarize_channel, channels):
+                        channel = result.item
+                        if not result.ok:
+                            logger.error(f"Error summarizing channel {channel['name']}: {str(result.error)}")
+                            summaries.append(f"*#{channel['name']}*\n:x: Error generating summary for this channel.\n")
+                        elif result.value:
+                            summaries.append(f"*#{channel['name']}*\n{result.value}\n")
 
                     if summaries:
                         combined_summary = {
@@ -250,17 +317,17 @@ def slack_commands_handler(request):
                             requests.post(response_url, json=error, timeout=5)
                         return
 
-                    summaries = []
-                    for channel in category['channels']:
-                        try:
-                            messages = slack_service.fetch_channel_messages(channel['id'])
-                            if messages:
-                                enriched_messages = slack_service.enrich_messages_with_usernames(messages)
-                                summary = gemini_service.generate_summary(enriched_messages, channel['name'])
-                                summary_text = summary.get('text', '') if summary else f"📭 No summary generated for #{channel['name']}."
-                            else:
-                                # Fallback summary for no messages
-                                summary_text = (
+                    channel_messages = asyncio.run(
+                        get_async_slack_service().fetch_many_channels(channel['id'] for channel in category['channels'])
+                    )
+                    def summarize_channel(channel):
+                        messages = channel_messages.get(channel['id'], [])
+                        if messages:
+                            enriched_messages = slack_service.enrich_messages_with_usernames(messages)
+                            summary = gemini_service.generate_summary(enriched_messages, channel['name'], channel_id=channel['id'], request_type='all')
+                            return summary.get('text', '') if summary else f"📭 No summary generated for #{channel['name']}."
+                        # Fallback summary for no messages
+                        return (
                                     f"📊 **Summary Report for #{channel['name']}**\n\n"
                                     f"📋 Channel Status:\n"
                                     f"🔹 No messages found in the last 24 hours\n"
@@ -270,14 +337,20 @@ def slack_commands_handler(request):
                                     f"🤖 AI Analysis: Generated on {time.strftime('%Y-%m-%d %H:%M')}\n"
                                     f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
                                 )
-                            summaries.append(f"*#{channel['name']}*\n{summary_text}\n")
-                        except Exception as e:
-                            logger.error(f"Error summarizing channel {channel['name']}: {str(e)}")
+
+                    # Channels are summarized in parallel; results come back in category order
+                    summaries = []
+                    for result in fan_out(summarize_channel, category['channels']):
+                        channel = result.item
+                        if result.ok:
+                            summaries.append(f"*#{channel['name']}*\n{result.value}\n")
+                        else:
+                            logger.error(f"Error summarizing channel {channel['name']}: {str(result.error)}")
                             # Still append a block for this channel with error info
                             summaries.append(
                                 f"*#{channel['name']}*\n"
                                 f":x: Error generating summary for this channel.\n"
-                                f"Error: {str(e)[:100]}\n"
+                                f"Error: {str(result.error)[:100]}\n"
                             )
 
                     if summaries:
@@ -348,29 +421,45 @@ def slack_commands_handler(request):
 
             def background_summary():
                 try:
-                    messages = slack_service.fetch_channel_messages(channel_id)
-                    if messages and filter_id:
-                        messages = filter_service.apply_filter(messages, filter_id)
+                    # Stream pages so filtering and enrichment overlap the archive reads
+                    pages = slack_service.iter_channel_messages(channel_id)
+                    if filter_id:
+                        pages = filter_service.iter_filter(pages, filter_id)
+                    enriched_messages = [msg for page in slack_service.iter_enriched(pages) for msg in page]
                     
-                    if messages:
-                        enriched_messages = slack_service.enrich_messages_with_usernames(messages)
-                        summary = gemini_service.generate_summary(enriched_messages, channel_name)
+                    if enriched_messages:
+                        # Post a placeholder and rewrite it as the summary streams in; when the bot
+                        # cannot post here, fall back to a single reply once the summary is done
+                        progress = ProgressiveMessage(
+                            slack_service, channel_id, f":hourglass_flowing_sand: Summarizing {channel_name}..."
+                        )
+                        streaming = progress.start()
+                        if streaming and response_url:
+                            requests.post(response_url, json={'delete_original': True}, timeout=5)
+
+                        summary = gemini_service.generate_summary(
+                            enriched_messages, channel_name, channel_id=channel_id,
+                            on_progress=progress.update if streaming else None
+                        )
                         if summary:
-                            result = {
-                                'response_type': 'in_channel',
-                                'blocks': [
-                                    {
-                                        "type": "section",
-                                        "text": {
-                                            "type": "mrkdwn",
-                                            "text": summary.get('text', '')
-                                        }
+                            blocks = [
+                                {
+                                    "type": "section",
+                                    "text": {
+                                        "type": "mrkdwn",
+                                        "text": summary.get('text', '')
                                     }
-                                ],
-                                'replace_original': True
-                            }
-                            if response_url:
+                                }
+                            ]
+                            if not (streaming and progress.finish(summary.get('text', ''), blocks)) and response_url:
+                                result = {
+                                    'response_type': 'in_channel',
+                                    'blocks': blocks,
+                                    'replace_original': True
+                                }
                                 requests.post(response_url, json=result, timeout=10)
+                        elif streaming:
+                            progress.finish(":x: Failed to generate summary. Please try again.")
                         else:
                             error = block_kit_service.create_error_message(
                                 "Failed to generate summary. Please try again."
@@ -410,6 +499,7 @@ def slack_commands_handler(request):
                                "• `/summary #channel-name filter:filter-name` - Get filtered summary\n"
                                "• `/summary category category-name` - Get category summary\n"
                                "• `/summary all` - Get summary of all channels\n"
+                               "• `/summary stats [#channel-name]` - Activity stats without AI\n"
                                "• `/category create` - Create a channel category\n"
                                "• `/category list` - List your categories\n"
                                "• `/filter create` - Create a message filter\n"
@@ -510,7 +600,7 @@ def slack_commands_ultra_fast_handler(request):
             def background_thread_summary():
                 from ..utils.summary_utils import parse_summary_command
                 thread_params = parse_summary_command(text)
-                conversation_handler = ConversationHandler(SlackService(), GeminiService())
+                conversation_handler = ConversationHandler(get_slack_service(), get_gemini_service())
                 result = conversation_handler._handle_thread_command(thread_params, user_id)
                 if response_url:
                     requests.post(response_url, json=result, timeout=10)
@@ -526,14 +616,10 @@ def slack_commands_ultra_fast_handler(request):
                     try:
                         logger.info(f"[{request_id}] 🔄 Starting background analysis for all channels")
                         
-                        # Import services here to avoid circular imports
-                        from ..services.slack_service import SlackService
-                        from ..services.gemini_service import GeminiService
                         from ..models import UserSummaryState
                         
-                        # Initialize services
-                        slack_service = SlackService()
-                        gemini_service = GeminiService()
+                        slack_service = get_slack_service()
+                        gemini_service = get_gemini_service()
                         
                         # Get all channels the bot is in
                         channels = slack_service.list_bot_channels()
@@ -548,30 +634,39 @@ def slack_commands_ultra_fast_handler(request):
                                 requests.post(response_url, json=error_payload, timeout=5)
                             return
                         
-                        # Get last summary timestamps for all channels
-                        summaries = []
+                        # Get messages since each channel's last summary, fetched concurrently
+                        last_ts_by_channel = {
+                            channel['id']: UserSummaryState.get_last_summary_ts(user_id, channel['id'])
+                            for channel in channels
+                        }
+                        channel_messages = asyncio.run(
+                            get_async_slack_service().fetch_many_channels(last_ts_by_channel.keys(), oldest_by_channel=last_ts_by_channel)
+                        )
+                        def summarize_channel(channel):
+                            messages = channel_messages.get(channel['id'], [])
+                            if not messages:
+                                return None
+                            enriched_messages = slack_service.enrich_messages_with_usernames(messages)
+                            if not enriched_messages:
+                                return None
+                            summary = gemini_service.generate_summary(enriched_messages, channel['name'], channel_id=channel['id'], request_type='all')
+                            if not summary:
+                                return None
+                            return summary.get('text', ''), max(msg['ts'] for msg in messages)
                         
-                        for channel in channels:
-                            channel_id = channel['id']
-                            channel_name = channel['name']
-                            
-                            try:
-                                # Get messages since last summary
-                                last_ts = UserSummaryState.get_last_summary_ts(user_id, channel_id)
-                                messages = slack_service.fetch_channel_messages(channel_id, oldest_ts=last_ts)
-                                
-                                if messages:
-                                    enriched_messages = slack_service.enrich_messages_with_usernames(messages)
-                                    if enriched_messages:
-                                        summary = gemini_service.generate_summary(enriched_messages, channel_name)
-                                        if summary:
-                                            summaries.append(f"*#{channel_name}*\n{summary.get('text', '')}\n")
-                                            # Update last summary timestamp
-                                            newest_ts = max(msg['ts'] for msg in messages)
-                                            UserSummaryState.update_last_summary_ts(user_id, channel_id, newest_ts)
-                            except Exception as e:
-                                logger.error(f"Error summarizing channel {channel_name}: {str(e)}")
-                                continue
+                        # Channels are summarized in parallel; results come back in channel order
+                        summaries = []
+                        for result in fan_out(summarize_channel, channels):
+                            channel_name = result.item['name']
+                            if not result.ok:
+                                logger.error(f"Error summarizing channel {channel_name}: {str(result.error)}")
+                                summaries.append(f"*#{channel_name}*\n❌ Error generating summary for this channel.\n")
+                            elif result.value:
+                                # Only move the watermark for summaries the user actually receives; a job that
+                                # overran its deadline may still finish in the background
+                                text, newest_ts = result.value
+                                UserSummaryState.update_last_summary_ts(user_id, result.item['id'], newest_ts)
+                                summaries.append(f"*#{channel_name}*\n{text}\n")
                         
                         if summaries:
                             combined_summary = "📊 *Summary of All Channels*\n\n" + "\n---\n".join(summaries)
@@ -692,30 +787,36 @@ def slack_commands_ultra_fast_handler(request):
                 logger.info(f"[{request_id}] 📊 Processing regular summary request")
                 channel_name = parse_channel_name(text) or 'specified channel'
                 
+                def compute_summary():
+                    summary_response = handle_summary_command_background(text, user_name, f"{request_id}-bg")
+                    if hasattr(summary_response, 'content'):
+                        import json
+                        summary_data = json.loads(summary_response.content.decode('utf-8'))
+                        return summary_data.get('text', 'Summary generation completed.')
+                    return None
+                
                 def background_process():
                     try:
                         logger.info(f"[{request_id}] 🔄 Starting background AI summary for #{channel_name}")
-                        summary_response = handle_summary_command_background(text, user_name, f"{request_id}-bg")
+                        # Identical concurrent requests share one fetch and Gemini call;
+                        # every caller still posts the result to its own response_url
+                        summary_key = f"channel_summary:{(parse_channel_name(text) or text).lower()}"
+                        summary_text = single_flight.do(summary_key, compute_summary)
                         
-                        if hasattr(summary_response, 'content'):
-                            import json
-                            summary_data = json.loads(summary_response.content.decode('utf-8'))
-                            summary_text = summary_data.get('text', 'Summary generation completed.')
-                            
-                            if response_url:
-                                followup_payload = {
-                                    'response_type': 'in_channel',
-                                    'text': summary_text,
-                                    'replace_original': True
-                                }
-                                try:
-                                    followup_response = requests.post(response_url, json=followup_payload, timeout=10)
-                                    if followup_response.status_code == 200:
-                                        logger.info(f"[{request_id}] ✅ AI summary posted successfully")
-                                    else:
-                                        logger.error(f"[{request_id}] ❌ Failed to post summary: {followup_response.status_code}")
-                                except Exception as e:
-                                    logger.error(f"[{request_id}] ❌ Error posting summary: {str(e)}")
+                        if summary_text and response_url:
+                            followup_payload = {
+                                'response_type': 'in_channel',
+                                'text': summary_text,
+                                'replace_original': True
+                            }
+                            try:
+                                followup_response = requests.post(response_url, json=followup_payload, timeout=10)
+                                if followup_response.status_code == 200:
+                                    logger.info(f"[{request_id}] ✅ AI summary posted successfully")
+                                else:
+                                    logger.error(f"[{request_id}] ❌ Failed to post summary: {followup_response.status_code}")
+                            except Exception as e:
+                                logger.error(f"[{request_id}] ❌ Error posting summary: {str(e)}")
                         
                     except Exception as e:
                         logger.error(f"[{request_id}] ❌ Background processing error: {str(e)}")
@@ -2,14 +2,13 @@ import json
 import logging
 from django.http import HttpResponse
 from .conversation_handler import ConversationHandler
-from ..services.slack_service import SlackService
-from ..services.gemini_service import GeminiService
+from ..services.registry import get_slack_service, get_gemini_service
 
 logger = logging.getLogger(__name__)
 
 # Initialize services
-slack_service = SlackService()
-gemini_service = GeminiService()
+slack_service = get_slack_service()
+gemini_service = get_gemini_service()
 conversation_handler = ConversationHandler(slack_service, gemini_service)
 
 def slack_events_handler(request):
@@ -29,6 +28,23 @@ def slack_events_handler(request):
         event_type = event.get('type')
         logger.info(f"Processing event type: {event_type}")
 
+        # Keep the user directory current without re-listing the workspace
+        if event_type in ('user_change', 'team_join'):
+            slack_service.users.handle_event(event)
+            return HttpResponse()
+
+        # Keep the channel directory current on rename, archive, join and leave
+        if event_type in slack_service.channels.EVENT_TYPES:
+            slack_service.channels.handle_event(event)
+            return HttpResponse()
+
+        # Archive every message event (including edits, deletes and thread replies)
+        if event_type == 'message':
+            try:
+                slack_service.archive.ingest_event(event)
+            except Exception as e:
+                logger.error(f"Error archiving message event: {str(e)}", exc_info=True)
+
         # Only process message events that aren't from the bot itself
         if event_type == 'message' and not event.get('bot_id'):
             try:
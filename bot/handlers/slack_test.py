@@ -22,14 +22,14 @@ def slack_test_handler(request):
             else:
                 env_status[var] = "✅ Set"
         try:
-            from ..services.slack_service import SlackService
-            slack_service = SlackService()
+            from ..services.registry import get_slack_service
+            slack_service = get_slack_service()
             slack_status = "✅ Service initialized"
         except Exception as e:
             slack_status = f"❌ Error: {str(e)}"
         try:
-            from ..services.gemini_service import GeminiService
-            gemini_service = GeminiService()
+            from ..services.registry import get_gemini_service
+            gemini_service = get_gemini_service()
             gemini_status = "✅ Service initialized"
         except Exception as e:
             gemini_status = f"❌ Error: {str(e)}"
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from bot.services.registry import get_slack_service
+
+
+class Command(BaseCommand):
+    help = "Sync the workspace user and channel directories from Slack (run at deploy time or from cron)"
+
+    def handle(self, *args, **options):
+        slack_service = get_slack_service()
+        slack_service.users.sync()
+        slack_service.channels.sync()
+        self.stdout.write(self.style.SUCCESS("User and channel directories synced"))
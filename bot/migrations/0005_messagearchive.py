@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0004_categorychannel_channelcategory_filtercondition_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_id', models.CharField(max_length=50, unique=True)),
+                ('oldest_ts', models.CharField(max_length=50)),
+                ('latest_ts', models.CharField(max_length=50)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_id', models.CharField(max_length=50)),
+                ('ts', models.CharField(max_length=50)),
+                ('thread_ts', models.CharField(blank=True, default='', max_length=50)),
+                ('user_id', models.CharField(blank=True, default='', max_length=50)),
+                ('subtype', models.CharField(blank=True, default='', max_length=50)),
+                ('text', models.TextField(blank=True, default='')),
+                ('payload', models.JSONField(default=dict)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('channel_id', 'ts')},
+            },
+        ),
+    ]
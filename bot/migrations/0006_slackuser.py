@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0005_messagearchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlackUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.CharField(max_length=50, unique=True)),
+                ('name', models.CharField(blank=True, default='', max_length=100)),
+                ('real_name', models.CharField(blank=True, default='', max_length=255)),
+                ('display_name', models.CharField(blank=True, default='', max_length=255)),
+                ('is_bot', models.BooleanField(default=False)),
+                ('deleted', models.BooleanField(default=False)),
+                ('profile_updated', models.BigIntegerField(default=0)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
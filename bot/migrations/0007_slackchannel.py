@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0006_slackuser'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlackChannel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_id', models.CharField(max_length=50, unique=True)),
+                ('name', models.CharField(db_index=True, max_length=100)),
+                ('is_member', models.BooleanField(default=False)),
+                ('is_private', models.BooleanField(default=False)),
+                ('is_archived', models.BooleanField(default=False)),
+                ('num_members', models.IntegerField(default=0)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0007_slackchannel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channelsyncstate',
+            name='events_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
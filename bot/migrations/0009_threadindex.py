@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:23
+
+from django.db import migrations, models
+
+
+def index_archived_parents(apps, schema_editor):
+    """Seed the index from thread parents already in the archive"""
+    ArchivedMessage = apps.get_model('bot', 'ArchivedMessage')
+    ThreadIndex = apps.get_model('bot', 'ThreadIndex')
+    rows = [
+        ThreadIndex(
+            channel_id=row.channel_id,
+            thread_ts=row.ts,
+            parent_user=row.user_id,
+            parent_text=row.text,
+            reply_count=row.payload.get('reply_count', 0),
+            latest_reply_ts=row.payload.get('latest_reply', ''),
+            participants=row.payload.get('reply_users', []),
+        )
+        for row in ArchivedMessage.objects.filter(is_deleted=False).exclude(thread_ts='').iterator()
+        if row.thread_ts == row.ts and 'reply_count' in row.payload
+    ]
+    ThreadIndex.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0008_channelsyncstate_events_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThreadIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_id', models.CharField(max_length=50)),
+                ('thread_ts', models.CharField(max_length=50)),
+                ('parent_user', models.CharField(blank=True, default='', max_length=50)),
+                ('parent_text', models.TextField(blank=True, default='')),
+                ('reply_count', models.IntegerField(default=0)),
+                ('latest_reply_ts', models.CharField(blank=True, default='', max_length=50)),
+                ('participants', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('channel_id', 'thread_ts')},
+            },
+        ),
+        migrations.RunPython(index_archived_parents, migrations.RunPython.noop),
+    ]
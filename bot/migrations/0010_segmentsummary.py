@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0009_threadindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SegmentSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_id', models.CharField(max_length=50)),
+                ('bucket_start', models.BigIntegerField()),
+                ('message_count', models.IntegerField(default=0)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('prompt_version', models.IntegerField(default=0)),
+                ('notes', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('channel_id', 'bucket_start')},
+            },
+        ),
+    ]
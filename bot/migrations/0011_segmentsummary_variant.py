@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0010_segmentsummary'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='segmentsummary',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='segmentsummary',
+            name='latest_ts',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='segmentsummary',
+            name='variant',
+            field=models.CharField(blank=True, default='', max_length=150),
+        ),
+        migrations.AlterUniqueTogether(
+            name='segmentsummary',
+            unique_together={('channel_id', 'bucket_start', 'variant')},
+        ),
+    ]
@@ -1,4 +1,7 @@
+from datetime import timedelta
+from decimal import Decimal
 from django.db import models
+from django.db.models import F, Q
 from django.utils import timezone
 
 
@@ -114,4 +117,328 @@ class FilterCondition(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.field} {self.operator} {self.value}"
\ No newline at end of file
+        return f"{self.field} {self.operator} {self.value}"
+
+class ArchivedMessage(models.Model):
+    """Local copy of a Slack message, keyed by channel and ts"""
+    channel_id = models.CharField(max_length=50)
+    ts = models.CharField(max_length=50)
+    thread_ts = models.CharField(max_length=50, blank=True, default='')
+    user_id = models.CharField(max_length=50, blank=True, default='')
+    subtype = models.CharField(max_length=50, blank=True, default='')
+    text = models.TextField(blank=True, default='')
+    payload = models.JSONField(default=dict)  # Raw message as returned by Slack
+    is_deleted = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('channel_id', 'ts')
+
+    def __str__(self):
+        return f"{self.channel_id} @ {self.ts}"
+
+    @classmethod
+    def upsert_many(cls, channel_id, messages):
+        """Insert or refresh a batch of raw Slack messages for a channel"""
+        rows = [
+            cls(
+                channel_id=channel_id,
+                ts=msg['ts'],
+                thread_ts=msg.get('thread_ts', ''),
+                user_id=msg.get('user', ''),
+                subtype=msg.get('subtype', ''),
+                text=msg.get('text', ''),
+                payload=msg,
+            )
+            for msg in messages if msg.get('ts')
+        ]
+        if rows:
+            cls.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['channel_id', 'ts'],
+                update_fields=['thread_ts', 'user_id', 'subtype', 'text', 'payload', 'is_deleted', 'archived_at'],
+            )
+        return len(rows)
+
+    @classmethod
+    def get_range(cls, channel_id, oldest_ts, latest_ts=None, limit=None):
+        """Get archived channel-level messages newer than oldest_ts (exclusive), oldest first"""
+        query = cls.objects.filter(channel_id=channel_id, ts__gt=oldest_ts, is_deleted=False)
+        # Thread replies ingested from events are not part of channel history
+        query = query.exclude(~Q(thread_ts='') & ~Q(thread_ts=F('ts')) & ~Q(subtype='thread_broadcast'))
+        if latest_ts:
+            query = query.filter(ts__lte=latest_ts)
+        query = query.order_by('ts')
+        if limit:
+            query = query[:limit]
+        return [row.payload for row in query]
+
+    @classmethod
+    def iter_range(cls, channel_id, oldest_ts, latest_ts=None, page_size=200):
+        """Yield archived channel-level messages newer than oldest_ts in ts-ordered pages"""
+        cursor = oldest_ts
+        while True:
+            page = cls.get_range(channel_id, cursor, latest_ts, limit=page_size)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            cursor = page[-1]['ts']
+
+    @classmethod
+    def mark_deleted(cls, channel_id, ts):
+        """Flag an archived message as deleted"""
+        return cls.objects.filter(channel_id=channel_id, ts=ts).update(is_deleted=True)
+
+
+class ChannelSyncState(models.Model):
+    """Track which ts range of a channel is fully present in the archive"""
+    channel_id = models.CharField(max_length=50, unique=True)
+    oldest_ts = models.CharField(max_length=50)  # Low-water mark: archive is complete after this ts
+    latest_ts = models.CharField(max_length=50)  # High-water mark: newest ts pulled from Slack
+    synced_at = models.DateTimeField(auto_now=True)  # Last conversations_history reconcile
+    events_at = models.DateTimeField(null=True, blank=True)  # Last message event ingested
+
+    def __str__(self):
+        return f"{self.channel_id} ({self.oldest_ts} - {self.latest_ts})"
+
+    @classmethod
+    def get_for_channel(cls, channel_id):
+        """Get the sync state for a channel, or None if it was never archived"""
+        return cls.objects.filter(channel_id=channel_id).first()
+
+    @classmethod
+    def touch_events(cls, channel_id):
+        """Record that a message event was ingested for the channel"""
+        cls.objects.filter(channel_id=channel_id).update(events_at=timezone.now())
+
+    def is_live(self, reconcile_seconds):
+        """Whether events keep the archive current so Slack need not be polled yet"""
+        return self.events_at is not None and timezone.now() - self.synced_at < timedelta(seconds=reconcile_seconds)
+
+
+class SlackUser(models.Model):
+    """Workspace user directory entry, bulk-loaded from users.list"""
+    user_id = models.CharField(max_length=50, unique=True)
+    name = models.CharField(max_length=100, blank=True, default='')
+    real_name = models.CharField(max_length=255, blank=True, default='')
+    display_name = models.CharField(max_length=255, blank=True, default='')
+    is_bot = models.BooleanField(default=False)
+    deleted = models.BooleanField(default=False)
+    profile_updated = models.BigIntegerField(default=0)  # Slack's `updated` epoch for the profile
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.best_name} ({self.user_id})"
+
+    @property
+    def best_name(self):
+        """Name shown in summaries, preferring the display name"""
+        return self.display_name or self.real_name or self.name or f'User_{self.user_id}'
+
+    @classmethod
+    def from_slack(cls, user):
+        """Build an unsaved instance from a users.list / users.info user object"""
+        profile = user.get('profile', {})
+        return cls(
+            user_id=user['id'],
+            name=user.get('name', ''),
+            real_name=profile.get('real_name') or user.get('real_name', ''),
+            display_name=profile.get('display_name', ''),
+            is_bot=user.get('is_bot', False),
+            deleted=user.get('deleted', False),
+            profile_updated=user.get('updated', 0),
+        )
+
+    @classmethod
+    def upsert_many(cls, rows):
+        """Insert or refresh a batch of directory entries"""
+        if rows:
+            cls.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['user_id'],
+                update_fields=['name', 'real_name', 'display_name', 'is_bot', 'deleted', 'profile_updated', 'synced_at'],
+            )
+        return len(rows)
+
+
+class SlackChannel(models.Model):
+    """Workspace channel directory entry, synced from conversations.list"""
+    channel_id = models.CharField(max_length=50, unique=True)
+    name = models.CharField(max_length=100, db_index=True)
+    is_member = models.BooleanField(default=False)
+    is_private = models.BooleanField(default=False)
+    is_archived = models.BooleanField(default=False)
+    num_members = models.IntegerField(default=0)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"#{self.name} ({self.channel_id})"
+
+    def as_dict(self):
+        """Plain dict form shared by the directory cache and callers"""
+        return {
+            'id': self.channel_id,
+            'name': self.name,
+            'is_member': self.is_member,
+            'is_private': self.is_private,
+            'is_archived': self.is_archived,
+            'num_members': self.num_members,
+        }
+
+    @classmethod
+    def from_slack(cls, channel):
+        """Build an unsaved instance from a conversations.list / conversations.info channel object"""
+        return cls(
+            channel_id=channel['id'],
+            name=channel.get('name', channel['id']),
+            is_member=channel.get('is_member', False),
+            is_private=channel.get('is_private', False),
+            is_archived=channel.get('is_archived', False),
+            num_members=channel.get('num_members', 0),
+        )
+
+    @classmethod
+    def upsert_many(cls, rows):
+        """Insert or refresh a batch of directory entries"""
+        if rows:
+            cls.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['channel_id'],
+                update_fields=['name', 'is_member', 'is_private', 'is_archived', 'num_members', 'synced_at'],
+            )
+        return len(rows)
+
+
+class ThreadIndex(models.Model):
+    """Per-channel index of thread parents, kept current from archived history and message events"""
+    channel_id = models.CharField(max_length=50)
+    thread_ts = models.CharField(max_length=50)  # ts of the parent message
+    parent_user = models.CharField(max_length=50, blank=True, default='')
+    parent_text = models.TextField(blank=True, default='')
+    reply_count = models.IntegerField(default=0)
+    latest_reply_ts = models.CharField(max_length=50, blank=True, default='')
+    participants = models.JSONField(default=list)  # User IDs that replied
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('channel_id', 'thread_ts')
+
+    def __str__(self):
+        return f"{self.channel_id} thread {self.thread_ts} ({self.reply_count} replies)"
+
+    def as_dict(self):
+        """Plain dict form returned by the thread lookups"""
+        return {
+            'thread_ts': self.thread_ts,
+            'text': self.parent_text,
+            'user': self.parent_user,
+            'reply_count': self.reply_count,
+            'latest_reply_ts': self.latest_reply_ts,
+            'participants': self.participants,
+        }
+
+    @staticmethod
+    def is_parent(message):
+        """Whether a raw Slack message starts a thread"""
+        return bool(message.get('thread_ts')) and message.get('thread_ts') == message.get('ts') and 'reply_count' in message
+
+    @classmethod
+    def upsert_parents(cls, channel_id, messages):
+        """Index (or refresh) the thread parents found in a batch of raw Slack messages"""
+        rows = [
+            cls(
+                channel_id=channel_id,
+                thread_ts=msg['ts'],
+                parent_user=msg.get('user', ''),
+                parent_text=msg.get('text', ''),
+                reply_count=msg.get('reply_count', 0),
+                latest_reply_ts=msg.get('latest_reply', ''),
+                participants=msg.get('reply_users', []),
+            )
+            for msg in messages if cls.is_parent(msg)
+        ]
+        if rows:
+            cls.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['channel_id', 'thread_ts'],
+                update_fields=['parent_user', 'parent_text', 'reply_count', 'latest_reply_ts', 'participants', 'updated_at'],
+            )
+        return len(rows)
+
+    @classmethod
+    def record_reply(cls, channel_id, thread_ts, reply_ts, user_id):
+        """Count a new reply against its thread, ignoring replays of replies already seen"""
+        entry, _ = cls.objects.get_or_create(channel_id=channel_id, thread_ts=thread_ts)
+        if entry.latest_reply_ts and reply_ts <= entry.latest_reply_ts:
+            return entry
+        if not entry.parent_text:
+            parent = ArchivedMessage.objects.filter(channel_id=channel_id, ts=thread_ts).first()
+            if parent:
+                entry.parent_user, entry.parent_text = parent.user_id, parent.text
+        entry.reply_count += 1
+        entry.latest_reply_ts = reply_ts
+        if user_id and user_id not in entry.participants:
+            entry.participants.append(user_id)
+        entry.save()
+        return entry
+
+    @classmethod
+    def get_recent(cls, channel_id, oldest_ts):
+        """Get threads started after oldest_ts, newest first"""
+        return cls.objects.filter(channel_id=channel_id, thread_ts__gt=oldest_ts).order_by('-thread_ts')
+
+
+class SegmentSummary(models.Model):
+    """Condensed notes for one fixed time bucket of a channel, reused by every window that covers it"""
+    channel_id = models.CharField(max_length=50)
+    bucket_start = models.BigIntegerField()  # Epoch seconds, aligned to SUMMARY_SEGMENT_SECONDS
+    variant = models.CharField(max_length=150, blank=True, default='')  # '' for the whole channel, else a filtered view such as one user's unread
+    message_count = models.IntegerField(default=0)
+    latest_ts = models.CharField(max_length=50, blank=True, default='')  # Newest summarized message
+    fingerprint = models.CharField(max_length=64)  # Hash of the summarized messages' ts/edit/text
+    prompt_version = models.IntegerField(default=0)
+    notes = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('channel_id', 'bucket_start', 'variant')
+
+    def __str__(self):
+        return f"{self.channel_id} segment @ {self.bucket_start} ({self.message_count} messages)"
+
+    @classmethod
+    def get_many(cls, channel_id, bucket_starts, variant=''):
+        """Get stored segments for a channel (and view) keyed by bucket start"""
+        return {
+            segment.bucket_start: segment
+            for segment in cls.objects.filter(channel_id=channel_id, variant=variant, bucket_start__in=list(bucket_starts))
+        }
+
+    @classmethod
+    def store(cls, channel_id, bucket_start, message_count, latest_ts, fingerprint, prompt_version, notes, variant=''):
+        """Save a bucket's notes unless a stored version already covers more of the bucket"""
+        segment = cls.objects.filter(channel_id=channel_id, bucket_start=bucket_start, variant=variant).first()
+        if (segment and segment.prompt_version == prompt_version and segment.message_count > message_count
+                and segment.latest_ts and Decimal(segment.latest_ts) >= Decimal(latest_ts)):
+            # A partial view of the bucket (e.g. a window starting mid-hour) must not replace the full one
+            return segment
+        segment = segment or cls(channel_id=channel_id, bucket_start=bucket_start, variant=variant)
+        segment.message_count = message_count
+        segment.latest_ts = latest_ts
+        segment.fingerprint = fingerprint
+        segment.prompt_version = prompt_version
+        segment.notes = notes
+        segment.save()
+        return segment
+        segment = segment or cls(channel_id=channel_id, bucket_start=bucket_start)
+        segment.message_count = message_count
+        segment.fingerprint = fingerprint
+        segment.prompt_version = prompt_version
+        segment.notes = notes
+        segment.save()
+        return segment
@@ -0,0 +1,146 @@
+import logging
+import time
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from slack_sdk.errors import SlackApiError
+from ..models import ArchivedMessage, ChannelSyncState, ThreadIndex
+from ..utils.message_batch import MessageBatch
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_ts(ts) -> str:
+    """Normalize a Slack ts (or epoch seconds) to the fixed 6-decimal string form"""
+    return f"{Decimal(str(ts)):.6f}"
+
+
+class MessageArchiveService:
+    """Serve channel history from the local archive, pulling only the missing ranges from Slack"""
+    # A parent archived before its first reply only learns its reply_count/latest_reply when
+    # it is pulled again. Without message events nothing tells us which parents changed, so
+    # channels that are not live re-pull the last ARCHIVE_THREAD_REFRESH_HOURS of history
+    # once per ARCHIVE_RECONCILE_SECONDS; other syncs only pull the delta.
+
+    # Envelope fields present on message events but not on conversations_history messages
+    EVENT_ONLY_KEYS = ('channel', 'channel_type', 'event_ts')
+    PAGE_SIZE = 200
+
+    def __init__(self, slack_service):
+        self.slack_service = slack_service
+
+    def get_messages(self, channel_id: str, oldest_ts, latest_ts: Optional[str] = None) -> List[Dict]:
+        """Sync the channel's watermark range, then return archived messages newer than oldest_ts"""
+        return [msg for page in self.iter_messages(channel_id, oldest_ts, latest_ts) for msg in page]
+
+    def iter_messages(self, channel_id: str, oldest_ts, latest_ts: Optional[str] = None) -> Iterator[List[Dict]]:
+        """Sync the channel's watermark range, then yield archived messages in ts-ordered pages"""
+        oldest = normalize_ts(oldest_ts)
+        try:
+            self.sync_channel(channel_id, oldest)
+        except SlackApiError as e:
+            logger.error(f"[ARCHIVE] SlackApiError syncing {channel_id}, serving archived copy: {e.response['error']}")
+        except Exception as e:
+            logger.error(f"[ARCHIVE] Error syncing {channel_id}, serving archived copy: {str(e)}", exc_info=True)
+
+        yield from self.read_pages(channel_id, oldest, latest_ts)
+
+    def read_pages(self, channel_id: str, oldest_ts, latest_ts: Optional[str] = None) -> Iterator[List[Dict]]:
+        """Yield archived messages newer than oldest_ts in ts-ordered pages without contacting Slack"""
+        return ArchivedMessage.iter_range(
+            channel_id,
+            normalize_ts(oldest_ts),
+            normalize_ts(latest_ts) if latest_ts else None,
+            page_size=self.PAGE_SIZE
+        )
+
+    def sync_channel(self, channel_id: str, oldest_ts) -> ChannelSyncState:
+        """Extend the archived range of a channel so it covers everything after oldest_ts"""
+        oldest = normalize_ts(oldest_ts)
+        ranges = self.plan_sync(channel_id, oldest)
+        if not ranges:
+            # Recording an empty sync would bump synced_at and postpone the reconcile
+            return ChannelSyncState.get_for_channel(channel_id)
+
+        messages = []
+        for range_oldest, range_latest, inclusive in ranges:
+            messages.extend(self.slack_service.fetch_history_range(channel_id, range_oldest, latest_ts=range_latest, inclusive=inclusive))
+        return self.record_sync(channel_id, oldest, messages)
+
+    def plan_sync(self, channel_id: str, oldest_ts) -> List[Tuple[str, Optional[str], bool]]:
+        """Return the (oldest, latest, inclusive) history ranges still missing from the archive"""
+        oldest = normalize_ts(oldest_ts)
+        state = ChannelSyncState.get_for_channel(channel_id)
+        if state is None:
+            return [(oldest, None, False)]
+
+        ranges = []
+        # Fill the gap below the low-water mark when a wider window is requested
+        if Decimal(oldest) < Decimal(state.oldest_ts):
+            ranges.append((oldest, state.oldest_ts, True))
+        # Pull the delta above the high-water mark (widened to re-pull recent thread
+        # parents when due), unless message events have been keeping the archive current
+        if not state.is_live(settings.ARCHIVE_RECONCILE_SECONDS):
+            ranges.append((self._delta_start(channel_id, state), None, False))
+        return ranges
+
+    def record_sync(self, channel_id: str, oldest_ts, messages: List[Dict]) -> ChannelSyncState:
+        """Store pulled messages and move the channel's watermarks to cover them"""
+        oldest = normalize_ts(oldest_ts)
+        ArchivedMessage.upsert_many(channel_id, messages)
+        ThreadIndex.upsert_parents(channel_id, messages)
+
+        state = ChannelSyncState.get_for_channel(channel_id)
+        if state is None:
+            state = ChannelSyncState(channel_id=channel_id, oldest_ts=oldest, latest_ts=oldest)
+        elif Decimal(oldest) < Decimal(state.oldest_ts):
+            state.oldest_ts = oldest
+        state.latest_ts = self._newest_ts(messages, state.latest_ts)
+        state.save()
+        # Every sync pulls at least the delta, which covers the thread refresh horizon when it was due
+        cache.set(self._thread_refresh_key(channel_id), True, settings.ARCHIVE_RECONCILE_SECONDS)
+        logger.info(f"[ARCHIVE] Synced {channel_id}: {len(messages)} messages pulled, watermark {state.latest_ts}")
+        return state
+
+    def ingest_event(self, event: Dict) -> bool:
+        """Apply a message event (new, edited, deleted or thread reply) to the archive"""
+        channel_id = event.get('channel')
+        subtype = event.get('subtype')
+        if not channel_id:
+            return False
+
+        if subtype == 'message_deleted':
+            ArchivedMessage.mark_deleted(channel_id, event.get('deleted_ts'))
+            ThreadIndex.objects.filter(channel_id=channel_id, thread_ts=event.get('deleted_ts')).delete()
+        elif subtype in ('message_changed', 'message_replied'):
+            # The nested message carries the original ts (and, for parents, the
+            # current reply counters), so this overwrites in place
+            message = dict(event.get('message', {}), type='message')
+            ArchivedMessage.upsert_many(channel_id, [message])
+            ThreadIndex.upsert_parents(channel_id, [message])
+        elif event.get('ts'):
+            message = {key: value for key, value in event.items() if key not in self.EVENT_ONLY_KEYS}
+            ArchivedMessage.upsert_many(channel_id, [message])
+            if message.get('thread_ts') and message['thread_ts'] != message['ts']:
+                ThreadIndex.record_reply(channel_id, message['thread_ts'], message['ts'], message.get('user', ''))
+        else:
+            return False
+
+        ChannelSyncState.touch_events(channel_id)
+        logger.debug(f"[ARCHIVE] Ingested {subtype or 'message'} event for {channel_id}")
+        return True
+
+    def _delta_start(self, channel_id: str, state: ChannelSyncState) -> str:
+        """The high-water mark, or the start of the thread refresh horizon when a refresh is due"""
+        if cache.get(self._thread_refresh_key(channel_id)):
+            return state.latest_ts
+        horizon = normalize_ts(time.time() - settings.ARCHIVE_THREAD_REFRESH_HOURS * 3600)
+        return min(state.latest_ts, max(state.oldest_ts, horizon), key=Decimal)
+
+    def _thread_refresh_key(self, channel_id: str) -> str:
+        return f"archive_thread_refresh:{channel_id}"
+
+    def _newest_ts(self, messages: List[Dict], current_ts: str) -> str:
+        """Return the highest ts among messages and the current watermark"""
+        return MessageBatch.from_messages(messages).watermark(current_ts)
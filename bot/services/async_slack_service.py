@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+from .archive_service import MessageArchiveService, normalize_ts
+from .slack_service import build_ssl_context
+from ..utils.rate_limiter import slack_rate_limiter, get_retry_after
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSlackService:
+    """Asyncio variant of SlackService for fetching many channels concurrently"""
+
+    MAX_RATE_LIMIT_RETRIES = 3
+
+    def __init__(self, concurrency: Optional[int] = None):
+        """Initialize the async Slack client with SSL context and a concurrency cap"""
+        self.client = AsyncWebClient(token=settings.SLACK_BOT_TOKEN, ssl=build_ssl_context())
+        self.archive = MessageArchiveService(self)
+        self.concurrency = concurrency or settings.SLACK_FETCH_CONCURRENCY
+
+    async def _call(self, api_method: str, **kwargs):
+        """Call a Web API method through the shared per-method rate limiter, retrying on 429s"""
+        client_method = getattr(self.client, api_method.replace('.', '_'))
+        for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+            await slack_rate_limiter.acquire_async(api_method)
+            try:
+                response = await client_method(**kwargs)
+                slack_rate_limiter.on_success(api_method)
+                return response
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt == self.MAX_RATE_LIMIT_RETRIES:
+                    raise
+                slack_rate_limiter.on_rate_limited(api_method, get_retry_after(e.response))
+
+    async def fetch_history_range(self, channel_id: str, oldest_ts: str, latest_ts: Optional[str] = None, inclusive: bool = False) -> List[Dict]:
+        """Page through conversations_history for a ts range, raising on API errors"""
+        messages, cursor = [], None
+        kwargs = {'channel': channel_id, 'oldest': oldest_ts, 'limit': 200}
+        if latest_ts:
+            kwargs['latest'] = latest_ts
+            kwargs['inclusive'] = inclusive
+
+        while True:
+            response = await self._call('conversations.history', cursor=cursor, **kwargs)
+            messages.extend(response.get('messages', []))
+            cursor = response.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                break
+        return messages
+
+    async def fetch_channel_messages(self, channel_id: str, hours_back: int = 24, oldest_ts: Optional[str] = None) -> List[Dict]:
+        """Fetch messages from a channel through the local archive, pulling missing ranges concurrently"""
+        return [msg async for page in self.iter_channel_messages(channel_id, hours_back, oldest_ts) for msg in page]
+
+    async def iter_channel_messages(self, channel_id: str, hours_back: int = 24, oldest_ts: Optional[str] = None) -> AsyncIterator[List[Dict]]:
+        """Sync a channel through the local archive, then yield its messages in ts-ordered pages"""
+        try:
+            if oldest_ts is None:
+                oldest_ts = str((datetime.now() - timedelta(hours=hours_back)).timestamp())
+            oldest = normalize_ts(oldest_ts)
+
+            try:
+                await self._sync_channel(channel_id, oldest)
+            except SlackApiError as e:
+                logger.error(f"[ASYNC] SlackApiError syncing {channel_id}, serving archived copy: {e.response['error']}")
+
+            # Each page is a separate archive query, run off the event loop
+            pages = self.archive.read_pages(channel_id, oldest)
+            read_next = sync_to_async(next)
+            while True:
+                page = await read_next(pages, None)
+                if page is None:
+                    break
+                yield page
+
+        except Exception as e:
+            logger.error(f"[ASYNC] Error fetching channel messages for {channel_id}: {str(e)}", exc_info=True)
+
+    async def _sync_channel(self, channel_id: str, oldest: str):
+        """Pull the ranges missing from the archive concurrently and record them"""
+        ranges = await sync_to_async(self.archive.plan_sync)(channel_id, oldest)
+        if ranges:
+            pages = await asyncio.gather(*(
+                self.fetch_history_range(channel_id, range_oldest, latest_ts=range_latest, inclusive=inclusive)
+                for range_oldest, range_latest, inclusive in ranges
+            ))
+            await sync_to_async(self.archive.record_sync)(channel_id, oldest, [msg for page in pages for msg in page])
+
+    async def fetch_many_channels(self, channel_ids: Iterable[str], hours_back: int = 24, oldest_by_channel: Optional[Dict[str, str]] = None) -> Dict[str, List[Dict]]:
+        """Fetch several channels concurrently, at most `concurrency` at a time"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        oldest_by_channel = oldest_by_channel or {}
+
+        async def fetch_one(channel_id):
+            async with semaphore:
+                return await self.fetch_channel_messages(channel_id, hours_back=hours_back, oldest_ts=oldest_by_channel.get(channel_id))
+
+        channel_ids = list(channel_ids)
+        results = await asyncio.gather(*(fetch_one(channel_id) for channel_id in channel_ids))
+        logger.info(f"[ASYNC] Fetched {len(channel_ids)} channels with concurrency {self.concurrency}")
+        return dict(zip(channel_ids, results))
+
+    async def fetch_thread_messages(self, channel_id: str, thread_ts: str) -> List[Dict]:
+        """Fetch all messages in a thread"""
+        return [msg async for page in self.iter_thread_messages(channel_id, thread_ts) for msg in page]
+
+    async def iter_thread_messages(self, channel_id: str, thread_ts: str) -> AsyncIterator[List[Dict]]:
+        """Yield a thread's messages page by page (conversations.replies returns them oldest first)"""
+        try:
+            cursor = None
+            while True:
+                response = await self._call('conversations.replies', channel=channel_id, ts=thread_ts, cursor=cursor, limit=200)
+                page = [msg for msg in response.get('messages', []) if self._is_valid_standard_message(msg)]
+                if page:
+                    yield page
+                cursor = response.get('response_metadata', {}).get('next_cursor')
+                if not cursor:
+                    break
+        except Exception as e:
+            logger.error(f"[ASYNC] Error fetching thread messages: {str(e)}", exc_info=True)
+
+    async def get_user_info(self, user_id: str) -> Dict:
+        """Get user profile info from Slack"""
+        try:
+            response = await self._call('users.info', user=user_id)
+            return response['user']['profile']
+        except Exception as e:
+            logger.error(f"[ASYNC] Error getting user info for {user_id}: {str(e)}", exc_info=True)
+            raise
+
+    async def list_bot_channels(self) -> List[Dict]:
+        """List all channels that the bot is a member of"""
+        try:
+            channels, cursor = [], None
+            while True:
+                response = await self._call(
+                    'conversations.list',
+                    types='public_channel,private_channel',
+                    exclude_archived=True,
+                    cursor=cursor,
+                    limit=200
+                )
+                for channel in response.get('channels', []):
+                    if channel.get('is_member'):
+                        channels.append({
+                            'id': channel['id'],
+                            'name': channel['name'],
+                            'is_private': channel.get('is_private', False)
+                        })
+                cursor = response.get('response_metadata', {}).get('next_cursor')
+                if not cursor:
+                    break
+            return channels
+        except Exception as e:
+            logger.error(f"[ASYNC] Error listing bot channels: {str(e)}")
+            return []
+
+    def _is_valid_standard_message(self, msg):
+        """Validate if a message is a regular user message (not bot/system)"""
+        return (
+            msg.get('type') == 'message' and
+            not msg.get('bot_id') and
+            msg.get('user') and
+            not msg.get('subtype')
+        )
@@ -1,4 +1,5 @@
 import logging
+from datetime import datetime
 from typing import List, Dict, Optional
 from ..models import ChannelCategory, MessageFilter
 
@@ -360,6 +361,59 @@ class BlockKitService:
             ]
         }
 
+    @staticmethod
+    def create_stats_blocks(stats: Dict, scope: str) -> List[Dict]:
+        """Create blocks for the /summary stats activity report"""
+        bars = '▁▂▃▄▅▆▇█'
+        peak = max(stats['hourly']) or 1
+        sparkline = ''.join(bars[round(count * (len(bars) - 1) / peak)] for count in stats['hourly'])
+        busiest = (
+            f"{datetime.fromtimestamp(stats['busiest_start']).strftime('%H:%M')} ({stats['busiest_count']} messages)"
+            if stats['busiest_start'] else 'n/a'
+        )
+
+        def ranking(items, fmt):
+            return "\n".join(fmt(name, count) for name, count in items) or "_None_"
+
+        blocks = [
+            {
+                "type": "header",
+                "text": {"type": "plain_text", "text": f"📈 Activity stats – {scope}", "emoji": True}
+            },
+            {
+                "type": "section",
+                "fields": [
+                    {"type": "mrkdwn", "text": f"*Messages*\n{stats['total']} in {stats['hours']}h"},
+                    {"type": "mrkdwn", "text": f"*Per hour*\n{stats['per_hour']:.1f} on average"},
+                    {"type": "mrkdwn", "text": f"*Active users*\n{stats['active_users']}"},
+                    {"type": "mrkdwn", "text": f"*Busiest hour*\n{busiest}"},
+                    {"type": "mrkdwn", "text": f"*Threads*\n{stats['threads']} with {stats['replies']} replies"},
+                    {"type": "mrkdwn", "text": f"*Channels*\n{stats['channels']}"},
+                ]
+            },
+            {
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": f"*Messages per hour (oldest → now)*\n`{sparkline}`"}
+            },
+            {
+                "type": "section",
+                "fields": [
+                    {"type": "mrkdwn", "text": "*Top posters*\n" + ranking(stats['top_posters'], lambda name, count: f"• {name}: {count}")},
+                    {"type": "mrkdwn", "text": "*Top reactions*\n" + ranking(stats['top_reactions'], lambda name, count: f":{name}: {count}")},
+                ]
+            },
+        ]
+        if stats['channels'] > 1:
+            blocks.append({
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": "*Busiest channels*\n" + ranking(stats['top_channels'], lambda name, count: f"• #{name}: {count}")}
+            })
+        blocks.append({
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": "Computed from the message archive, no AI involved."}]
+        })
+        return blocks
+
     @staticmethod
     def create_loading_message() -> Dict:
         """Create a loading message block"""
@@ -3,7 +3,7 @@ from typing import List, Dict, Optional
 from django.core.cache import cache
 from django.db import transaction
 from ..models import ChannelCategory, CategoryChannel
-from .slack_service import SlackService
+from .registry import get_slack_service
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +16,7 @@ class CategoryService:
         """Create a new category with associated channels"""
         try:
             logger.info(f"[CATEGORY_CREATE] Starting category creation: name={name}, description={description}, channels={channels}")
-            slack_client = SlackService().client
+            channel_infos = get_slack_service().channels.get_many(channels)
             
             with transaction.atomic():
                 # Create the category
@@ -27,31 +27,17 @@ class CategoryService:
                 )
                 logger.info(f"[CATEGORY_CREATE] Created category with ID: {category.id}")
                 
-                # Add channels to the category
+                # Add channels to the category, names come from the channel directory
                 for channel_id in channels:
-                    try:
-                        # Get channel info from Slack
-                        channel_info = slack_client.conversations_info(channel=channel_id)
-                        if channel_info and channel_info['ok']:
-                            channel_name = channel_info['channel']['name']
-                            logger.info(f"[CATEGORY_CREATE] Got channel name from Slack: {channel_name}")
-                            
-                            CategoryChannel.objects.create(
-                                category=category,
-                                channel_id=channel_id,
-                                channel_name=channel_name,
-                                added_by=created_by
-                            )
-                            logger.info(f"[CATEGORY_CREATE] Added channel {channel_name} to category {category.id}")
-                    except Exception as e:
-                        logger.error(f"[CATEGORY_CREATE] Error getting channel info: {str(e)}", exc_info=True)
-                        # If we can't get the name, store the ID as a fallback
-                        CategoryChannel.objects.create(
-                            category=category,
-                            channel_id=channel_id,
-                            channel_name=channel_id.lstrip('C'),
-                            added_by=created_by
-                        )
+                    # If we can't get the name, store the ID as a fallback
+                    channel_name = channel_infos.get(channel_id, {}).get('name', channel_id.lstrip('C'))
+                    CategoryChannel.objects.create(
+                        category=category,
+                        channel_id=channel_id,
+                        channel_name=channel_name,
+                        added_by=created_by
+                    )
+                    logger.info(f"[CATEGORY_CREATE] Added channel {channel_name} to category {category.id}")
                 
                 logger.info(f"[CATEGORY_CREATE] Successfully created category {category.id} with {len(channels)} channels")
                 return category
@@ -0,0 +1,227 @@
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from ..models import SlackChannel
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelDirectoryService:
+    """Workspace channel directory backed by the SlackChannel model and the cache"""
+    # conversations.list pages through every channel, so it runs in a background thread
+    # (or the sync_directories command) and lookups serve the stored directory meanwhile.
+    # Only lookups the stored directory cannot answer at all (an empty directory on a fresh
+    # deploy, a channel name it has never seen) wait for a sync, at most once per minute.
+    # Event handling stays within the Events API's 3s ack: anything needing Slack is deferred.
+
+    INDEX_CACHE_KEY = 'channel_directory_index'
+    SYNCED_CACHE_KEY = 'channel_directory_synced'
+    RESYNC_CACHE_KEY = 'channel_directory_resync'
+    SYNCING_CACHE_KEY = 'channel_directory_syncing'
+    SYNC_LOCK_SECONDS = 600
+    SYNC_WAIT_SECONDS = 30  # How long a lookup waits for a sync another worker is running
+
+    RENAME_EVENTS = ('channel_rename', 'group_rename')
+    CREATE_EVENTS = ('channel_created',)
+    ARCHIVE_EVENTS = ('channel_archive', 'group_archive')
+    UNARCHIVE_EVENTS = ('channel_unarchive', 'group_unarchive')
+    DELETE_EVENTS = ('channel_deleted', 'group_deleted')
+    BOT_LEFT_EVENTS = ('channel_left', 'group_left')
+    MEMBER_EVENTS = ('member_joined_channel', 'member_left_channel')
+    EVENT_TYPES = RENAME_EVENTS + CREATE_EVENTS + ARCHIVE_EVENTS + UNARCHIVE_EVENTS + DELETE_EVENTS + BOT_LEFT_EVENTS + MEMBER_EVENTS
+
+    def __init__(self, slack_service):
+        self.slack_service = slack_service
+
+    # ---------------------------- LOOKUPS ----------------------------
+
+    def resolve_name(self, channel_name: str) -> Optional[str]:
+        """Resolve a channel name (with or without #) to its ID"""
+        return self.resolve_names([channel_name]).get(self._clean_name(channel_name))
+
+    def resolve_names(self, channel_names: Iterable[str]) -> Dict[str, str]:
+        """Resolve a batch of channel names to IDs, keyed by the cleaned name"""
+        wanted = {self._clean_name(name) for name in channel_names} - {''}
+        by_name = self._load_index()['by_name']
+        if wanted - by_name.keys() and self._can_resync():
+            # A miss may be a channel created since the last sync
+            self._sync_blocking()
+            by_name = self._load_index()['by_name']
+        return {name: by_name[name] for name in wanted if name in by_name}
+
+    def get(self, channel_id: str) -> Optional[Dict]:
+        """Get directory info for a single channel"""
+        return self.get_many([channel_id]).get(channel_id)
+
+    def get_many(self, channel_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Get directory info for a batch of channel IDs, looking up unknown channels individually"""
+        channel_ids = set(channel_ids)
+        by_id = self._load_index()['by_id']
+        missing = channel_ids - by_id.keys()
+        if missing:
+            found = []
+            for channel_id in missing:
+                try:
+                    response = self.slack_service._call('conversations.info', channel=channel_id)
+                    found.append(SlackChannel.from_slack(response['channel']))
+                except Exception as e:
+                    logger.error(f"[CHANNEL_DIRECTORY] Error looking up channel {channel_id}: {str(e)}")
+            if found:
+                SlackChannel.upsert_many(found)
+                self._invalidate()
+                by_id = self._load_index()['by_id']
+        return {channel_id: by_id[channel_id] for channel_id in channel_ids if channel_id in by_id}
+
+    def bot_channels(self) -> List[Dict]:
+        """List the unarchived channels the bot is a member of"""
+        return [
+            {'id': info['id'], 'name': info['name'], 'is_private': info['is_private']}
+            for info in self._load_index()['by_id'].values()
+            if info['is_member'] and not info['is_archived']
+        ]
+
+    # ---------------------------- SYNC ----------------------------
+
+    def sync(self):
+        """Reload the whole directory from conversations.list, dropping channels it no longer lists"""
+        try:
+            started = timezone.now()
+            rows, cursor = [], None
+            while True:
+                response = self.slack_service._call(
+                    'conversations.list',
+                    types='public_channel,private_channel',
+                    exclude_archived=False,
+                    cursor=cursor,
+                    limit=200
+                )
+                rows.extend(SlackChannel.from_slack(channel) for channel in response.get('channels', []))
+                cursor = response.get('response_metadata', {}).get('next_cursor')
+                if not cursor:
+                    break
+
+            SlackChannel.upsert_many(rows)
+            # Every listed channel was just re-saved; older rows were deleted outside our events
+            pruned, _ = SlackChannel.objects.filter(synced_at__lt=started).delete()
+            self._invalidate()
+            cache.set(self.SYNCED_CACHE_KEY, True, settings.CHANNEL_DIRECTORY_REFRESH_SECONDS)
+            cache.set(self.RESYNC_CACHE_KEY, True, 60)
+            logger.info(f"[CHANNEL_DIRECTORY] Synced {len(rows)} channels, pruned {pruned}")
+        except Exception as e:
+            logger.error(f"[CHANNEL_DIRECTORY] Error syncing channel directory: {str(e)}", exc_info=True)
+            # Back off instead of retrying on every lookup; the stored directory is served meanwhile
+            cache.set(self.SYNCED_CACHE_KEY, True, settings.DIRECTORY_SYNC_RETRY_SECONDS)
+
+    def refresh_if_stale(self):
+        """Start a background sync when the directory is due for one"""
+        if not cache.get(self.SYNCED_CACHE_KEY):
+            self._start_sync()
+
+    def handle_event(self, event: Dict):
+        """Apply a rename, archive, join or leave event to the directory"""
+        event_type = event.get('type')
+        channel = event.get('channel')
+        channel_id = channel.get('id') if isinstance(channel, dict) else channel
+        if not channel_id:
+            return
+
+        if event_type in self.RENAME_EVENTS:
+            SlackChannel.objects.filter(channel_id=channel_id).update(name=channel['name'])
+        elif event_type in self.CREATE_EVENTS:
+            SlackChannel.upsert_many([SlackChannel.from_slack(channel)])
+        elif event_type in self.ARCHIVE_EVENTS:
+            SlackChannel.objects.filter(channel_id=channel_id).update(is_archived=True)
+        elif event_type in self.UNARCHIVE_EVENTS:
+            SlackChannel.objects.filter(channel_id=channel_id).update(is_archived=False)
+        elif event_type in self.DELETE_EVENTS:
+            SlackChannel.objects.filter(channel_id=channel_id).delete()
+        elif event_type in self.BOT_LEFT_EVENTS:
+            SlackChannel.objects.filter(channel_id=channel_id).update(is_member=False)
+        elif event_type in self.MEMBER_EVENTS:
+            # Needs the bot's user ID (auth.test) and maybe conversations.info: apply off the ack path
+            threading.Thread(
+                target=self._apply_member_event,
+                args=(event_type, channel_id, event.get('user')),
+                name='channel-directory-member',
+                daemon=True
+            ).start()
+            return
+        else:
+            return
+
+        self._invalidate()
+        logger.info(f"[CHANNEL_DIRECTORY] Applied {event_type} for {channel_id}")
+
+    # ---------------------------- INTERNAL HELPERS ----------------------------
+
+    def _apply_member_event(self, event_type: str, channel_id: str, user_id: Optional[str]):
+        """Count a member joining or leaving, and track the bot's own membership"""
+        try:
+            joined = event_type == 'member_joined_channel'
+            # Events can arrive out of order or for counts from a stale sync; never go below zero
+            updates = {'num_members': Greatest(F('num_members') + (1 if joined else -1), 0)}
+            if user_id and user_id == self.slack_service.get_bot_user_id():
+                updates['is_member'] = joined
+            if not SlackChannel.objects.filter(channel_id=channel_id).update(**updates) and joined:
+                # First time we hear about this channel: fetch its details
+                self.get(channel_id)
+            self._invalidate()
+            logger.info(f"[CHANNEL_DIRECTORY] Applied {event_type} for {channel_id}")
+        except Exception as e:
+            logger.error(f"[CHANNEL_DIRECTORY] Error applying {event_type} for {channel_id}: {str(e)}", exc_info=True)
+
+    def _start_sync(self):
+        """Sync in a background thread unless a worker is already syncing"""
+        if cache.add(self.SYNCING_CACHE_KEY, True, self.SYNC_LOCK_SECONDS):
+            threading.Thread(target=self._locked_sync, name='channel-directory-sync', daemon=True).start()
+
+    def _sync_blocking(self):
+        """Sync in the calling thread, or wait (up to SYNC_WAIT_SECONDS) for the worker already syncing"""
+        if cache.add(self.SYNCING_CACHE_KEY, True, self.SYNC_LOCK_SECONDS):
+            self._locked_sync()
+            return
+        deadline = time.monotonic() + self.SYNC_WAIT_SECONDS
+        while cache.get(self.SYNCING_CACHE_KEY) and time.monotonic() < deadline:
+            time.sleep(0.5)
+
+    def _locked_sync(self):
+        """Sync, then release the lock taken by _start_sync or _sync_blocking"""
+        try:
+            self.sync()
+        finally:
+            cache.delete(self.SYNCING_CACHE_KEY)
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """Get the id and name indexes from the cache, rebuilding them from the database on a miss"""
+        index = cache.get(self.INDEX_CACHE_KEY) or self._build_index()
+        if not index['by_id'] and not cache.get(self.SYNCED_CACHE_KEY):
+            # Never synced (fresh deploy): there is nothing to serve until the first sync lands
+            self._sync_blocking()
+            return self._build_index()
+        self.refresh_if_stale()
+        return index
+
+    def _build_index(self) -> Dict[str, Dict]:
+        by_id = {row.channel_id: row.as_dict() for row in SlackChannel.objects.all()}
+        by_name = {info['name'].lower(): channel_id for channel_id, info in by_id.items()}
+        index = {'by_id': by_id, 'by_name': by_name}
+        cache.set(self.INDEX_CACHE_KEY, index, settings.CHANNEL_DIRECTORY_REFRESH_SECONDS)
+        return index
+
+    def _can_resync(self) -> bool:
+        """Allow a miss-triggered resync at most once per minute"""
+        return cache.add(self.RESYNC_CACHE_KEY, True, 60)
+
+    def _invalidate(self):
+        """Drop the cached indexes so the next lookup rebuilds them"""
+        cache.delete(self.INDEX_CACHE_KEY)
+
+    def _clean_name(self, channel_name: str) -> str:
+        """Normalize '#Channel' / 'channel' to the lowercase name"""
+        return channel_name.strip().lstrip('#').lower()
@@ -0,0 +1,64 @@
+import logging
+import time
+from collections import Counter
+from typing import Dict, List
+import numpy as np
+from ..utils.message_batch import MICROS, MessageBatch
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelStatsService:
+    """Activity numbers for one or more channels, computed from their messages without calling the model"""
+
+    TOP_N = 5
+
+    def __init__(self, slack_service):
+        self.slack_service = slack_service
+
+    def compute(self, channel_messages: Dict[str, List[Dict]], channel_names: Dict[str, str], hours_back: int = 24) -> Dict:
+        """Messages per hour, busiest hour, top posters, reactions and channels, and thread counts"""
+        started = time.perf_counter()
+        channel_ids = list(channel_messages)
+        # (channel index, message) pairs, keeping only what MessageBatch keeps (messages with a ts)
+        pairs = [(index, msg) for index, channel_id in enumerate(channel_ids) for msg in channel_messages[channel_id] if msg.get('ts')]
+        batch = MessageBatch.from_messages(msg for _, msg in pairs)
+        channel_codes = np.fromiter((index for index, _ in pairs), dtype=np.int32, count=len(pairs))
+
+        now = time.time()
+        start = now - hours_back * 3600
+        seconds = batch.ts // MICROS
+        hourly, _ = np.histogram(seconds, bins=hours_back, range=(start, now))
+        busiest = int(np.argmax(hourly)) if len(seconds) else None
+
+        posters = np.bincount(batch.user_codes[batch.user_codes >= 0], minlength=len(batch.users))
+        top_posters = [(batch.users[code], int(posters[code])) for code in np.argsort(-posters, kind='stable')[:self.TOP_N] if posters[code]]
+        names = self.slack_service.users.get_names(user_id for user_id, _ in top_posters) if top_posters else {}
+
+        per_channel = np.bincount(channel_codes, minlength=len(channel_ids))
+        top_channels = [(channel_names.get(channel_ids[code], channel_ids[code]), int(per_channel[code]))
+                        for code in np.argsort(-per_channel, kind='stable')[:self.TOP_N] if per_channel[code]]
+
+        reactions = Counter()
+        for payload in batch.payloads:
+            for reaction in payload.get('reactions', ()):
+                reactions[reaction.get('name', '')] += reaction.get('count', 0)
+        reply_counts = np.fromiter((payload.get('reply_count', 0) for payload in batch.payloads), dtype=np.int64, count=len(batch.payloads))
+
+        stats = {
+            'channels': len(channel_ids),
+            'hours': hours_back,
+            'total': len(batch.payloads),
+            'active_users': int(np.count_nonzero(posters)),
+            'per_hour': len(batch.payloads) / hours_back,
+            'hourly': hourly.tolist(),
+            'busiest_start': start + busiest * 3600 if busiest is not None and hourly[busiest] else None,
+            'busiest_count': int(hourly[busiest]) if busiest is not None else 0,
+            'top_posters': [(names.get(user_id, user_id), count) for user_id, count in top_posters],
+            'top_reactions': reactions.most_common(self.TOP_N),
+            'top_channels': top_channels,
+            'threads': int(np.count_nonzero(reply_counts)),
+            'replies': int(reply_counts.sum()),
+        }
+        logger.info(f"[STATS] {stats['total']} messages over {len(channel_ids)} channels in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return stats
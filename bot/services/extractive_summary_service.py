@@ -0,0 +1,126 @@
+import logging
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+import numpy as np
+from ..utils.bm25 import tokenize
+from ..utils.importance import score_messages, select_top_k
+from ..utils.message_batch import describe_span
+
+logger = logging.getLogger(__name__)
+
+DECISION_PATTERN = re.compile(
+    r"\b(decid\w*|agreed|approved|going with|we will|we'll|let's|action items?|todo|owner|assign\w*|next steps?)\b",
+    re.IGNORECASE,
+)
+URGENT_PATTERN = re.compile(r'\b(urgent|asap|blocker|blocked|outage|down|incident|critical|p0|sev\d|broken|failing)\b', re.IGNORECASE)
+
+
+class ExtractiveSummaryService:
+    """CPU-only summary in the 'Summary Report' layout, built from the most central messages (TextRank over TF-IDF)"""
+    # Used when the model is not worth calling (tiny windows) or not available (slow,
+    # over quota, down). Every bullet quotes a real message, so nothing is invented.
+
+    MAX_SENTENCES = 400  # Larger windows are cut to their most important messages first
+    MAX_TERMS = 3000
+    DAMPING = 0.85
+    ITERATIONS = 30
+    REDUNDANCY = 0.4  # Cosine similarity above which a candidate repeats an already chosen bullet
+    BULLET_CHARS = 160
+
+    def __init__(self, canonicalizer):
+        self.canonicalizer = canonicalizer
+
+    def summarize(self, messages: List[Dict], channel_name: Optional[str] = None, thread: bool = False) -> str:
+        """Summary Report for messages (of a channel, or of a thread), with the same sections as the model-written one"""
+        count = len(messages)
+        timeframe = describe_span(messages)
+        # Join/leave chatter is neither a topic nor a contribution
+        messages = [msg for msg in messages if not self.canonicalizer.membership_change(msg)]
+        messages = select_top_k(messages, self.MAX_SENTENCES)
+        texts = self.canonicalizer.plain_texts(messages)
+        keep = [index for index, text in enumerate(texts) if text]
+        messages, texts = [messages[index] for index in keep], [texts[index] for index in keep]
+        names = self.canonicalizer.author_names(messages)
+
+        vectors = self._tfidf(texts)
+        ranks = self._textrank(vectors, score_messages(messages)) if texts else np.zeros(0)
+        order = [int(index) for index in np.argsort(-ranks, kind='stable')]
+
+        def pick(candidates, limit):
+            return self._diverse(candidates, vectors, limit)
+
+        topics = pick(order, 3)
+        decisions = pick([index for index in order if DECISION_PATTERN.search(texts[index])], 2)
+        questions = pick([index for index in order if '?' in texts[index]], 2)
+        urgent = pick([index for index in order if URGENT_PATTERN.search(texts[index])], 2)
+        authors = Counter(names)
+
+        sections = [
+            "Summary Report – Thread" if thread else f"Summary Report – #{channel_name or 'channel'}",
+            self._section('Key Topics', [self._bullet(names[i], texts[i]) for i in topics], "No clear topics found."),
+            self._section('Decisions & Actions', [self._bullet(names[i], texts[i]) for i in decisions], "No decisions or actions recorded."),
+            self._section('Status & Questions', [
+                f"• Current Status: {self._bullet(names[-1], texts[-1])[2:] if messages else 'No recent activity.'}",
+                f"• Open Questions: {' '.join(self._quote(texts[i]) for i in questions) or 'None raised.'}",
+            ]),
+            self._section('Contributors', [
+                f"• {len(authors)} users actively involved; most active: {', '.join(name for name, _ in authors.most_common(3))}."
+                if authors else "• No participants."
+            ]),
+            self._section('Needs Immediate Attention 🚨', [self._bullet(names[i], texts[i]) for i in urgent], "Nothing urgent flagged."),
+            f"Summary Details\nMessages analyzed: {count}\nTimeframe: {timeframe} (extractive summary)",
+        ]
+        return '\n\n'.join(sections)
+
+    def _tfidf(self, texts: List[str]) -> np.ndarray:
+        """L2-normalized TF-IDF rows (one per text) over the most common stemmed terms"""
+        docs = [tokenize(text) for text in texts]
+        df = Counter(term for doc in docs for term in set(doc))
+        vocab = {term: column for column, (term, _) in enumerate(df.most_common(self.MAX_TERMS))}
+        matrix = np.zeros((len(docs), len(vocab)), dtype=np.float32)
+        for row, doc in enumerate(docs):
+            for term, tf in Counter(doc).items():
+                if term in vocab:
+                    matrix[row, vocab[term]] = 1 + np.log(tf)
+        if vocab:
+            idf = np.log((1 + len(docs)) / (1 + np.array([df[term] for term in vocab], dtype=np.float32))) + 1
+            matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def _textrank(self, vectors: np.ndarray, importance: List[float]) -> np.ndarray:
+        """PageRank over cosine similarities, teleporting in proportion to each message's importance"""
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, 0)
+        row_sums = similarity.sum(axis=1, keepdims=True)
+        transition = np.divide(similarity, row_sums, out=np.zeros_like(similarity), where=row_sums > 0)
+        teleport = np.asarray(importance, dtype=np.float32)
+        teleport = teleport / teleport.sum() if teleport.sum() > 0 else np.full(len(importance), 1 / len(importance), dtype=np.float32)
+
+        ranks = teleport.copy()
+        for _ in range(self.ITERATIONS):
+            ranks = (1 - self.DAMPING) * teleport + self.DAMPING * (transition.T @ ranks)
+        return ranks
+
+    def _diverse(self, candidates: List[int], vectors: np.ndarray, limit: int) -> List[int]:
+        """Best-ranked candidates, skipping any too similar to one already chosen, back in time order"""
+        chosen = []
+        for index in candidates:
+            if len(chosen) == limit:
+                break
+            if all(float(vectors[index] @ vectors[other]) < self.REDUNDANCY for other in chosen):
+                chosen.append(index)
+        return sorted(chosen)
+
+    def _section(self, title: str, bullets: List[str], empty: str = '') -> str:
+        return '\n\n'.join([title] + (bullets or [f"• {empty}"]))
+
+    def _bullet(self, name: str, text: str) -> str:
+        return f"• {name}: {self._quote(text)}"
+
+    def _quote(self, text: str) -> str:
+        """Message text trimmed to bullet length, ending in punctuation"""
+        if len(text) > self.BULLET_CHARS:
+            text = text[:self.BULLET_CHARS - 1].rsplit(' ', 1)[0] + '…'
+        return text if text[-1:] in '.?!…' else text + '.'
@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 from decimal import Decimal
 from ..models import MessageFilter, FilterCondition
 
@@ -24,22 +24,10 @@ class FilterService:
     def apply_filter(self, messages: List[Dict], filter_id: int) -> List[Dict]:
         """Apply a saved filter to a list of messages"""
         try:
-            message_filter = MessageFilter.objects.get(id=filter_id)
-            conditions = FilterCondition.objects.filter(filter=message_filter)
-            
-            if not conditions.exists():
+            matches = self._build_matcher(filter_id)
+            if matches is None:
                 return messages
-
-            filtered_messages = []
-            for message in messages:
-                if message_filter.match_type == 'all':
-                    if all(self._check_condition(message, condition) for condition in conditions):
-                        filtered_messages.append(message)
-                else:  # match_type == 'any'
-                    if any(self._check_condition(message, condition) for condition in conditions):
-                        filtered_messages.append(message)
-
-            return filtered_messages
+            return [message for message in messages if matches(message)]
 
         except MessageFilter.DoesNotExist:
             logger.error(f"Filter with ID {filter_id} not found")
@@ -48,6 +36,30 @@ class FilterService:
             logger.error(f"Error applying filter: {str(e)}")
             return messages
 
+    def iter_filter(self, pages: Iterable[List[Dict]], filter_id: int) -> Iterator[List[Dict]]:
+        """Apply a saved filter to a stream of message pages, loading its conditions once"""
+        try:
+            matches = self._build_matcher(filter_id)
+        except MessageFilter.DoesNotExist:
+            logger.error(f"Filter with ID {filter_id} not found")
+            matches = None
+
+        for page in pages:
+            if matches is not None:
+                page = [message for message in page if matches(message)]
+            if page:
+                yield page
+
+    def _build_matcher(self, filter_id: int) -> Optional[Callable[[Dict], bool]]:
+        """Load a filter's conditions and return a message predicate, or None if it has no conditions"""
+        message_filter = MessageFilter.objects.get(id=filter_id)
+        conditions = list(FilterCondition.objects.filter(filter=message_filter))
+        if not conditions:
+            return None
+
+        combine = all if message_filter.match_type == 'all' else any
+        return lambda message: combine(self._check_condition(message, condition) for condition in conditions)
+
     def _check_condition(self, message: Dict, condition: FilterCondition) -> bool:
         """Check if a message matches a single filter condition"""
         try:
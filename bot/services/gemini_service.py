@@ -1,30 +1,63 @@
+import asyncio
 import logging
+import re
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime
 import google.generativeai as genai
 from django.conf import settings
-from typing import Dict, List, Optional
+from google.api_core.exceptions import TooManyRequests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from .extractive_summary_service import ExtractiveSummaryService
+from .model_router import ModelRouter
+from .prompt_canonicalizer import PromptCanonicalizer
+from .segment_summary_service import SegmentSummaryService
+from ..utils.gemini_governor import GeminiQuotaExceeded, gemini_governor
+from ..utils.importance import select_top_k
+from ..utils.latency_tracker import LatencyTracker
+from ..utils.message_batch import describe_span
+from ..utils.summary_cache import summary_cache
+from ..utils.token_budget import chunk_lines, estimate_tokens
 
 logger = logging.getLogger(__name__)
 
+LINE_OFFSET_PATTERN = re.compile(r'^\+\S+ ')
+
 
 class GeminiService:
     """Service class for interacting with Google Gemini AI"""
 
+    # Bump whenever a prompt template changes so cached summaries are not reused
+    PROMPT_VERSION = 8
+
+    MAX_REDUCE_ROUNDS = 3  # Map rounds before the final prompt is sent regardless of size
+    CHUNK_FALLBACK_LINES = 20
+
     def __init__(self):
         genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.model = genai.GenerativeModel(settings.GEMINI_MODEL_DEFAULT)
+        self.router = ModelRouter(self.model)
+        self.canonicalizer = PromptCanonicalizer()
+        self.extractive = ExtractiveSummaryService(self.canonicalizer)
+        self.segments = SegmentSummaryService(self)
+        # Latencies per model tier, as each tier has its own typical response time
+        self.latency = defaultdict(LatencyTracker)
+        self._loop = None
+        self._loop_lock = threading.Lock()
 
     # ---------------------------- PUBLIC METHODS ----------------------------
 
-    def summarize_messages(self, messages, channel_name):
-        """Summarize Slack channel messages using Gemini AI"""
+    def summarize_messages(self, messages, channel_name, channel_id=None):
+        """Summarize Slack channel messages using Gemini AI (reusing hourly segment notes when channel_id is given)"""
         if not messages:
             return self._fallback_summary(messages, channel_name)
 
         try:
-            formatted = self._format_messages(messages)
-            prompt = self._build_summary_prompt(formatted, channel_name, len(messages))
-            summary = self._get_ai_response(prompt)
+            summary = self._cached_response('channel', [channel_name], messages, lambda lines: self._build_summary_prompt(
+                lines, channel_name, len(messages)
+            ), channel_id=channel_id, local_summary=lambda: self.extractive.summarize(messages, channel_name))
 
             if summary:
                 return self._wrap_summary(summary, channel_name, len(messages))
@@ -35,15 +68,15 @@ class GeminiService:
             logger.error(f"Error generating summary from Gemini: {str(e)}")
             return self._fallback_summary(messages, channel_name)
 
-    def summarize_unread_messages(self, messages, channel_name, user_name):
-        """Summarize unread Slack messages for a specific user"""
+    def summarize_unread_messages(self, messages, channel_name, user_name, channel_id=None):
+        """Summarize unread Slack messages for a specific user (reusing hourly segment notes when channel_id is given)"""
         if not messages:
             return self._fallback_unread_summary(messages, channel_name, user_name)
 
         try:
-            formatted = self._format_messages(messages)
-            prompt = self._build_unread_summary_prompt(formatted, channel_name, len(messages), user_name)
-            summary = self._get_ai_response(prompt)
+            summary = self._cached_response('unread', [channel_name, user_name], messages, lambda lines: self._build_unread_summary_prompt(
+                lines, channel_name, len(messages), user_name
+            ), channel_id=channel_id, segment_variant=f"unread:{user_name}")
 
             if summary:
                 return self._wrap_unread_summary(summary, channel_name, len(messages), user_name)
@@ -58,75 +91,31 @@ class GeminiService:
         """Generate a response using Gemini AI"""
         try:
             full_prompt = f"Context: {context}\n\nUser: {prompt}" if context else prompt
-            return self._get_ai_response(full_prompt)
+            return self._get_ai_response(full_prompt, tier=self._route('answer', full_prompt))
         except Exception as e:
             logger.error(f"Error generating response from Gemini: {str(e)}")
             raise
 
-    def generate_summary(self, messages: List[Dict], channel_name: str = None) -> Optional[Dict]:
-        """Generate a summary of messages"""
+    def generate_summary(self, messages: List[Dict], channel_name: str = None, channel_id: str = None,
+                         on_progress: Optional[Callable[[str], None]] = None, request_type: str = 'report') -> Optional[Dict]:
+        """Generate a summary of messages (reusing hourly segment notes when channel_id is given)"""
+        # With on_progress, the final report is streamed and on_progress receives the text so far.
+        # request_type ('report', 'thread', or 'all' for one channel of a multi-channel report) steers
+        # model routing and the report title
         if not messages:
             return None
 
         try:
-            formatted_messages = self._format_messages(messages)
-            
-            prompt = f"""
-            Please analyze these Slack messages and provide a summary in EXACTLY this format, with NO DEVIATION:
-
-            Summary Report – #{channel_name or 'channel'}
-
-            Key Topics
-
-            • [First key topic with period.]
-
-            • [Second key topic with period.]
-
-            • [Third key topic with period.]
-
-            Decisions & Actions
-
-            • [First decision/action with period.]
-
-            • [Second decision/action with period.]
-
-            Status & Questions
-
-            • Current Status: [One line status with period.]
-
-            • Open Questions: [Key questions with question marks?]
-
-            Contributors
-
-            • [One line about participant count with period.]
-
-            Needs Immediate Attention 🚨
-
-            • [First urgent item with period.]
-
-            • [Second urgent item with period.]
-
-            Summary Details
-            Messages analyzed: {len(messages)}
-            Timeframe: Last 24 hours
-            Generated: {datetime.now().strftime("%Y-%m-%d %H:%M")}
-
-            CRITICAL FORMATTING RULES:
-            1. Use ONLY the bullet character "•" (not emojis, dashes, or asterisks)
-            2. Add exactly one line break after each bullet point
-            3. End each bullet point with proper punctuation (period or question mark)
-            4. Keep section titles EXACTLY as shown (no emojis except 🚨 in "Needs Immediate Attention")
-            5. Use exactly two line breaks between sections
-            6. Keep all formatting and spacing exactly as shown
-            7. Do not add any additional sections or formatting
-            8. Do not use any emojis except 🚨 in the "Needs Immediate Attention" section title
-
-            MESSAGES TO ANALYZE:
-            {formatted_messages}
-            """
-
-            response = self.model.generate_content(prompt)
-            return {'text': response.text}
+            thread = request_type == 'thread'
+            text = self._cached_response('report', [channel_name], messages, lambda lines: self._build_report_prompt(
+                lines, channel_name, len(messages), describe_span(messages), thread
+            ), channel_id=channel_id, on_progress=on_progress, request_type=request_type,
+                local_summary=lambda: self.extractive.summarize(messages, channel_name, thread))
+            if text is None:
+                # The model is slow, over quota or down: degrade to the extractive report
+                logger.warning(f"[GEMINI] No AI summary for #{channel_name}, using the extractive summary")
+                text = self.extractive.summarize(messages, channel_name, thread)
+            return {'text': self._stamp(text)}
 
         except Exception as e:
             logger.error(f"Error generating summary: {str(e)}")
@@ -184,8 +173,7 @@ class GeminiService:
             4. Keep formatting exactly as shown
             """
 
-            response = self.model.generate_content(prompt)
-            return {'text': response.text}
+            return {'text': self._generate(prompt, tier=self._route('focused', prompt))}
 
         except Exception as e:
             logger.error(f"Error generating focused summary: {str(e)}")
@@ -195,7 +183,7 @@ class GeminiService:
         """Answer a specific question with optional context"""
         try:
             prompt = f"Context: {context}\n\nQuestion: {question}" if context else f"Question: {question}"
-            return self._get_ai_response(prompt)
+            return self._get_ai_response(prompt, tier=self._route('answer', prompt))
         except Exception as e:
             logger.error(f"Error answering question: {str(e)}")
             raise
@@ -206,9 +194,9 @@ class GeminiService:
             return self._fallback_thread_summary(messages, thread_topic)
 
         try:
-            formatted = self._format_messages(messages)
-            prompt = self._build_thread_summary_prompt(formatted, thread_topic, len(messages))
-            summary = self._get_ai_response(prompt)
+            summary = self._cached_response('thread', [thread_topic], messages, lambda lines: self._build_thread_summary_prompt(
+                lines, thread_topic, len(messages)
+            ))
 
             if summary:
                 return self._wrap_thread_summary(summary, thread_topic, len(messages))
@@ -221,11 +209,200 @@ class GeminiService:
 
     # ---------------------------- INTERNAL HELPERS ----------------------------
 
-    def _get_ai_response(self, prompt):
+    def _cached_response(self, kind, scope, messages, build_prompt, channel_id=None, on_progress=None, request_type=None,
+                         local_summary=None, segment_variant=''):
+        """Return the AI response for a message set, reusing a cached one while the set is unchanged"""
+        # local_summary() answers requests routed to the local tier; without it the canonical lines are listed.
+        # segment_variant names a filtered view of the channel, whose segment notes are kept apart
+        key = summary_cache.key(kind, scope, messages, self.PROMPT_VERSION)
+        summary = summary_cache.get(key)
+        if summary is None:
+            canonical = self.canonicalizer.canonicalize(messages)
+            _, fitted = self._fit_input_budget(messages, canonical)
+            # Routed on the window as one prompt would carry it, before any chunking
+            tier = self._route(request_type or kind, '\n'.join(fitted.lines))
+            if tier == ModelRouter.LOCAL:
+                return local_summary() if local_summary else self._local_summary(fitted.lines)
+
+            if tier == ModelRouter.LARGE:
+                # The large model takes the whole budget-fitted window in one call
+                summary = self._get_ai_response(build_prompt(fitted.lines), on_progress, tier)
+            elif channel_id and canonical.tokens_after > settings.SUMMARY_CHUNK_TOKENS:
+                # Larger channel windows are built from per-bucket segment notes, which cover
+                # whole buckets and so start from the full window
+                lines = self.segments.build_lines(channel_id, messages, canonical, segment_variant)
+                summary = self._summarize_lines(lines, build_prompt, on_progress, tier, len(canonical.header))
+            else:
+                summary = self._summarize_lines(fitted.lines, build_prompt, on_progress, tier, len(fitted.header))
+            if summary:
+                summary_cache.set(key, summary)
+        return summary
+
+    def _fit_input_budget(self, messages, canonical, budget=None):
+        """Keep only the most important messages when their canonical lines are over budget (SUMMARY_MAX_INPUT_TOKENS by default)"""
+        tokens = canonical.tokens_after
+        budget = budget or settings.SUMMARY_MAX_INPUT_TOKENS
+        if tokens <= budget:
+            return messages, canonical
+
+        # Select whole prompt lines, so a collapsed alert storm costs one line and not one per alert.
+        # Start from the window's average cost per line and shrink until the selection fits
+        k = max(1, len(canonical.units) * budget // tokens)
+        while True:
+            selected = select_top_k(messages, k, canonical.units)
+            fitted = self.canonicalizer.canonicalize(selected)
+            if fitted.tokens_after <= budget or k == 1:
+                break
+            k = max(1, min(k - 1, k * budget // fitted.tokens_after))
+        logger.info(f"[GEMINI] Window of ~{tokens} tokens over budget, keeping {len(selected)} of {len(messages)} messages (~{fitted.tokens_after} tokens)")
+        return selected, fitted
+
+    def _summarize_lines(self, lines, build_prompt, on_progress=None, tier=ModelRouter.DEFAULT, header_count=0):
+        """Run build_prompt(lines) directly, or map-reduce over chunks when lines exceed the token budget"""
+        # The first header_count lines (time origin, people legend) are repeated in every chunk
+        budget = settings.SUMMARY_CHUNK_TOKENS
+        for _ in range(self.MAX_REDUCE_ROUNDS):
+            if estimate_tokens('\n'.join(lines)) <= budget:
+                break
+            # Map: condense each chunk to notes, then reduce over the notes
+            header, body = lines[:header_count], lines[header_count:]
+            chunk_budget = max(budget // 2, budget - estimate_tokens('\n'.join(header)))
+            lines = self._map_chunks(chunk_lines(body, chunk_budget), header)
+            # Notes use full names and absolute times, so later rounds need no header
+            header_count = 0
+        # Only the final call is streamed; partial notes are not meant for the user
+        return self._get_ai_response(build_prompt(lines), on_progress, tier)
+
+    def _map_chunks(self, chunks, header=()):
+        """Condense chunks of conversation lines (each prefixed with header) into partial notes concurrently, keeping their order"""
+        logger.info(f"[GEMINI] Map-reducing {len(chunks)} chunks")
+        with ThreadPoolExecutor(max_workers=min(len(chunks), settings.SUMMARY_MAP_CONCURRENCY)) as executor:
+            notes = list(executor.map(
+                lambda numbered: self._summarize_chunk(list(header) + numbered[1], numbered[0] + 1, len(chunks)),
+                enumerate(chunks)
+            ))
+        return [line for chunk_notes in notes for line in chunk_notes]
+
+    def _summarize_chunk(self, lines, index, total):
+        """Condense one chunk into notes, keeping a few raw lines if the call fails so nothing is dropped silently"""
+        header = f"[Notes on part {index} of {total} of the conversation]"
+        prompt = self._build_chunk_prompt(lines, f"part {index} of {total}")
+        notes = self._get_ai_response(prompt, tier=self._route('chunk', prompt))
+        if notes:
+            return [header, notes]
+        logger.warning(f"[GEMINI] Chunk {index}/{total} failed, keeping an excerpt")
+        return [header] + lines[:self.CHUNK_FALLBACK_LINES]
+
+    async def generate_async(self, prompt: str, deadline: Optional[float] = None, hedge: Optional[bool] = None) -> Optional[str]:
+        """Generate a response from a coroutine, giving up after deadline seconds; None on failure"""
+        # The call runs on the service's own loop (which owns the gRPC async client) and is
+        # cancelled there if the awaiting coroutine is cancelled
+        future = asyncio.run_coroutine_threadsafe(self._call_with_deadline(prompt, deadline, hedge), self._event_loop())
+        try:
+            text = await asyncio.wrap_future(future)
+            return text.strip() if text else None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting async AI response: {str(e)}")
+            return None
+
+    def headroom(self) -> Dict[str, float]:
+        """Gemini quota still free this minute, for callers deciding how much work to schedule"""
+        return gemini_governor.headroom()
+
+    def _generate(self, prompt: str, on_progress: Optional[Callable[[str], None]] = None, tier: str = ModelRouter.DEFAULT) -> str:
+        """Blocking model call for worker threads, bounded by GEMINI_DEADLINE_SECONDS; raises on failure or timeout"""
+        # With on_progress the response is streamed and on_progress gets the accumulated text per chunk
+        future = asyncio.run_coroutine_threadsafe(
+            self._call_with_deadline(prompt, on_progress=on_progress, tier=tier), self._event_loop()
+        )
+        return future.result()
+
+    async def _call_with_deadline(self, prompt, deadline=None, hedge=None, on_progress=None, tier=ModelRouter.DEFAULT):
+        """Run one (possibly hedged) model call, cancelling it once deadline seconds have passed"""
+        deadline = deadline or settings.GEMINI_DEADLINE_SECONDS
+        hedge = settings.GEMINI_HEDGE_ENABLED if hedge is None else hedge
+        call = self._hedged_call(prompt, tier) if hedge and on_progress is None else self._call_async(prompt, on_progress, tier)
+        try:
+            return await asyncio.wait_for(call, deadline)
+        except asyncio.TimeoutError:
+            logger.warning(f"[GEMINI] Call cancelled after its {deadline}s deadline")
+            raise TimeoutError(f"Gemini gave no answer within {deadline}s") from None
+
+    async def _hedged_call(self, prompt, tier):
+        """Send the call, and a second copy if the first is slower than the recent p95; the first answer wins"""
+        delay = self.latency[tier].percentile(95)
+        tasks = {asyncio.ensure_future(self._call_async(prompt, tier=tier))}
         try:
-            response = self.model.generate_content(prompt)
-            if response and response.text:
-                return response.text.strip()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                # Hedging doubles the cost of slow calls; only do it with quota to spare
+                if not done and gemini_governor.headroom()['ratio'] >= settings.GEMINI_HEDGE_MIN_HEADROOM:
+                    logger.info(f"[GEMINI] No answer after p95 of {delay:.1f}s, sending a hedge request")
+                    tasks.add(asyncio.ensure_future(self._call_async(prompt, tier=tier)))
+
+            while True:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                if not tasks:
+                    raise done.pop().exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _call_async(self, prompt, on_progress=None, tier=ModelRouter.DEFAULT):
+        """One model call through the quota governor; raises GeminiQuotaExceeded if the call was shed"""
+        if not await gemini_governor.acquire_async(estimate_tokens(prompt)):
+            raise GeminiQuotaExceeded("Gemini quota exhausted, call shed")
+
+        model = self.router.model(tier)
+        started = time.monotonic()
+        text = ''
+        try:
+            if on_progress is None:
+                response = await model.generate_content_async(prompt)
+                text = response.text if response else ''
+                self.latency[tier].record(time.monotonic() - started)
+                return text
+
+            async for chunk in await model.generate_content_async(prompt, stream=True):
+                if chunk.text:
+                    text += chunk.text
+                    # The callback may block on Slack; keep it off the event loop
+                    await asyncio.to_thread(on_progress, text)
+            return text
+        except TooManyRequests:
+            gemini_governor.on_quota_error()
+            raise
+        finally:
+            gemini_governor.release(estimate_tokens(text) if text else 0)
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        """The service's event loop for model calls, started in a daemon thread on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='gemini-loop', daemon=True).start()
+            return self._loop
+
+    def _route(self, kind: str, text: str) -> str:
+        """Model tier for a request of kind over text, taking the current quota headroom into account"""
+        return self.router.route(kind, estimate_tokens(text), gemini_governor.headroom()['ratio'])
+
+    def _local_summary(self, lines: List[str]) -> str:
+        """Instant answer for conversations short enough to read in full, from their canonical prompt lines"""
+        # Drop the header lines and minute offsets; near-duplicates stay collapsed ("alertbot x30: ...")
+        body = [LINE_OFFSET_PATTERN.sub('', line) for line in lines if not line.startswith('[')]
+        return "Only a few short messages here, so here they are in full:\n" + '\n'.join(f"• {line}" for line in body)
+
+    def _get_ai_response(self, prompt, on_progress=None, tier=ModelRouter.DEFAULT):
+        try:
+            text = self._generate(prompt, on_progress, tier)
+            if text:
+                return text.strip()
             logger.error("Empty response from Gemini")
             return None
         except Exception as e:
@@ -234,13 +411,86 @@ class GeminiService:
 
     def _format_messages(self, messages: List[Dict]) -> str:
         """Format messages for the prompt"""
-        formatted = []
-        for msg in messages:
-            user = msg.get('user', 'Unknown')
-            text = msg.get('text', '')
-            ts = msg.get('ts', '')
-            formatted.append(f"{user} ({ts}): {text}")
-        return "\n".join(formatted)
+        return "\n".join(self._format_lines(messages))
+
+    def _format_lines(self, messages: List[Dict]) -> List[str]:
+        """Format messages as compact prompt lines (see PromptCanonicalizer)"""
+        return self.canonicalizer.canonicalize(messages).lines
+
+    def _build_chunk_prompt(self, lines, label):
+        return f"""You are condensing one slice ({label}) of a Slack conversation so it can be merged into one report.
+
+MESSAGES:
+{chr(10).join(lines)}
+
+Write at most 12 short bullet notes covering:
+- Key topics discussed
+- Decisions and action items (with owners)
+- Open questions and current status
+- Anything urgent or blocking
+- Who was most active
+
+Write people's full names as given in the [People: ...] legend, not their short aliases, and give
+times as clock times rather than +N offsets. Keep names, numbers and dates exact. Output the notes
+only, with no introduction."""
+
+    def _build_report_prompt(self, lines: List[str], channel_name: str = None, count: int = 0, timeframe: str = 'Last 24 hours',
+                             thread: bool = False) -> str:
+        """Build the 'Summary Report' prompt used by generate_summary"""
+        formatted_messages = chr(10).join(lines)
+        title = 'Thread' if thread else f"#{channel_name or 'channel'}"
+        return f"""
+            Please analyze these Slack messages and provide a summary in EXACTLY this format, with NO DEVIATION:
+
+            Summary Report – {title}
+
+            Key Topics
+
+            • [First key topic with period.]
+
+            • [Second key topic with period.]
+
+            • [Third key topic with period.]
+
+            Decisions & Actions
+
+            • [First decision/action with period.]
+
+            • [Second decision/action with period.]
+
+            Status & Questions
+
+            • Current Status: [One line status with period.]
+
+            • Open Questions: [Key questions with question marks?]
+
+            Contributors
+
+            • [One line about participant count with period.]
+
+            Needs Immediate Attention 🚨
+
+            • [First urgent item with period.]
+
+            • [Second urgent item with period.]
+
+            Summary Details
+            Messages analyzed: {count}
+            Timeframe: {timeframe}
+
+            CRITICAL FORMATTING RULES:
+            1. Use ONLY the bullet character "•" (not emojis, dashes, or asterisks)
+            2. Add exactly one line break after each bullet point
+            3. End each bullet point with proper punctuation (period or question mark)
+            4. Keep section titles EXACTLY as shown (no emojis except 🚨 in "Needs Immediate Attention")
+            5. Use exactly two line breaks between sections
+            6. Keep all formatting and spacing exactly as shown
+            7. Do not add any additional sections or formatting
+            8. Do not use any emojis except 🚨 in the "Needs Immediate Attention" section title
+
+            MESSAGES TO ANALYZE:
+            {formatted_messages}
+            """
 
     def _build_summary_prompt(self, messages, channel_name, count):
         return f"""Please analyze and summarize the following Slack channel conversation from #{channel_name}.
@@ -286,7 +536,6 @@ Needs Immediate Attention 🚨
 Summary Details
 Messages analyzed: {count}
 Timeframe: Last 24 hours
-Generated: {datetime.now().strftime("%Y-%m-%d %H:%M")}
 
 CRITICAL FORMATTING RULES:
 1. Use ONLY the bullet character "•" (not emojis, dashes, or asterisks)
@@ -390,7 +639,11 @@ CONTEXT:
 
     def _wrap_summary(self, summary, channel_name, count):
         """Format the final summary output"""
-        return summary
+        return self._stamp(summary)
+
+    def _stamp(self, report):
+        """Add the 'Generated' time to a report when it is served, so cached reports are not shown with an old time"""
+        return f"{report.rstrip()}\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
 
     def _wrap_unread_summary(self, summary, channel_name, count, user):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
@@ -429,6 +682,11 @@ CONTEXT:
 🤖 AI Analysis: Generated on {datetime.now().strftime('%Y-%m-%d %H:%M')}
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"""
 
+        try:
+            return self._stamp(self.extractive.summarize(messages, channel_name))
+        except Exception as e:
+            logger.error(f"Error building extractive summary: {str(e)}")
+
         users = {msg['username'] for msg in messages}
         return f"""📊 **Summary Report for #{channel_name}**
 
@@ -0,0 +1,55 @@
+import logging
+import threading
+import google.generativeai as genai
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRouter:
+    """Pick a model tier (or the local extractive path) for a request from its size, type and the current load"""
+
+    LOCAL = 'local'
+    SMALL = 'small'
+    DEFAULT = 'default'
+    LARGE = 'large'
+
+    # Summaries short enough to show verbatim; questions always need the model
+    LOCAL_KINDS = {'channel', 'unread', 'report', 'thread', 'all'}
+    # Follow-ups, per-channel parts of multi-channel reports and map-step notes favour speed over depth
+    FAST_KINDS = {'focused', 'all', 'chunk', 'segment'}
+    # Reports with an extractive equivalent, served locally while the quota is exhausted
+    DEGRADED_KINDS = {'channel', 'report', 'all'}
+    DOWNGRADE = {LARGE: DEFAULT, DEFAULT: SMALL, SMALL: SMALL}
+
+    def __init__(self, default_model):
+        self._models = {self.DEFAULT: default_model}
+        self._lock = threading.Lock()
+
+    def route(self, kind: str, tokens: int, headroom: float = 1.0) -> str:
+        """Tier for a request of kind with an input of about tokens, given the fraction of quota still free"""
+        if kind in self.LOCAL_KINDS and tokens <= settings.ROUTER_LOCAL_MAX_TOKENS:
+            return self.LOCAL
+        if kind in self.DEGRADED_KINDS and headroom <= 0:
+            return self.LOCAL
+
+        if kind in self.FAST_KINDS:
+            tier = self.SMALL
+        elif tokens >= settings.ROUTER_LARGE_MIN_TOKENS:
+            tier = self.LARGE
+        else:
+            tier = self.DEFAULT
+
+        if headroom < settings.ROUTER_LOW_HEADROOM:
+            # Near the quota a lighter model answers sooner than a queued heavy one
+            tier = self.DOWNGRADE[tier]
+        logger.debug(f"[ROUTER] {kind} (~{tokens} tokens, headroom {headroom:.2f}) -> {tier}")
+        return tier
+
+    def model(self, tier: str):
+        """The GenerativeModel for a tier, created on first use"""
+        with self._lock:
+            if tier not in self._models:
+                names = {self.SMALL: settings.GEMINI_MODEL_SMALL, self.LARGE: settings.GEMINI_MODEL_LARGE}
+                self._models[tier] = genai.GenerativeModel(names[tier])
+            return self._models[tier]
@@ -0,0 +1,241 @@
+import html
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+from django.conf import settings
+from ..models import SlackChannel, SlackUser
+from ..utils.message_batch import MICROS, ts_to_micros
+from ..utils.simhash import DIGITS_PATTERN, cluster_near_duplicates
+from ..utils.token_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# <@U123>, <@U123|name>, <#C123>, <#C123|name>, <!here>, <!subteam^S1|@team>, <https://...|label>
+MARKUP_PATTERN = re.compile(r'<([@#!]?)([^>|]*)(?:\|([^>]*))?>')
+MENTION_ID_PATTERN = re.compile(r'<@([UW][A-Z0-9]+)')
+CHANNEL_ID_PATTERN = re.compile(r'<#(C[A-Z0-9]+)>')
+EMPHASIS_PATTERN = re.compile(r'(?<![\w*_~])([*_~])(\S(?:[^\n]*?\S)?)\1(?![\w*_~])')
+CODE_FENCE_PATTERN = re.compile(r'```|`')
+QUOTE_PATTERN = re.compile(r'^\s*>\s?', re.MULTILINE)
+SKIN_TONE_PATTERN = re.compile(r':skin-tone-\d:')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+MEMBERSHIP_PATTERN = re.compile(r'has (joined|left) the channel\s*$')
+MEMBERSHIP_SUBTYPES = {'channel_join': 'joined', 'channel_leave': 'left'}
+ALIAS_SPLIT_PATTERN = re.compile(r'[\s._-]+')
+MAX_ALIAS_LENGTH = 12
+TEMPLATE_MIN_REPEATS = 3  # Posts by one author matching once digits are ignored, to count as a template
+
+
+class CanonicalLines:
+    """Prompt lines for a message set, with the estimated token cost before and after canonicalization"""
+    # sources[i] is the index of the message lines[i] starts at, or None for the header lines
+    # (time origin and people legend), so callers can split the lines by message afterwards.
+    # units holds, per body line, the indexes of every message it stands for (a collapsed
+    # near-duplicate group or join/leave run has several)
+
+    __slots__ = ('lines', 'sources', 'units', 'tokens_before', 'tokens_after')
+
+    def __init__(self, lines: List[str], sources: List[Optional[int]], units: List[List[int]], tokens_before: int, tokens_after: int):
+        self.lines = lines
+        self.sources = sources
+        self.units = units
+        self.tokens_before = tokens_before
+        self.tokens_after = tokens_after
+
+    @property
+    def header(self) -> List[str]:
+        return [line for line, source in zip(self.lines, self.sources) if source is None]
+
+
+class PromptCanonicalizer:
+    """Rewrite messages into compact prompt lines: short author aliases, minute offsets and plain text"""
+    # A line reads "+12 bob: text", where +12 is minutes after the start time given in the
+    # header. Mentions and channel links are resolved to names, URLs are reduced to their
+    # label or domain, Slack formatting is dropped, and runs of join/leave messages become
+    # one line. Near-duplicate messages (alert storms, copy-paste) collapse into their first
+    # occurrence with a count and time range: "+3..+45 alertbot x12: text". Their numbers
+    # may differ only for bot output and templates an author repeats; "Approved PR 12" and
+    # "Approved PR 99" stay two lines.
+    # Names come from the messages themselves, then from the synced directories.
+
+    def canonicalize(self, messages: List[Dict]) -> CanonicalLines:
+        """Canonical prompt lines for messages, in their given order"""
+        if not messages:
+            return CanonicalLines([], [], [], 0, 0)
+
+        names = self._user_names(messages)
+        aliases = self._aliases(self._name(msg, names) for msg in messages)
+        channels = self._channel_names(messages)
+        start = min((ts_to_micros(msg['ts']) for msg in messages if msg.get('ts')), default=0) // MICROS
+
+        changes = [self.membership_change(msg) for msg in messages]
+        texts = [None if change else self._clean(msg.get('text', ''), names, aliases, channels) for msg, change in zip(messages, changes)]
+        duplicates = self._duplicates(texts, self._templated(messages, texts))
+
+        body, sources, units, membership = [], [], [], None
+        for index, msg in enumerate(messages):
+            offset = self._offset(msg, start)
+            author = aliases[self._name(msg, names)]
+            if changes[index]:
+                # Collapse a run of joins/leaves into a single "(2 joined, 1 left)" line
+                if membership is None:
+                    membership = {'offset': offset, 'joined': 0, 'left': 0}
+                    body.append(membership)
+                    sources.append(index)
+                    units.append([])
+                membership[changes[index]] += 1
+                units[-1].append(index)
+                continue
+            membership = None
+            members = duplicates.get(index)
+            if members:
+                others = len({self._name(messages[member], names) for member in members}) - 1
+                author += f" (+{others} others)" if others else ''
+                offset += f"..{self._offset(messages[members[-1]], start)}"
+                body.append(f"{offset} {author} x{len(members)}: {texts[index]}")
+                sources.append(index)
+                units.append(members)
+            elif texts[index] and members is None:
+                body.append(f"{offset} {author}: {texts[index]}")
+                sources.append(index)
+                units.append([index])
+
+        lines = [f"[+N = minutes after {datetime.fromtimestamp(start).strftime('%Y-%m-%d %H:%M')}]"]
+        legend = [f"{alias}={name}" for name, alias in aliases.items() if alias != name]
+        if legend:
+            lines.append(f"[People: {', '.join(legend)}]")
+        header_count = len(lines)
+        lines.extend(self._membership_line(line) if isinstance(line, dict) else line for line in body)
+
+        tokens_before = estimate_tokens('\n'.join(
+            f"{msg.get('user', 'Unknown')} ({msg.get('ts', '')}): {msg.get('text', '')}" for msg in messages
+        ))
+        tokens_after = estimate_tokens('\n'.join(lines))
+        logger.info(f"[CANONICALIZE] {len(messages)} messages: ~{tokens_before} -> ~{tokens_after} tokens")
+        return CanonicalLines(lines, [None] * header_count + sources, units, tokens_before, tokens_after)
+
+    def author_names(self, messages: List[Dict]) -> List[str]:
+        """Full author name per message, resolving raw Slack user IDs through the user directory"""
+        names = self._user_names(messages)
+        return [self._name(msg, names) for msg in messages]
+
+    def plain_texts(self, messages: List[Dict]) -> List[str]:
+        """Readable text per message with markup resolved to full names, for showing to users"""
+        names = self._user_names(messages)
+        channels = self._channel_names(messages)
+        return [self._clean(msg.get('text', ''), names, {}, channels) for msg in messages]
+
+    def _duplicates(self, texts: List[Optional[str]], templated: List[bool]) -> Dict[int, List[int]]:
+        """Near-duplicate groups keyed by their first index; later members map to an empty list so they are skipped"""
+        candidates = [index for index, text in enumerate(texts) if text]
+        groups = {}
+        clusters = cluster_near_duplicates([texts[index] for index in candidates], settings.DEDUPE_MAX_DISTANCE,
+                                           [templated[index] for index in candidates])
+        for cluster in clusters:
+            if len(cluster) < 2:
+                continue
+            members = [candidates[position] for position in cluster]
+            groups[members[0]] = members
+            groups.update((member, []) for member in members[1:])
+        if groups:
+            collapsed = sum(1 for members in groups.values() if not members)
+            logger.info(f"[CANONICALIZE] Collapsed {collapsed} near-duplicate messages")
+        return groups
+
+    def _templated(self, messages: List[Dict], texts: List[Optional[str]]) -> List[bool]:
+        """Whether each message is bot output or one of an author's repeated templates, whose numbers are ids and counts"""
+        keys = [(msg.get('user_id') or msg.get('username') or msg.get('user'), DIGITS_PATTERN.sub('0', text)) if text else None
+                for msg, text in zip(messages, texts)]
+        repeats = Counter(key for key in keys if key)
+        return [
+            bool(key) and (bool(msg.get('bot_id')) or msg.get('subtype') == 'bot_message' or repeats[key] >= TEMPLATE_MIN_REPEATS)
+            for msg, key in zip(messages, keys)
+        ]
+
+    def _user_names(self, messages: List[Dict]) -> Dict[str, str]:
+        """Names for authors and mentioned users: enriched usernames first, then the user directory"""
+        names = {msg['user_id']: msg['username'] for msg in messages if msg.get('user_id') and msg.get('username')}
+        mentioned = {user_id for msg in messages for user_id in MENTION_ID_PATTERN.findall(msg.get('text', ''))}
+        # Raw Slack messages (threads, un-enriched channel reads) only carry the author's ID
+        unnamed = {msg['user'] for msg in messages if msg.get('user') and not msg.get('username')}
+        missing = (mentioned | unnamed) - names.keys()
+        if missing:
+            try:
+                for user in SlackUser.objects.filter(user_id__in=missing):
+                    names[user.user_id] = user.best_name
+            except Exception as e:
+                logger.error(f"[CANONICALIZE] Error resolving mentioned users: {str(e)}")
+        return names
+
+    def _channel_names(self, messages: List[Dict]) -> Dict[str, str]:
+        channel_ids = {channel_id for msg in messages for channel_id in CHANNEL_ID_PATTERN.findall(msg.get('text', ''))}
+        if not channel_ids:
+            return {}
+        try:
+            return dict(SlackChannel.objects.filter(channel_id__in=channel_ids).values_list('channel_id', 'name'))
+        except Exception as e:
+            logger.error(f"[CANONICALIZE] Error resolving mentioned channels: {str(e)}")
+            return {}
+
+    def _aliases(self, names: Iterable[str]) -> Dict[str, str]:
+        """Short alias per distinct name (first word, numbered on collision), stable in order of appearance"""
+        aliases, taken = {}, set()
+        for name in names:
+            if name in aliases:
+                continue
+            base = (ALIAS_SPLIT_PATTERN.split(name.strip())[0] or name)[:MAX_ALIAS_LENGTH]
+            alias, suffix = base, 2
+            while alias in taken:
+                alias, suffix = f"{base}{suffix}", suffix + 1
+            aliases[name] = alias
+            taken.add(alias)
+        return aliases
+
+    def _name(self, msg: Dict, names: Dict[str, str]) -> str:
+        """Full author name of a message, enriched or raw"""
+        return names.get(msg.get('user_id')) or msg.get('username') or names.get(msg.get('user')) or msg.get('user') or 'Unknown'
+
+    def _offset(self, msg: Dict, start: int) -> str:
+        if not msg.get('ts'):
+            return '+?'
+        return f"+{(ts_to_micros(msg['ts']) // MICROS - start) // 60}"
+
+    def membership_change(self, msg: Dict) -> Optional[str]:
+        """'joined' or 'left' for channel membership chatter, None for real messages"""
+        if msg.get('subtype') in MEMBERSHIP_SUBTYPES:
+            return MEMBERSHIP_SUBTYPES[msg['subtype']]
+        match = MEMBERSHIP_PATTERN.search(msg.get('text', ''))
+        return match.group(1) if match else None
+
+    def _membership_line(self, run: Dict) -> str:
+        counts = [f"{run[change]} {change}" for change in ('joined', 'left') if run[change]]
+        return f"{run['offset']} ({', '.join(counts)})"
+
+    def _clean(self, text: str, names: Dict[str, str], aliases: Dict[str, str], channels: Dict[str, str]) -> str:
+        """Plain text for one message: markup resolved, formatting and entity escapes dropped, whitespace collapsed"""
+        def resolve(match):
+            sigil, target, label = match.groups()
+            if sigil == '@':
+                name = names.get(target) or label
+                return f"@{aliases.get(name, name)}" if name else '@someone'
+            if sigil == '#':
+                return f"#{label or channels.get(target, 'channel')}"
+            if sigil == '!':
+                # <!here>, <!channel>, <!subteam^S1|@team>, <!date^...|fallback>
+                return label or f"@{target.split('^')[0]}"
+            if label:
+                return label
+            if target.startswith('mailto:'):
+                return target[len('mailto:'):]
+            return f"[{urlparse(target).netloc or target}]"
+
+        text = MARKUP_PATTERN.sub(resolve, text)
+        text = html.unescape(text)
+        text = QUOTE_PATTERN.sub('', text)
+        text = CODE_FENCE_PATTERN.sub('', text)
+        text = EMPHASIS_PATTERN.sub(r'\2', text)
+        text = SKIN_TONE_PATTERN.sub('', text)
+        return WHITESPACE_PATTERN.sub(' ', text).strip()
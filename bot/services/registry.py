@@ -0,0 +1,39 @@
+import logging
+import threading
+from .slack_service import SlackService
+from .async_slack_service import AsyncSlackService
+from .gemini_service import GeminiService
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_services = {}
+
+
+def _get_or_create(name, factory):
+    """Return the process-wide instance registered under name, creating it once"""
+    service = _services.get(name)
+    if service is None:
+        with _lock:
+            service = _services.get(name)
+            if service is None:
+                service = factory()
+                _services[name] = service
+                logger.info(f"[REGISTRY] Created shared {name} service")
+    return service
+
+
+def get_slack_service() -> SlackService:
+    """Get the shared SlackService (client, SSL context and directories built once per process)"""
+    return _get_or_create('slack', SlackService)
+
+
+def get_async_slack_service() -> AsyncSlackService:
+    """Get the shared AsyncSlackService"""
+    return _get_or_create('async_slack', AsyncSlackService)
+
+
+def get_gemini_service() -> GeminiService:
+    """Get the shared GeminiService (genai configured and model handle built once per process)"""
+    return _get_or_create('gemini', GeminiService)
+
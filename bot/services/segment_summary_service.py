@@ -0,0 +1,104 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Tuple
+from django.conf import settings
+from django.db import IntegrityError
+from ..models import SegmentSummary
+from ..utils.message_batch import MICROS, ts_to_micros
+from ..utils.summary_cache import fingerprint_messages
+from ..utils.token_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentSummaryService:
+    """Condense a channel's messages per time bucket, persisting bucket notes so any window can reuse them"""
+
+    def __init__(self, gemini_service):
+        self.gemini_service = gemini_service
+
+    def build_lines(self, channel_id: str, messages: List[Dict], canonical, variant: str = '') -> List[str]:
+        """Prompt lines for a window: its canonical header, then stored notes for known buckets and fresh notes or raw lines for the rest"""
+        # The window is canonicalized once (see PromptCanonicalizer) and its lines split by bucket,
+        # so aliases and minute offsets mean the same thing in every bucket. Notes are written
+        # with full names and clock times, so any other window can reuse them. Windows that
+        # filter the channel (an unread view leaves out the reader's own messages) pass a
+        # variant and keep their own notes, as their buckets never match the whole channel's.
+        buckets = self._group(messages)
+        stored = SegmentSummary.get_many(channel_id, [start for start, _ in buckets], variant)
+        version = self.gemini_service.PROMPT_VERSION
+
+        bucket_of = {index: start for start, indexes in buckets for index in indexes}
+        raw_by_bucket: Dict[int, List[str]] = {}
+        for line, source in zip(canonical.lines, canonical.sources):
+            if source is not None:
+                raw_by_bucket.setdefault(bucket_of[source], []).append(line)
+
+        lines_by_bucket, to_condense = {}, []
+        for position, (start, indexes) in enumerate(buckets):
+            bucket_messages = [messages[index] for index in indexes]
+            raw_lines = raw_by_bucket.get(start, [])
+            segment = stored.get(start)
+            fingerprint = fingerprint_messages(bucket_messages)
+            latest_ts = max((msg['ts'] for msg in bucket_messages), key=ts_to_micros)
+            if segment and segment.prompt_version == version and (
+                segment.fingerprint == fingerprint
+                # The first bucket is cut wherever the window starts, so it shrinks as the window
+                # slides; notes on more of the bucket, up to the same newest message, still hold
+                or (position == 0 and segment.latest_ts == latest_ts and segment.message_count >= len(indexes))
+            ):
+                lines_by_bucket[start] = [self._header(start), segment.notes]
+            elif estimate_tokens('\n'.join(raw_lines)) < settings.SUMMARY_SEGMENT_MIN_TOKENS:
+                # Quiet hours are cheaper to pass through verbatim than to condense
+                lines_by_bucket[start] = raw_lines
+            else:
+                to_condense.append((start, bucket_messages, raw_lines, latest_ts, fingerprint))
+
+        if to_condense:
+            logger.info(f"[SEGMENTS] {channel_id}: reusing {len(buckets) - len(to_condense)} buckets, condensing {len(to_condense)}")
+            with ThreadPoolExecutor(max_workers=min(len(to_condense), settings.SUMMARY_MAP_CONCURRENCY)) as executor:
+                for start, lines in executor.map(lambda item: self._condense(channel_id, variant, canonical.header, *item), to_condense):
+                    lines_by_bucket[start] = lines
+
+        return canonical.header + [line for start, _ in buckets for line in lines_by_bucket[start]]
+
+    def _condense(self, channel_id: str, variant: str, header: List[str], start: int, bucket_messages: List[Dict], raw_lines: List[str],
+                  latest_ts: str, fingerprint: str) -> Tuple[int, List[str]]:
+        """Summarize one bucket and persist the notes, falling back to its raw lines on failure"""
+        lines = header + raw_lines
+        if estimate_tokens('\n'.join(lines)) > settings.SUMMARY_CHUNK_TOKENS:
+            # A storm hour: condense its most important messages (the notes still stand for the whole bucket)
+            _, canonical = self.gemini_service._fit_input_budget(
+                bucket_messages, self.gemini_service.canonicalizer.canonicalize(bucket_messages), settings.SUMMARY_CHUNK_TOKENS
+            )
+            lines = canonical.lines
+        prompt = self.gemini_service._build_chunk_prompt(lines, self._label(start))
+        notes = self.gemini_service._get_ai_response(prompt, tier=self.gemini_service._route('segment', prompt))
+        if not notes:
+            logger.warning(f"[SEGMENTS] Could not condense {channel_id} bucket {start}, passing raw lines")
+            return start, raw_lines
+
+        try:
+            SegmentSummary.store(channel_id, start, len(bucket_messages), latest_ts, fingerprint, self.gemini_service.PROMPT_VERSION, notes, variant)
+        except IntegrityError:
+            # Another worker stored the same bucket first; its notes are equally valid
+            pass
+        return start, [self._header(start), notes]
+
+    def _group(self, messages: List[Dict]) -> List[Tuple[int, List[int]]]:
+        """Group ts-ordered messages into (bucket_start, message indexes) pairs"""
+        size = settings.SUMMARY_SEGMENT_SECONDS
+        buckets: Dict[int, List[int]] = {}
+        for index, msg in enumerate(messages):
+            start = ts_to_micros(msg['ts']) // MICROS // size * size
+            buckets.setdefault(start, []).append(index)
+        return sorted(buckets.items())
+
+    def _label(self, start: int) -> str:
+        """Human-readable bucket span, e.g. '2024-05-01 14:00-15:00'"""
+        end = datetime.fromtimestamp(start + settings.SUMMARY_SEGMENT_SECONDS)
+        return f"{datetime.fromtimestamp(start).strftime('%Y-%m-%d %H:%M')}-{end.strftime('%H:%M')}"
+
+    def _header(self, start: int) -> str:
+        return f"[Notes on {self._label(start)}]"
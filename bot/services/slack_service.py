@@ -1,5 +1,4 @@
 import logging
-import time
 import ssl
 import certifi
 from decimal import Decimal
@@ -8,37 +7,70 @@ from slack_sdk.web import WebClient
 from slack_sdk.errors import SlackApiError
 from django.conf import settings
 from django.core.cache import cache
-from django.utils.timezone import now
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterable, Iterator, List
+from .archive_service import MessageArchiveService, normalize_ts
+from .user_directory_service import UserDirectoryService
+from .channel_directory_service import ChannelDirectoryService
+from .thread_search_service import ThreadSearchService
+from ..models import ThreadIndex
+from ..utils.message_batch import MessageBatch
+from ..utils.rate_limiter import slack_rate_limiter, get_retry_after
 
 logger = logging.getLogger(__name__)
 
+
+def build_ssl_context():
+    """Build the SSL context used by the Slack web clients"""
+    ssl_context = ssl.create_default_context(cafile=certifi.where())
+
+    if settings.DEBUG:
+        logger.warning("DEBUG mode: Using relaxed SSL verification for Slack API")
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
+
 class SlackService:
     """Service class for interacting with Slack API with SSL certificate handling"""
 
-    RATE_LIMIT_DELAY = 0.5
+    MAX_RATE_LIMIT_RETRIES = 3
+    BOT_USER_ID_CACHE_KEY = 'slack_bot_user_id'
+    BOT_USER_ID_CACHE_SECONDS = 86400  # Re-checked daily so a reinstalled app's new bot user is picked up
 
     def __init__(self):
         """Initialize the Slack client with SSL context"""
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
-
-        if settings.DEBUG:
-            logger.warning("DEBUG mode: Using relaxed SSL verification for Slack API")
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-
-        self.client = WebClient(token=settings.SLACK_BOT_TOKEN, ssl=ssl_context)
+        self.client = WebClient(token=settings.SLACK_BOT_TOKEN, ssl=build_ssl_context())
         self.bot_user_id = None
+        self.archive = MessageArchiveService(self)
+        self.users = UserDirectoryService(self)
+        self.channels = ChannelDirectoryService(self)
+        self.thread_search = ThreadSearchService()
         logger.info("SlackService initialized with SSL context")
 
+    def _call(self, api_method: str, **kwargs):
+        """Call a Web API method through the shared per-method rate limiter, retrying on 429s"""
+        client_method = getattr(self.client, api_method.replace('.', '_'))
+        for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+            slack_rate_limiter.acquire(api_method)
+            try:
+                response = client_method(**kwargs)
+                slack_rate_limiter.on_success(api_method)
+                return response
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt == self.MAX_RATE_LIMIT_RETRIES:
+                    raise
+                slack_rate_limiter.on_rate_limited(api_method, get_retry_after(e.response))
+
     def get_bot_user_id(self):
-        """Get the Slack bot's user ID, cache it after first lookup"""
+        """Get the Slack bot's user ID, cached across workers for BOT_USER_ID_CACHE_SECONDS"""
+        self.bot_user_id = cache.get(self.BOT_USER_ID_CACHE_KEY)
         if self.bot_user_id:
             return self.bot_user_id
 
         try:
-            response = self.client.auth_test()
+            response = self._call('auth.test')
             self.bot_user_id = response['user_id']
+            cache.set(self.BOT_USER_ID_CACHE_KEY, self.bot_user_id, self.BOT_USER_ID_CACHE_SECONDS)
             logger.info(f"Bot user ID: {self.bot_user_id}")
             return self.bot_user_id
         except SlackApiError as e:
@@ -49,46 +81,30 @@ class SlackService:
             return None
 
     def find_channel_id(self, channel_name):
-        """Find the Slack channel ID by its name, using cache if possible"""
+        """Find the Slack channel ID by its name using the channel directory"""
         clean_name = channel_name.strip().lstrip('#').lower()
         if not clean_name:
             logger.warning("Empty channel name provided")
             return None
 
-        cache_key = f"channel_id_{clean_name}"
-        cached_id = cache.get(cache_key)
-        if cached_id:
-            logger.info(f"Found cached channel ID for #{clean_name}: {cached_id}")
-            return cached_id
-
-        try:
-            cursor = None
-            while True:
-                response = self.client.conversations_list(cursor=cursor, limit=200, types="public_channel,private_channel")
-                for channel in response.get('channels', []):
-                    if channel['name'].lower() == clean_name:
-                        channel_id = channel['id']
-                        cache.set(cache_key, channel_id, 3600)
-                        return channel_id
-
-                cursor = response.get('response_metadata', {}).get('next_cursor')
-                if not cursor:
-                    break
-                time.sleep(self.RATE_LIMIT_DELAY)
-        except SlackApiError as e:
-            logger.error(f"SlackApiError finding channel #{clean_name}: {e.response['error']}")
-        except Exception as e:
-            logger.error(f"Unexpected error finding channel #{clean_name}: {str(e)}", exc_info=True)
-        return None
+        channel_id = self.channels.resolve_name(clean_name)
+        if not channel_id:
+            logger.info(f"Channel #{clean_name} not found in channel directory")
+        return channel_id
 
     def check_bot_membership(self, channel_id):
         """Check if the bot is a member of a given Slack channel"""
+        channel = self.channels.get(channel_id)
+        if channel and channel['is_member']:
+            return True
+
+        # The directory may not have seen the join yet; confirm with Slack
         try:
             bot_user_id = self.get_bot_user_id()
             if not bot_user_id:
                 return False
 
-            response = self.client.conversations_members(channel=channel_id)
+            response = self._call('conversations.members', channel=channel_id)
             return bot_user_id in response.get('members', [])
         except SlackApiError as e:
             return False
@@ -96,92 +112,41 @@ class SlackService:
             logger.error(f"Unexpected error checking bot membership in {channel_id}: {str(e)}", exc_info=True)
             return False
 
-    def fetch_channel_messages(self, channel_id, hours_back=24):
-        """Fetch messages from a channel within a given time window"""
-        try:
-            oldest_ts = (now() - timedelta(hours=hours_back)).timestamp()
-            messages, cursor = [], None
-
-            while True:
-                response = self.client.conversations_history(channel=channel_id, oldest=str(oldest_ts), cursor=cursor, limit=200)
-                messages += [msg for msg in response.get('messages', []) if self._is_valid_standard_message(msg)]
-                cursor = response.get('response_metadata', {}).get('next_cursor')
-                if not cursor:
-                    break
-                time.sleep(self.RATE_LIMIT_DELAY)
-
-            return sorted(messages, key=lambda x: float(x['ts']))
-        except Exception as e:
-            logger.error(f"Error fetching messages: {str(e)}", exc_info=True)
-            return []
+    def fetch_history_range(self, channel_id: str, oldest_ts: str, latest_ts: Optional[str] = None, inclusive: bool = False) -> List[Dict]:
+        """Page through conversations_history for a ts range, raising on API errors"""
+        return [msg for page in self.iter_history_range(channel_id, oldest_ts, latest_ts, inclusive) for msg in page]
+
+    def iter_history_range(self, channel_id: str, oldest_ts: str, latest_ts: Optional[str] = None, inclusive: bool = False) -> Iterator[List[Dict]]:
+        """Yield conversations_history pages for a ts range as they arrive, raising on API errors"""
+        cursor = None
+        kwargs = {'channel': channel_id, 'oldest': oldest_ts, 'limit': 200}
+        if latest_ts:
+            kwargs['latest'] = latest_ts
+            kwargs['inclusive'] = inclusive
+
+        while True:
+            response = self._call('conversations.history', cursor=cursor, **kwargs)
+            yield response.get('messages', [])
+            cursor = response.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                break
 
     def enrich_messages_with_usernames(self, messages):
         """Replace user IDs with usernames in message list"""
-        user_cache, enriched = {}, []
-        for msg in messages:
-            user_id = msg.get('user')
-            if not user_id:
-                continue
-
-            if user_id not in user_cache:
-                try:
-                    user_info = self.get_user_info(user_id)
-                    username = user_info.get('display_name') or user_info.get('real_name') or user_info.get('name', f'User_{user_id}')
-                    user_cache[user_id] = username
-                    time.sleep(0.1)
-                except Exception as e:
-                    user_cache[user_id] = f'User_{user_id}'
-
-            enriched.append({
-                'timestamp': datetime.fromtimestamp(float(msg['ts'])),
-                'username': user_cache[user_id],
-                'text': msg.get('text', ''),
-                'user_id': user_id,
-                'ts': msg['ts']
-            })
-        return enriched
-
-    def fetch_unread_messages(self, channel_id, user_id):
-        """Fetch unread messages for a user since their last summary timestamp"""
-        try:
-            from ..models import UserSummaryState
-            last_ts = UserSummaryState.get_last_summary_ts(user_id, channel_id)
-            logger.info(f"[Fetch Unread] Last summary TS for user {user_id} in {channel_id}: {last_ts}")
-            messages, cursor, newest_ts = [], None, None
-
-            while True:
-                response = self.client.conversations_history(channel=channel_id, oldest=str(last_ts), cursor=cursor, limit=200)
-                for msg in response.get('messages', []):
-                    if Decimal(msg['ts']) <= Decimal(last_ts):
-                        continue
-                    if self._is_valid_unread_message(msg, user_id):
-                        messages.append(msg)
-                        if newest_ts is None or Decimal(msg['ts']) > Decimal(newest_ts):
-                            newest_ts = msg['ts']
-                cursor = response.get('response_metadata', {}).get('next_cursor')
-                if not cursor:
-                    break
-                time.sleep(self.RATE_LIMIT_DELAY)
+        return self._enrich_page(messages)
 
-            logger.info(f"[Fetch Unread] Total valid messages: {len(messages)}, Newest TS: {newest_ts}")
-            if newest_ts and messages:
-                logger.info(f"[Update Summary] Saving summary for user={user_id}, channel={channel_id}, ts={newest_ts}")
-                UserSummaryState.update_last_summary_ts(user_id, channel_id, newest_ts)
-            return sorted(messages, key=lambda x: float(x['ts']))
-        except Exception as e:
-            logger.error(f"Error fetching unread messages: {str(e)}", exc_info=True)
-            return []
+    def iter_enriched(self, pages: Iterable[List[Dict]]) -> Iterator[List[Dict]]:
+        """Enrich a stream of message pages with usernames, one page at a time"""
+        for page in pages:
+            enriched = self._enrich_page(page)
+            if enriched:
+                yield enriched
 
-    def _is_valid_unread_message(self, msg, user_id):
-        """Validate if a message is unread and relevant to the user"""
-        return (
-            msg.get('type') == 'message' and
-            not msg.get('bot_id') and
-            msg.get('user') and
-            msg.get('user') != user_id and
-            not msg.get('subtype') and
-            datetime.fromtimestamp(float(msg['ts'])) >= (now() - timedelta(hours=24))
-        )
+    def _enrich_page(self, messages):
+        """Replace user IDs with usernames for one batch of messages"""
+        # Columnar batch: ts parsed once to int64, users interned, dicts built only at the end
+        batch = MessageBatch.from_messages(messages).has_user().dedupe()
+        return batch.to_enriched(self.users.get_names(batch.user_ids()))
 
     def _is_valid_standard_message(self, msg):
         """Validate if a message is a regular user message (not bot/system)"""
@@ -202,16 +167,31 @@ class SlackService:
             if thread_ts:
                 kwargs['thread_ts'] = thread_ts
 
-            response = self.client.chat_postMessage(**kwargs)
+            response = self._call('chat.postMessage', **kwargs)
             return response['ok']
         except SlackApiError as e:
             logger.error(f"Error sending message: {str(e)}")
             return False
 
+    def post_message(self, channel: str, text: str, blocks: Optional[List[Dict]] = None, thread_ts: Optional[str] = None) -> Optional[str]:
+        """Post a message to a Slack channel, returning its ts so it can be updated later"""
+        try:
+            kwargs = {'channel': channel, 'text': text}
+            if blocks:
+                kwargs['blocks'] = blocks
+            if thread_ts:
+                kwargs['thread_ts'] = thread_ts
+
+            response = self._call('chat.postMessage', **kwargs)
+            return response['ts'] if response['ok'] else None
+        except SlackApiError as e:
+            logger.error(f"Error posting message: {str(e)}")
+            return None
+
     def update_message(self, channel, ts, text, blocks=None):
         """Update an existing Slack message in a channel"""
         try:
-            return self.client.chat_update(channel=channel, ts=ts, text=text, blocks=blocks)
+            return self._call('chat.update', channel=channel, ts=ts, text=text, blocks=blocks)
         except Exception as e:
             logger.error(f"Error updating message: {str(e)}", exc_info=True)
             raise
@@ -219,7 +199,7 @@ class SlackService:
     def get_user_info(self, user_id):
         """Get user profile info from Slack"""
         try:
-            return self.client.users_info(user=user_id)['user']['profile']
+            return self._call('users.info', user=user_id)['user']['profile']
         except Exception as e:
             logger.error(f"Error getting user info for {user_id}: {str(e)}", exc_info=True)
             raise
@@ -228,7 +208,7 @@ class SlackService:
         """Get channel information from Slack API"""
         try:
             logger.debug(f"Fetching channel info for {channel_id}")
-            response = self.client.conversations_info(channel=channel_id)
+            response = self._call('conversations.info', channel=channel_id)
             channel_info = response['channel']
             logger.debug(f"Channel info retrieved for {channel_id}")
             return channel_info
@@ -242,6 +222,12 @@ class SlackService:
     
     def fetch_unread_messages(self, channel_id, user_id):
         """Fetch only unread messages for a specific user in a channel"""
+        messages = [msg for page in self.iter_unread_messages(channel_id, user_id) for msg in page]
+        logger.info(f"Found {len(messages)} truly unread messages for user {user_id} in {channel_id}")
+        return messages
+
+    def iter_unread_messages(self, channel_id, user_id) -> Iterator[List[Dict]]:
+        """Yield unread messages for a user in ts-ordered pages, advancing their watermark once exhausted"""
         try:
             logger.info(f"Fetching unread messages for user {user_id} in channel {channel_id}")
             
@@ -253,73 +239,41 @@ class SlackService:
             
             # Step 2: Check if user is a member of the channel
             try:
-                members_response = self.client.conversations_members(channel=channel_id)
+                members_response = self._call('conversations.members', channel=channel_id)
                 if user_id not in members_response.get('members', []):
                     logger.warning(f"User {user_id} is not a member of channel {channel_id}")
-                    return []
+                    return
             except SlackApiError as e:
                 if e.response['error'] == 'not_in_channel':
                     logger.warning(f"Bot not in channel {channel_id}")
-                    return []
+                    return
                 logger.error(f"Error checking channel membership: {e.response['error']}")
-                return []
+                return
             
-            # Step 3: Fetch unread messages since the last summary
-            logger.info(f"Fetching messages newer than {last_read_ts}")
-            messages = []
-            cursor = None
-            page_count = 0
+            # Step 3: Stream unread messages since the last summary
+            # Unread messages older than 24 hours are discarded anyway, so never
+            # ask the archive for more than that window
+            cutoff_ts = str((datetime.now() - timedelta(hours=24)).timestamp())
+            oldest_ts = max(Decimal(str(last_read_ts)), Decimal(cutoff_ts))
+            logger.info(f"Fetching messages newer than {oldest_ts}")
             newest_ts = None
-            
-            while True:
-                page_count += 1
-                logger.debug(f"Fetching unread messages page {page_count}")
-                
-                response = self.client.conversations_history(
-                    channel=channel_id,
-                    oldest=str(last_read_ts),
-                    cursor=cursor,
-                    limit=200
-                )
-                
-                channel_messages = response.get('messages', [])
-                logger.debug(f"Retrieved {len(channel_messages)} raw messages on page {page_count}")
-                
-                if not channel_messages:
-                    break
-                
-                filtered_count = 0
-                for msg in channel_messages:
-                    if float(msg['ts']) <= float(last_read_ts):
-                        continue
-                    if self._is_valid_unread_message(msg, user_id):
-                        messages.append(msg)
-                        filtered_count += 1
-                        if newest_ts is None or float(msg['ts']) > float(newest_ts):
-                            newest_ts = msg['ts']
-                
-                logger.debug(f"Filtered to {filtered_count} unread messages on page {page_count}")
-                
-                cursor = response.get('response_metadata', {}).get('next_cursor')
-                if not cursor:
-                    break
-                time.sleep(0.5)
+
+            # Archive pages are ts-ordered, so the last kept message is the newest
+            for page in self.archive.iter_messages(channel_id, oldest_ts):
+                unread = [msg for msg in page if self._is_valid_unread_message(msg, user_id)]
+                if unread:
+                    newest_ts = unread[-1]['ts']
+                    yield unread
             
             # Step 4: Update the user's summary timestamp
-            if newest_ts and messages:
+            if newest_ts:
                 UserSummaryState.update_last_summary_ts(user_id, channel_id, newest_ts)
                 logger.info(f"Updated summary timestamp to {newest_ts} for user {user_id}")
-            
-            messages.sort(key=lambda x: float(x['ts']))
-            logger.info(f"Found {len(messages)} truly unread messages for user {user_id} in {channel_id}")
-            return messages
 
         except SlackApiError as e:
             logger.error(f"SlackApiError fetching unread messages from {channel_id}: {e.response['error']}")
-            return []
         except Exception as e:
             logger.error(f"Unexpected error fetching unread messages from {channel_id}: {str(e)}", exc_info=True)
-            return []
     
     def _is_valid_unread_message(self, msg, user_id):
         """Determine if a message is a valid unread message"""
@@ -375,105 +329,75 @@ class SlackService:
 
     def fetch_thread_messages(self, channel_id: str, thread_ts: str) -> list:
         """Fetch all messages in a thread"""
+        return [msg for page in self.iter_thread_messages(channel_id, thread_ts) for msg in page]
+
+    def iter_thread_messages(self, channel_id: str, thread_ts: str) -> Iterator[List[Dict]]:
+        """Yield a thread's messages page by page (conversations.replies returns them oldest first)"""
         try:
-            messages = []
             cursor = None
-            
             while True:
-                response = self.client.conversations_replies(
+                response = self._call(
+                    'conversations.replies',
                     channel=channel_id,
                     ts=thread_ts,
                     cursor=cursor,
                     limit=200
                 )
                 
-                thread_messages = response.get('messages', [])
-                messages.extend([
-                    msg for msg in thread_messages
+                page = [
+                    msg for msg in response.get('messages', [])
                     if self._is_valid_standard_message(msg)
-                ])
+                ]
+                if page:
+                    yield page
                 
                 cursor = response.get('response_metadata', {}).get('next_cursor')
                 if not cursor:
                     break
-                    
-                time.sleep(self.RATE_LIMIT_DELAY)
-            
-            return sorted(messages, key=lambda x: float(x['ts']))
         except Exception as e:
             logger.error(f"Error fetching thread messages: {str(e)}", exc_info=True)
-            return []
 
     def find_latest_thread(self, channel_id: str) -> Optional[dict]:
         """Find the most recent thread in a channel"""
         try:
-            messages = self.fetch_channel_messages(channel_id, hours_back=24)
-            
-            # Filter for messages that have thread_ts (thread parent messages)
-            thread_messages = [
-                msg for msg in messages
-                if msg.get('thread_ts') and msg.get('thread_ts') == msg.get('ts')  # Parent message check
-            ]
-            
-            if thread_messages:
-                latest_thread = max(thread_messages, key=lambda x: float(x['ts']))
-                return {
-                    'thread_ts': latest_thread['ts'],
-                    'text': latest_thread.get('text', ''),
-                    'user': latest_thread.get('user')
-                }
-            
-            return None
+            latest_thread = self._recent_threads(channel_id, hours_back=24).first()
+            return latest_thread.as_dict() if latest_thread else None
         except Exception as e:
             logger.error(f"Error finding latest thread: {str(e)}", exc_info=True)
             return None
 
-    def find_thread_by_topic(self, channel_id: str, topic: str, hours_back: int = 24) -> Optional[dict]:
-        """Find a thread that matches the given topic"""
+    def find_thread_by_topic(self, channel_id: str, topic: str, hours_back: Optional[int] = None) -> Optional[dict]:
+        """Find the thread that best matches the given topic using BM25 over parents and replies"""
         try:
-            messages = self.fetch_channel_messages(channel_id, hours_back=hours_back)
-            
-            # Filter for thread parent messages
-            thread_messages = [
-                msg for msg in messages
-                if msg.get('thread_ts') and msg.get('thread_ts') == msg.get('ts')
-            ]
-            
-            # Find best matching thread based on topic
-            best_match = None
-            highest_similarity = 0
-            
-            for msg in thread_messages:
-                # Simple word matching for now - could be enhanced with better NLP
-                msg_text = msg.get('text', '').lower()
-                topic_words = set(topic.lower().split())
-                
-                # Calculate similarity based on word overlap
-                matching_words = sum(1 for word in topic_words if word in msg_text)
-                similarity = matching_words / len(topic_words) if topic_words else 0
-                
-                if similarity > highest_similarity:
-                    highest_similarity = similarity
-                    best_match = msg
-            
-            if best_match and highest_similarity > 0.3:  # Threshold for minimum similarity
-                return {
-                    'thread_ts': best_match['ts'],
-                    'text': best_match.get('text', ''),
-                    'user': best_match.get('user'),
-                    'similarity': highest_similarity
-                }
-            
-            return None
+            hours_back = hours_back or settings.THREAD_SEARCH_WINDOW_HOURS
+            oldest_ts = self._sync_for_threads(channel_id, hours_back)
+            # Require a minimum share of the topic's terms, like the old word-overlap cutoff
+            matches = self.thread_search.search(channel_id, topic, oldest_ts, k=1, min_coverage=settings.THREAD_SEARCH_MIN_COVERAGE)
+            return matches[0] if matches else None
         except Exception as e:
             logger.error(f"Error finding thread by topic: {str(e)}", exc_info=True)
             return None
 
+    def _recent_threads(self, channel_id: str, hours_back: int):
+        """Bring the channel's archive up to date, then query its thread index"""
+        return ThreadIndex.get_recent(channel_id, self._sync_for_threads(channel_id, hours_back))
+
+    def _sync_for_threads(self, channel_id: str, hours_back: int) -> str:
+        """Sync the archive (and so the thread index) for a window, returning the window's oldest ts"""
+        oldest_ts = normalize_ts((datetime.now() - timedelta(hours=hours_back)).timestamp())
+        try:
+            # Usually a no-op or a small delta; parents pulled here are indexed on record
+            self.archive.sync_channel(channel_id, oldest_ts)
+        except Exception as e:
+            logger.error(f"Error syncing {channel_id} before thread lookup, using index as is: {str(e)}")
+        return oldest_ts
+
     def get_channel_messages(self, channel_id: str, channel_name: str = None) -> Optional[List[Dict]]:
         """Get messages from a channel"""
         try:
             # Get channel history
-            response = self.client.conversations_history(
+            response = self._call(
+                'conversations.history',
                 channel=channel_id,
                 limit=100  # Adjust as needed
             )
@@ -489,7 +413,8 @@ class SlackService:
     def get_thread_messages(self, channel_id: str, thread_ts: str) -> Optional[List[Dict]]:
         """Get messages from a thread"""
         try:
-            response = self.client.conversations_replies(
+            response = self._call(
+                'conversations.replies',
                 channel=channel_id,
                 ts=thread_ts
             )
@@ -505,73 +430,24 @@ class SlackService:
     def list_bot_channels(self) -> List[Dict]:
         """List all channels that the bot is a member of"""
         try:
-            channels = []
-            cursor = None
-            
-            while True:
-                response = self.client.conversations_list(
-                    types='public_channel,private_channel',
-                    exclude_archived=True,
-                    cursor=cursor,
-                    limit=200
-                )
-                
-                if not response.get('ok'):
-                    logger.error(f"Error listing channels: {response.get('error')}")
-                    break
-                
-                for channel in response.get('channels', []):
-                    if channel.get('is_member'):
-                        channels.append({
-                            'id': channel['id'],
-                            'name': channel['name'],
-                            'is_private': channel.get('is_private', False)
-                        })
-                
-                cursor = response.get('response_metadata', {}).get('next_cursor')
-                if not cursor:
-                    break
-                time.sleep(self.RATE_LIMIT_DELAY)
-            
-            return channels
-            
+            return self.channels.bot_channels()
         except Exception as e:
             logger.error(f"Error listing bot channels: {str(e)}")
             return []
 
     def fetch_channel_messages(self, channel_id: str, hours_back: int = 24, oldest_ts: Optional[str] = None) -> List[Dict]:
         """Fetch messages from a channel, either by hours back or since a specific timestamp"""
+        return [msg for page in self.iter_channel_messages(channel_id, hours_back, oldest_ts) for msg in page]
+
+    def iter_channel_messages(self, channel_id: str, hours_back: int = 24, oldest_ts: Optional[str] = None) -> Iterator[List[Dict]]:
+        """Yield a channel's messages in ts-ordered pages, either by hours back or since a specific timestamp"""
+        # Served from the local archive; only the range above the channel's
+        # watermark (and any gap below it) is pulled from Slack
         try:
             if oldest_ts is None:
-                from datetime import datetime, timedelta
                 oldest_ts = str((datetime.now() - timedelta(hours=hours_back)).timestamp())
 
-            messages = []
-            cursor = None
-
-            while True:
-                response = self.client.conversations_history(
-                    channel=channel_id,
-                    oldest=oldest_ts,
-                    cursor=cursor,
-                    limit=200
-                )
-
-                if not response.get('ok'):
-                    logger.error(f"Error fetching messages: {response.get('error')}")
-                    break
-
-                messages.extend(response.get('messages', []))
-                cursor = response.get('response_metadata', {}).get('next_cursor')
-                if not cursor:
-                    break
-                time.sleep(self.RATE_LIMIT_DELAY)
-
-            return sorted(messages, key=lambda x: float(x['ts']))
+            yield from self.archive.iter_messages(channel_id, oldest_ts)
 
         except Exception as e:
             logger.error(f"Error fetching channel messages: {str(e)}")
-            return []
-
-
-
@@ -0,0 +1,99 @@
+import logging
+import threading
+from typing import Dict, List
+from django.db.models import F
+from ..models import ArchivedMessage, ThreadIndex
+from ..utils.bm25 import BM25Index
+
+logger = logging.getLogger(__name__)
+
+
+class _ChannelThreads:
+    """BM25 index over one channel's threads plus the bookkeeping needed to keep it current"""
+
+    def __init__(self):
+        self.index = BM25Index()
+        self.oldest_ts = None  # Threads after this ts are loaded
+        self.seen_at = None  # Newest ThreadIndex.updated_at applied
+        self.lock = threading.Lock()
+
+
+class ThreadSearchService:
+    """Ranked topic search over thread parents and replies, with per-channel in-process indexes"""
+
+    BATCH_SIZE = 500  # Keeps IN (...) lists under SQLite's bound-parameter limit
+
+    def __init__(self):
+        self._channels: Dict[str, _ChannelThreads] = {}
+        self._lock = threading.Lock()
+
+    def search(self, channel_id: str, topic: str, oldest_ts: str, k: int = 5, min_coverage: float = 0.0) -> List[Dict]:
+        """Return up to k threads started after oldest_ts covering more than min_coverage of the topic, best BM25 match first"""
+        channel = self._channel(channel_id)
+        with channel.lock:
+            self._refresh(channel_id, channel, oldest_ts)
+            while True:
+                hits = channel.index.search(topic, k=k, min_coverage=min_coverage)
+                rows = {
+                    row.thread_ts: row
+                    for row in ThreadIndex.objects.filter(channel_id=channel_id, thread_ts__in=[ts for ts, _, _ in hits])
+                }
+                # Threads deleted since they were indexed are dropped here rather than tracked separately
+                deleted = [thread_ts for thread_ts, _, _ in hits if thread_ts not in rows]
+                if not deleted:
+                    break
+                for thread_ts in deleted:
+                    channel.index.remove(thread_ts)
+
+        return [dict(rows[thread_ts].as_dict(), score=score, similarity=coverage) for thread_ts, score, coverage in hits]
+
+    def _channel(self, channel_id: str) -> _ChannelThreads:
+        """Get (or lazily create) the index for a channel"""
+        with self._lock:
+            if channel_id not in self._channels:
+                self._channels[channel_id] = _ChannelThreads()
+            return self._channels[channel_id]
+
+    def _refresh(self, channel_id: str, channel: _ChannelThreads, oldest_ts: str):
+        """Index threads that are new, changed, or older than anything loaded so far, evicting expired ones"""
+        query = ThreadIndex.objects.filter(channel_id=channel_id)
+        if channel.oldest_ts is None or oldest_ts < channel.oldest_ts:
+            # First load, or a wider window than before: (re)load the whole range
+            query = query.filter(thread_ts__gt=oldest_ts)
+            channel.oldest_ts = oldest_ts
+        else:
+            if oldest_ts > channel.oldest_ts:
+                # The window moved on: evict threads that fell out of it so the index stays bounded
+                for thread_ts in channel.index:
+                    if thread_ts <= oldest_ts:
+                        channel.index.remove(thread_ts)
+                channel.oldest_ts = oldest_ts
+            # updated_at is bumped by every reply and parent refresh; >= re-applies ties harmlessly
+            query = query.filter(thread_ts__gt=channel.oldest_ts)
+            if channel.seen_at is not None:
+                query = query.filter(updated_at__gte=channel.seen_at)
+
+        threads = list(query.only('thread_ts', 'parent_text', 'updated_at'))
+        if not threads:
+            return
+
+        replies = self._reply_texts(channel_id, [thread.thread_ts for thread in threads])
+        for thread in threads:
+            channel.index.add(thread.thread_ts, ' '.join([thread.parent_text] + replies.get(thread.thread_ts, [])))
+            if channel.seen_at is None or thread.updated_at > channel.seen_at:
+                channel.seen_at = thread.updated_at
+        logger.debug(f"[THREAD_SEARCH] Indexed {len(threads)} threads for {channel_id} ({len(channel.index)} total)")
+
+    def _reply_texts(self, channel_id: str, thread_ts_list: List[str]) -> Dict[str, List[str]]:
+        """Collect archived reply text for a batch of threads"""
+        replies: Dict[str, List[str]] = {}
+        for start in range(0, len(thread_ts_list), self.BATCH_SIZE):
+            rows = (
+                ArchivedMessage.objects
+                .filter(channel_id=channel_id, thread_ts__in=thread_ts_list[start:start + self.BATCH_SIZE], is_deleted=False)
+                .exclude(ts=F('thread_ts'))
+                .values_list('thread_ts', 'text')
+            )
+            for thread_ts, text in rows:
+                replies.setdefault(thread_ts, []).append(text)
+        return replies
@@ -0,0 +1,102 @@
+import logging
+import threading
+from typing import Dict, Iterable
+from django.conf import settings
+from django.core.cache import cache
+from ..models import SlackUser
+
+logger = logging.getLogger(__name__)
+
+
+class UserDirectoryService:
+    """Workspace user directory backed by the SlackUser model and the cache"""
+    # users.list is Tier 2 and pages through the whole workspace, so it never runs on
+    # the request path: a stale directory is refreshed by a background thread (or the
+    # sync_directories command) while lookups keep serving the names already stored.
+
+    NAMES_CACHE_KEY = 'user_directory_names'
+    SYNCED_CACHE_KEY = 'user_directory_synced'
+    SYNCING_CACHE_KEY = 'user_directory_syncing'
+    SYNC_LOCK_SECONDS = 600
+
+    def __init__(self, slack_service):
+        self.slack_service = slack_service
+
+    def get_names(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        """Resolve display names for a batch of user IDs, hitting Slack only for unknown users"""
+        user_ids = set(user_ids)
+        self.refresh_if_stale()
+
+        names = self._load_names()
+        missing = user_ids - names.keys()
+        if missing:
+            logger.info(f"[USER_DIRECTORY] {len(missing)} users not in directory, looking up individually")
+            for user_id in missing:
+                names[user_id] = self._lookup(user_id)
+            cache.set(self.NAMES_CACHE_KEY, names, settings.USER_DIRECTORY_REFRESH_SECONDS)
+
+        return {user_id: names[user_id] for user_id in user_ids}
+
+    def sync(self):
+        """Bulk-load users.list, writing only profiles that changed since the last sync"""
+        try:
+            known = dict(SlackUser.objects.values_list('user_id', 'profile_updated'))
+            changed, seen, cursor = [], 0, None
+            while True:
+                response = self.slack_service._call('users.list', cursor=cursor, limit=200)
+                for user in response.get('members', []):
+                    seen += 1
+                    if known.get(user['id']) != user.get('updated', 0):
+                        changed.append(SlackUser.from_slack(user))
+                cursor = response.get('response_metadata', {}).get('next_cursor')
+                if not cursor:
+                    break
+
+            SlackUser.upsert_many(changed)
+            cache.delete(self.NAMES_CACHE_KEY)
+            cache.set(self.SYNCED_CACHE_KEY, True, settings.USER_DIRECTORY_REFRESH_SECONDS)
+            logger.info(f"[USER_DIRECTORY] Synced {seen} users, {len(changed)} new or changed")
+        except Exception as e:
+            logger.error(f"[USER_DIRECTORY] Error syncing user directory: {str(e)}", exc_info=True)
+            # Back off instead of retrying on every lookup; stored names are served meanwhile
+            cache.set(self.SYNCED_CACHE_KEY, True, settings.DIRECTORY_SYNC_RETRY_SECONDS)
+
+    def refresh_if_stale(self):
+        """Start a background sync when the directory is due for one, unless a worker is already syncing"""
+        if cache.get(self.SYNCED_CACHE_KEY) or not cache.add(self.SYNCING_CACHE_KEY, True, self.SYNC_LOCK_SECONDS):
+            return
+        threading.Thread(target=self._background_sync, name='user-directory-sync', daemon=True).start()
+
+    def handle_event(self, event: Dict):
+        """Apply a user_change or team_join event to the directory"""
+        user = event.get('user')
+        if not isinstance(user, dict) or not user.get('id'):
+            return
+        SlackUser.upsert_many([SlackUser.from_slack(user)])
+        cache.delete(self.NAMES_CACHE_KEY)
+        logger.info(f"[USER_DIRECTORY] Updated {user['id']} from {event.get('type')} event")
+
+    def _background_sync(self):
+        try:
+            self.sync()
+        finally:
+            cache.delete(self.SYNCING_CACHE_KEY)
+
+    def _load_names(self) -> Dict[str, str]:
+        """Get the id -> name map from the cache, rebuilding it from the database on a miss"""
+        names = cache.get(self.NAMES_CACHE_KEY)
+        if names is None:
+            names = {user.user_id: user.best_name for user in SlackUser.objects.all()}
+            cache.set(self.NAMES_CACHE_KEY, names, settings.USER_DIRECTORY_REFRESH_SECONDS)
+        return names
+
+    def _lookup(self, user_id: str) -> str:
+        """Fetch a single user missing from the directory and store it"""
+        try:
+            response = self.slack_service._call('users.info', user=user_id)
+            user = SlackUser.from_slack(response['user'])
+            SlackUser.upsert_many([user])
+            return user.best_name
+        except Exception as e:
+            logger.error(f"[USER_DIRECTORY] Error looking up user {user_id}: {str(e)}")
+            return f'User_{user_id}'
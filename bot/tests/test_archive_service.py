@@ -0,0 +1,122 @@
+import asyncio
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import Mock
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from bot.models import ChannelSyncState, ThreadIndex
+from bot.services.archive_service import MessageArchiveService, normalize_ts
+from bot.services.async_slack_service import AsyncSlackService
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def archive():
+    return MessageArchiveService(Mock())
+
+
+def test_normalize_ts_pads_to_six_decimals():
+    assert normalize_ts('1700000000.1') == '1700000000.100000'
+    assert normalize_ts(1700000000) == '1700000000.000000'
+
+
+def test_plan_sync_pulls_whole_window_for_new_channel(archive):
+    assert archive.plan_sync('C1', '1700000000') == [('1700000000.000000', None, False)]
+
+
+def test_plan_sync_pulls_only_delta_above_watermark(archive):
+    ChannelSyncState.objects.create(channel_id='C1', oldest_ts='1700000000.000000', latest_ts='1700005000.000000')
+    assert archive.plan_sync('C1', '1700001000') == [('1700005000.000000', None, False)]
+
+
+def test_plan_sync_fills_gap_below_low_water_mark(archive):
+    ChannelSyncState.objects.create(channel_id='C1', oldest_ts='1700000000.000000', latest_ts='1700005000.000000')
+    assert archive.plan_sync('C1', '1699990000') == [
+        ('1699990000.000000', '1700000000.000000', True),
+        ('1700005000.000000', None, False),
+    ]
+
+
+def test_plan_sync_skips_delta_while_events_keep_channel_live(archive):
+    ChannelSyncState.objects.create(
+        channel_id='C1', oldest_ts='1700000000.000000', latest_ts='1700005000.000000', events_at=timezone.now()
+    )
+    assert archive.plan_sync('C1', '1700001000') == []
+
+
+def test_plan_sync_reconciles_once_live_window_expires(archive, settings):
+    state = ChannelSyncState.objects.create(
+        channel_id='C1', oldest_ts='1700000000.000000', latest_ts='1700005000.000000', events_at=timezone.now()
+    )
+    ChannelSyncState.objects.filter(pk=state.pk).update(
+        synced_at=timezone.now() - timedelta(seconds=settings.ARCHIVE_RECONCILE_SECONDS + 1)
+    )
+    assert archive.plan_sync('C1', '1700001000') == [('1700005000.000000', None, False)]
+
+
+def test_sync_channel_records_pulled_messages_and_moves_watermark(archive):
+    archive.slack_service.fetch_history_range.return_value = [
+        {'type': 'message', 'ts': '1700000100.000000', 'user': 'U1', 'text': 'hello'},
+        {'type': 'message', 'ts': '1700000200.000000', 'user': 'U2', 'text': 'hi'},
+    ]
+    state = archive.sync_channel('C1', '1700000000')
+    assert (state.oldest_ts, state.latest_ts) == ('1700000000.000000', '1700000200.000000')
+    assert [msg['text'] for page in archive.read_pages('C1', '1700000000') for msg in page] == ['hello', 'hi']
+
+
+def test_parent_archived_before_its_first_reply_is_indexed_on_refresh(archive):
+    parent_ts = normalize_ts(time.time() - 3600)
+    archive.slack_service.fetch_history_range.return_value = [{'type': 'message', 'ts': parent_ts, 'user': 'U1', 'text': 'deploy?'}]
+    archive.sync_channel('C1', time.time() - 7200)
+    assert not ThreadIndex.objects.exists()
+
+    # Once the refresh is due again, the recent window is re-pulled, not just the delta
+    cache.clear()
+    [(range_oldest, range_latest, _)] = archive.plan_sync('C1', time.time() - 7200)
+    assert Decimal(range_oldest) < Decimal(parent_ts) and range_latest is None
+    archive.slack_service.fetch_history_range.return_value = [{
+        'type': 'message', 'ts': parent_ts, 'thread_ts': parent_ts, 'user': 'U1', 'text': 'deploy?',
+        'reply_count': 2, 'latest_reply': normalize_ts(time.time()), 'reply_users': ['U2'],
+    }]
+    archive.sync_channel('C1', time.time() - 7200)
+    assert ThreadIndex.objects.get(channel_id='C1', thread_ts=parent_ts).reply_count == 2
+
+
+def test_thread_refresh_runs_once_per_reconcile_interval(archive):
+    archive.slack_service.fetch_history_range.return_value = [{'type': 'message', 'ts': normalize_ts(time.time() - 60), 'text': 'hi'}]
+    state = archive.sync_channel('C1', time.time() - 7200)
+    assert archive.plan_sync('C1', time.time() - 7200) == [(state.latest_ts, None, False)]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_fetch_refreshes_threads_once_then_pulls_only_the_delta():
+    service = AsyncSlackService(concurrency=2)
+    pulled = []
+
+    async def fetch_history_range(channel_id, oldest_ts, latest_ts=None, inclusive=False):
+        pulled.append((channel_id, oldest_ts))
+        return [{'type': 'message', 'ts': normalize_ts(time.time() - 60), 'user': 'U1', 'text': f"hi {channel_id}"}]
+
+    service.fetch_history_range = fetch_history_range
+    asyncio.run(service.fetch_many_channels(['C1', 'C2']))
+    watermarks = dict(ChannelSyncState.objects.values_list('channel_id', 'latest_ts'))
+
+    pulled.clear()
+    asyncio.run(service.fetch_many_channels(['C1', 'C2']))
+    assert sorted(pulled) == [('C1', watermarks['C1']), ('C2', watermarks['C2'])]
+
+    # While message events keep a channel live, nothing is planned at all
+    pulled.clear()
+    ChannelSyncState.objects.filter(channel_id='C1').update(events_at=timezone.now())
+    asyncio.run(service.fetch_many_channels(['C1']))
+    assert pulled == []
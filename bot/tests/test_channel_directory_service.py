@@ -0,0 +1,81 @@
+from unittest.mock import Mock, patch
+import pytest
+from django.core.cache import cache
+from bot.models import SlackChannel
+from bot.services.channel_directory_service import ChannelDirectoryService
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def directory():
+    slack_service = Mock()
+    slack_service.get_bot_user_id.return_value = 'UBOT'
+    return ChannelDirectoryService(slack_service)
+
+
+def listing(*channels):
+    return {'channels': [{'id': channel_id, 'name': name, 'is_member': True} for channel_id, name in channels]}
+
+
+def test_known_names_are_served_without_calling_slack(directory):
+    SlackChannel.objects.create(channel_id='C1', name='general')
+    cache.set(ChannelDirectoryService.SYNCED_CACHE_KEY, True)
+    assert directory.resolve_names(['#general']) == {'general': 'C1'}
+    directory.slack_service._call.assert_not_called()
+
+
+def test_unknown_name_waits_for_a_sync_once_a_minute(directory):
+    SlackChannel.objects.create(channel_id='C1', name='general')
+    cache.set(ChannelDirectoryService.SYNCED_CACHE_KEY, True)
+    directory.slack_service._call.return_value = listing(('C1', 'general'), ('C2', 'brand-new'))
+    assert directory.resolve_names(['#general', '#brand-new']) == {'general': 'C1', 'brand-new': 'C2'}
+    assert directory.resolve_name('#typo') is None
+    assert directory.slack_service._call.call_count == 1
+
+
+def test_cold_directory_syncs_before_answering(directory):
+    directory.slack_service._call.return_value = listing(('C1', 'general'), ('C2', 'random'))
+    assert directory.resolve_name('#random') == 'C2'
+    assert [channel['id'] for channel in directory.bot_channels()] == ['C1', 'C2']
+    directory.slack_service._call.assert_called_once()
+
+
+def test_sync_prunes_channels_no_longer_listed(directory):
+    SlackChannel.objects.create(channel_id='COLD', name='deleted-quietly')
+    directory.slack_service._call.return_value = listing(('C1', 'general'), ('C2', 'random'))
+    directory.sync()
+    assert set(SlackChannel.objects.values_list('channel_id', flat=True)) == {'C1', 'C2'}
+
+
+def test_failed_sync_backs_off(directory):
+    directory.slack_service._call.side_effect = RuntimeError('ratelimited')
+    directory._locked_sync()
+    with patch('bot.services.channel_directory_service.threading.Thread') as thread:
+        directory.refresh_if_stale()
+    thread.assert_not_called()
+
+
+def test_member_events_are_applied_off_the_ack_path(directory):
+    SlackChannel.objects.create(channel_id='C1', name='general', num_members=3)
+    with patch('bot.services.channel_directory_service.threading.Thread') as thread:
+        directory.handle_event({'type': 'member_joined_channel', 'channel': 'C1', 'user': 'UBOT'})
+    directory.slack_service.get_bot_user_id.assert_not_called()
+    assert thread.call_args.kwargs['args'] == ('member_joined_channel', 'C1', 'UBOT')
+
+    directory._apply_member_event('member_joined_channel', 'C1', 'UBOT')
+    channel = SlackChannel.objects.get(channel_id='C1')
+    assert (channel.num_members, channel.is_member) == (4, True)
+
+
+def test_member_count_never_goes_negative(directory):
+    SlackChannel.objects.create(channel_id='C1', name='general', num_members=0)
+    directory._apply_member_event('member_left_channel', 'C1', 'U1')
+    assert SlackChannel.objects.get(channel_id='C1').num_members == 0
@@ -0,0 +1,58 @@
+from datetime import datetime
+import pytest
+from bot.models import SlackUser
+from bot.services.extractive_summary_service import ExtractiveSummaryService
+from bot.services.prompt_canonicalizer import PromptCanonicalizer
+
+START = int(datetime(2026, 10, 16, 9, 0).timestamp())
+
+pytestmark = pytest.mark.django_db
+
+
+def message(minute, username, text, **fields):
+    return dict({'ts': f"{START + minute * 60}.000000", 'user_id': f"U{username}", 'username': username, 'text': text}, **fields)
+
+
+MESSAGES = [
+    message(0, 'alice', 'We decided to ship the billing migration on Friday.'),
+    message(5, 'carol', '<@Ucarol> has joined the channel', subtype='channel_join'),
+    message(6, 'dave', '<@Udave> has joined the channel'),
+    message(30, 'bob', 'Who owns the rollback plan?'),
+    message(90, 'alice', 'Staging is down, this is a blocker.'),
+]
+
+
+@pytest.fixture
+def service():
+    return ExtractiveSummaryService(PromptCanonicalizer())
+
+
+def test_report_states_the_real_timeframe(service):
+    report = service.summarize(MESSAGES, 'billing')
+    assert report.startswith('Summary Report – #billing')
+    assert 'Messages analyzed: 5\nTimeframe: 09:00–10:30 on 2026-10-16 (extractive summary)' in report
+    assert 'Last 24 hours' not in report
+
+
+def test_membership_chatter_is_not_a_contribution(service):
+    report = service.summarize(MESSAGES, 'billing')
+    assert '• 2 users actively involved; most active: alice, bob.' in report
+    assert 'joined' not in report
+
+
+def test_thread_reports_are_titled_as_threads(service):
+    assert service.summarize(MESSAGES[:1], 'thread', thread=True).startswith('Summary Report – Thread\n')
+
+
+def test_raw_slack_messages_are_credited_to_directory_names(service):
+    SlackUser.objects.create(user_id='U1', display_name='Alice')
+    SlackUser.objects.create(user_id='U2', real_name='Bob Stone')
+    raw = [
+        {'ts': f"{START}.000000", 'user': 'U1', 'text': 'We decided to ship the billing migration on Friday.'},
+        {'ts': f"{START + 60}.000000", 'user': 'U2', 'text': 'Who owns the rollback plan?'},
+        {'ts': f"{START + 120}.000000", 'user': 'U1', 'text': 'Staging is down, this is a blocker.'},
+    ]
+    report = service.summarize(raw, 'thread', thread=True)
+    assert '• 2 users actively involved; most active: Alice, Bob Stone.' in report
+    assert '• Alice: We decided to ship the billing migration on Friday.' in report
+    assert 'Someone' not in report and 'Unknown' not in report
@@ -0,0 +1,48 @@
+import threading
+from bot.utils.fan_out import fan_out
+
+
+def test_results_come_back_in_input_order():
+    results = fan_out(lambda n: n * 2, [3, 1, 2], workers=3, deadline=5)
+    assert [result.item for result in results] == [3, 1, 2]
+    assert [result.value for result in results] == [6, 2, 4]
+    assert all(result.ok for result in results)
+
+
+def test_error_is_captured_per_job():
+    def job(n):
+        if n == 2:
+            raise ValueError('bad channel')
+        return n
+
+    results = fan_out(job, [1, 2, 3], workers=2, deadline=5)
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, ValueError)
+    assert results[1].value is None
+
+
+def test_overrunning_job_times_out_without_its_value():
+    release = threading.Event()
+    finished = threading.Event()
+
+    def job(n):
+        if n == 'slow':
+            release.wait(5)
+            finished.set()
+            return 'late'
+        return n
+
+    try:
+        results = fan_out(job, ['fast', 'slow'], workers=2, deadline=0.2)
+    finally:
+        release.set()
+    assert results[0].ok and results[0].value == 'fast'
+    assert not results[1].ok
+    assert isinstance(results[1].error, TimeoutError)
+    # The job still runs to the end in the background, but its value is never reported
+    assert finished.wait(5)
+    assert results[1].value is None
+
+
+def test_empty_input():
+    assert fan_out(lambda n: n, []) == []
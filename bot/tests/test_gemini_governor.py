@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from bot.utils.gemini_governor import GeminiGovernor
+
+LIMITS = override_settings(GEMINI_MAX_CONCURRENCY=1, GEMINI_RPM_LIMIT=10, GEMINI_TPM_LIMIT=1000, GEMINI_QUOTA_MARGIN=0)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def governor():
+    with LIMITS:
+        yield GeminiGovernor(namespace='test_governor')
+
+
+def slot_is_free(governor):
+    if not governor._slots.acquire(blocking=False):
+        return False
+    governor._slots.release()
+    return True
+
+
+def test_acquire_and_release_charge_prompt_and_response(governor):
+    assert asyncio.run(governor.acquire_async(100, timeout=1))
+    assert not slot_is_free(governor)
+    governor.release(50)
+    assert slot_is_free(governor)
+    assert governor.headroom()['tokens'] == pytest.approx(850, abs=1)
+
+
+def test_no_free_slot_sheds_without_taking_one(governor):
+    assert asyncio.run(governor.acquire_async(10, timeout=1))
+    assert not asyncio.run(governor.acquire_async(10, timeout=0.1))
+    governor.release()
+    assert slot_is_free(governor)
+
+
+def test_shed_after_quota_wait_gives_the_slot_back(governor):
+    governor.on_quota_error(retry_after=30)
+    assert not asyncio.run(governor.acquire_async(10, timeout=0.1))
+    assert slot_is_free(governor)
+
+
+def test_cancelled_while_waiting_for_quota_gives_the_slot_back(governor):
+    governor.on_quota_error(retry_after=30)
+
+    async def cancel_while_queued():
+        task = asyncio.ensure_future(governor.acquire_async(10, timeout=10))
+        await asyncio.sleep(0.05)
+        assert not slot_is_free(governor)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_queued())
+    assert slot_is_free(governor)
@@ -0,0 +1,61 @@
+import pytest
+from bot.services.gemini_service import GeminiService
+from bot.tests.test_segment_summary_service import window
+from bot.utils.importance import score_messages, select_top_k
+
+
+def message(ts, text, user='U1', **fields):
+    return dict({'ts': f"{ts}.000000", 'user_id': user, 'text': text}, **fields)
+
+
+MESSAGES = [
+    message(1, 'ok', user='U1'),
+    message(2, 'Urgent: prod is down, need a rollback owner asap?', user='U2', reactions=4),
+    message(3, 'ok', user='U1'),
+    message(4, 'lunch', user='U1'),
+]
+
+
+def test_score_favours_reactions_keywords_and_questions():
+    scores = score_messages(MESSAGES)
+    assert max(range(len(scores)), key=scores.__getitem__) == 1
+
+
+def test_small_windows_are_kept_whole():
+    assert select_top_k(MESSAGES, 10) == MESSAGES
+
+
+def test_top_k_keeps_original_order():
+    selected = select_top_k(MESSAGES, 2)
+    assert len(selected) == 2 and MESSAGES[1] in selected
+    assert selected == sorted(selected, key=lambda msg: msg['ts'])
+
+
+def test_parent_is_back_filled_and_counts_toward_k():
+    messages = [
+        message(1, 'anyone around to review the release notes', user='U1'),
+        message(2, 'ok', user='U1'),
+        message(3, 'Approved, blocker fixed, please release asap?', user='U2', thread_ts='1.000000', reactions=5),
+        message(4, 'ok', user='U1'),
+    ]
+    assert select_top_k(messages, 2) == [messages[0], messages[2]]
+
+
+def test_a_unit_costs_one_and_brings_all_its_members():
+    storm = [message(ts, f"disk alert {ts}", user='B1') for ts in range(1, 6)]
+    messages = storm + [message(6, 'Decided: we will rotate the disks, owner bob?', user='U2', reactions=2)]
+    units = [[0, 1, 2, 3, 4], [5]]
+    assert select_top_k(messages, 2, units) == messages
+    assert select_top_k(messages, 1, units) == [messages[5]]
+
+
+@pytest.mark.django_db
+def test_fit_input_budget_shrinks_until_the_lines_fit():
+    service = GeminiService()
+    messages = window()
+    canonical = service.canonicalizer.canonicalize(messages)
+    budget = canonical.tokens_after // 4
+    selected, fitted = service._fit_input_budget(messages, canonical, budget)
+    assert fitted.tokens_after <= budget
+    assert 0 < len(selected) < len(messages)
+    assert fitted.lines == service.canonicalizer.canonicalize(selected).lines
@@ -0,0 +1,45 @@
+from datetime import datetime
+from bot.utils.message_batch import MessageBatch, describe_span, micros_to_ts, ts_to_micros
+
+
+def test_ts_round_trips_without_float_rounding():
+    assert ts_to_micros('1700000000.000100') == 1_700_000_000_000_100
+    assert ts_to_micros('1700000000') == 1_700_000_000_000_000
+    assert micros_to_ts(1_700_000_000_000_100) == '1700000000.000100'
+
+
+def test_dedupe_keeps_last_copy_in_ts_order():
+    batch = MessageBatch.from_messages([
+        {'ts': '2.000000', 'user': 'U1', 'text': 'second'},
+        {'ts': '1.000000', 'user': 'U1', 'text': 'first'},
+        {'ts': '2.000000', 'user': 'U1', 'text': 'second (edited)'},
+    ]).dedupe()
+    assert batch.texts == ['first', 'second (edited)']
+
+
+def test_has_user_and_watermark():
+    batch = MessageBatch.from_messages([
+        {'ts': '5.000000', 'text': 'joined', 'subtype': 'bot_message'},
+        {'ts': '3.000000', 'user': 'U1', 'text': 'hi'},
+        {'text': 'no ts'},
+    ])
+    assert len(batch) == 2
+    assert batch.watermark('4.000000') == '5.000000'
+    assert batch.has_user().watermark() == '3.000000'
+    assert MessageBatch.from_messages([]).watermark('4.000000') == '4.000000'
+
+
+def test_to_enriched_resolves_names_and_counts_reactions():
+    batch = MessageBatch.from_messages([{
+        'ts': '1700000000.000000', 'user': 'U1', 'text': 'ship it', 'reply_count': 2,
+        'reactions': [{'name': 'tada', 'count': 3}, {'name': '+1', 'count': 1}],
+    }])
+    [enriched] = batch.to_enriched({'U1': 'alice'})
+    assert (enriched['username'], enriched['reactions'], enriched['reply_count']) == ('alice', 4, 2)
+
+
+def test_describe_span_covers_one_or_several_days():
+    morning = datetime(2026, 10, 16, 9, 5).timestamp()
+    assert describe_span([{'ts': f"{morning:.6f}"}, {'ts': f"{morning + 3600:.6f}"}]) == '09:05–10:05 on 2026-10-16'
+    assert describe_span([{'ts': f"{morning:.6f}"}, {'ts': f"{morning + 86400:.6f}"}]) == '2026-10-16 09:05 to 2026-10-17 09:05'
+    assert describe_span([{'text': 'no ts'}]) == 'Unknown'
@@ -0,0 +1,62 @@
+import pytest
+from django.core.cache import cache, caches
+from bot.models import SegmentSummary
+from bot.services.gemini_service import GeminiService
+from bot.services.model_router import ModelRouter
+from bot.tests.test_segment_summary_service import window
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    cache.clear()
+    caches['summaries'].clear()
+    yield
+    cache.clear()
+    caches['summaries'].clear()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = GeminiService()
+    calls = []
+
+    def respond(prompt, on_progress=None, tier=None):
+        calls.append(tier)
+        return 'condensed notes' if 'condensing one slice' in prompt else 'REPORT'
+
+    monkeypatch.setattr(service, '_get_ai_response', respond)
+    service.calls = calls
+    return service
+
+
+def test_route_by_size_kind_and_headroom(settings):
+    settings.ROUTER_LOCAL_MAX_TOKENS = 100
+    settings.ROUTER_LARGE_MIN_TOKENS = 1000
+    settings.ROUTER_LOW_HEADROOM = 0.2
+    router = ModelRouter(default_model=None)
+    assert router.route('report', 50) == ModelRouter.LOCAL
+    assert router.route('answer', 50) == ModelRouter.DEFAULT
+    assert router.route('report', 500) == ModelRouter.DEFAULT
+    assert router.route('report', 5000) == ModelRouter.LARGE
+    assert router.route('all', 5000) == ModelRouter.SMALL
+    assert router.route('report', 5000, headroom=0.1) == ModelRouter.DEFAULT
+    assert router.route('report', 500, headroom=0) == ModelRouter.LOCAL
+
+
+@pytest.mark.django_db
+def test_large_tier_takes_the_window_in_one_call(service, settings):
+    settings.SUMMARY_CHUNK_TOKENS = 1500
+    settings.ROUTER_LARGE_MIN_TOKENS = 2000
+    assert service.generate_summary(window(), 'general', channel_id='C1')
+    assert service.calls == [ModelRouter.LARGE]
+    assert not SegmentSummary.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_default_tier_still_segments_large_windows(service, settings):
+    settings.SUMMARY_CHUNK_TOKENS = 1500
+    settings.SUMMARY_SEGMENT_MIN_TOKENS = 10
+    settings.SUMMARY_MAP_CONCURRENCY = 1
+    assert service.generate_summary(window(), 'general', channel_id='C1')
+    assert service.calls[-1] == ModelRouter.DEFAULT and len(service.calls) > 1
+    assert SegmentSummary.objects.count() == 3
@@ -0,0 +1,54 @@
+from unittest.mock import patch
+import pytest
+from django.core.cache import cache
+from bot.utils.rate_limiter import SlackRateLimiter, TokenBucket
+
+NOW = 1_699_999_980.0  # Start of a minute (and of a 15s window)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def clock():
+    with patch('bot.utils.rate_limiter.time.time', return_value=NOW) as mocked:
+        yield mocked
+
+
+def test_burst_is_a_quarter_of_the_minute_then_callers_queue(clock):
+    bucket = TokenBucket('conversations.history', 60)
+    waits = [bucket.reserve() for _ in range(20)]
+    assert waits[:15] == [0.0] * 15
+    assert waits[15:] == [15.0] * 5
+
+
+def test_allowance_is_shared_between_bucket_instances(clock):
+    # Each worker builds its own bucket objects; the counts live in the cache
+    first, second = TokenBucket('users.list', 20), TokenBucket('users.list', 20)
+    assert [first.reserve() for _ in range(5)] == [0.0] * 5
+    assert second.reserve() == 15.0
+
+
+def test_slow_tiers_get_windows_long_enough_for_one_call(clock):
+    bucket = TokenBucket('tier1.method', 1)
+    assert [bucket.reserve(), bucket.reserve()] == [0.0, 60.0]
+
+
+def test_rate_limit_blocks_and_halves_the_allowance(clock):
+    bucket = TokenBucket('conversations.history', 60)
+    bucket.penalize(5)
+    assert bucket.reserve() == 5.0
+    assert bucket._factor() == 0.5
+    for _ in range(5):
+        bucket.reward()
+    assert bucket._factor() == pytest.approx(0.75)
+
+
+def test_limiter_reuses_one_bucket_per_method():
+    limiter = SlackRateLimiter()
+    assert limiter.bucket('chat.update') is limiter.bucket('chat.update')
+    assert limiter.bucket('chat.update').per_window == 12.5
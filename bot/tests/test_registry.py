@@ -0,0 +1,26 @@
+from unittest.mock import patch
+import pytest
+from django.core.cache import cache
+from bot.services.registry import get_slack_service
+from bot.services.slack_service import SlackService
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_slack_service_is_shared():
+    assert get_slack_service() is get_slack_service()
+
+
+def test_bot_user_id_is_cached_with_a_finite_timeout():
+    service = get_slack_service()
+    with patch.object(service, '_call', return_value={'user_id': 'UBOT'}) as call, \
+            patch('bot.services.slack_service.cache.set', wraps=cache.set) as cache_set:
+        assert service.get_bot_user_id() == 'UBOT'
+        assert service.get_bot_user_id() == 'UBOT'
+    call.assert_called_once_with('auth.test')
+    cache_set.assert_called_once_with(SlackService.BOT_USER_ID_CACHE_KEY, 'UBOT', SlackService.BOT_USER_ID_CACHE_SECONDS)
@@ -0,0 +1,107 @@
+import random
+from datetime import datetime
+import pytest
+from django.core.cache import cache, caches
+from bot.models import SegmentSummary
+from bot.services.gemini_service import GeminiService
+
+# Buckets are condensed on worker threads, which need committed rows and their own connections
+pytestmark = pytest.mark.django_db(transaction=True)
+
+HOUR = 1_700_000_000 // 3600 * 3600
+NAMES = ['alice.smith', 'alice.jones', 'bob']
+WORDS = ('api db queue cache deploy rollback release review tests flaky staging prod index schema migration '
+         'alert pager oncall latency budget customer ticket roadmap design sprint retro demo backlog').split()
+
+
+def window(hours=3, per_hour=30):
+    rng = random.Random(7)
+    return [
+        {
+            'ts': f"{HOUR + hour * 3600 + minute * 60}.000000",
+            'timestamp': datetime.fromtimestamp(HOUR + hour * 3600 + minute * 60),
+            'user_id': f"U{(hour + minute) % 3}",
+            'username': NAMES[(hour + minute) % 3],
+            'text': ' '.join(rng.choice(WORDS) for _ in range(12)),
+        }
+        for hour in range(hours) for minute in range(per_hour)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    cache.clear()
+    caches['summaries'].clear()
+    yield
+    cache.clear()
+    caches['summaries'].clear()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = GeminiService()
+    prompts = []
+
+    def respond(prompt, on_progress=None, tier=None):
+        prompts.append(prompt)
+        return 'condensed notes' if 'condensing one slice' in prompt else 'REPORT'
+
+    monkeypatch.setattr(service, '_get_ai_response', respond)
+    service.prompts = prompts
+    return service
+
+
+def test_window_that_fits_one_prompt_is_not_segmented(service, settings):
+    settings.SUMMARY_SEGMENT_MIN_TOKENS = 10
+    assert service.generate_summary(window(), 'general', channel_id='C1')
+    assert len(service.prompts) == 1
+    assert not SegmentSummary.objects.exists()
+
+
+def test_large_window_is_canonicalized_once_and_buckets_are_reused(service, settings):
+    settings.SUMMARY_CHUNK_TOKENS = 1500
+    settings.SUMMARY_SEGMENT_MIN_TOKENS = 10
+    settings.SUMMARY_MAP_CONCURRENCY = 1
+    messages = window()
+    service.generate_summary(messages, 'general', channel_id='C1')
+
+    *condense, final = service.prompts
+    assert len(condense) == 3 and SegmentSummary.objects.count() == 3
+    # Every bucket sees the same legend, so 'alice' and 'alice2' mean the same people everywhere
+    legends = {line for prompt in condense for line in prompt.splitlines() if line.startswith('[People:')}
+    assert legends == {'[People: alice=alice.smith, alice2=alice.jones]'}
+    assert final.count('[+N = minutes after') == 1
+
+    caches['summaries'].clear()
+    service.prompts.clear()
+    service.generate_summary(messages, 'general', channel_id='C1')
+    assert len(service.prompts) == 1
+
+
+def test_sliding_window_reuses_notes_for_its_cut_first_bucket(service, settings):
+    settings.SUMMARY_CHUNK_TOKENS = 1500
+    settings.SUMMARY_SEGMENT_MIN_TOKENS = 10
+    settings.SUMMARY_MAP_CONCURRENCY = 1
+    messages = window()
+    service.generate_summary(messages, 'general', channel_id='C1')
+
+    # Half an hour later the window starts mid-way through its first bucket
+    caches['summaries'].clear()
+    service.prompts.clear()
+    service.generate_summary(messages[10:], 'general', channel_id='C1')
+    assert len(service.prompts) == 1
+
+
+def test_unread_views_keep_their_own_notes(service, settings):
+    settings.SUMMARY_CHUNK_TOKENS = 1200
+    settings.SUMMARY_SEGMENT_MIN_TOKENS = 10
+    settings.SUMMARY_MAP_CONCURRENCY = 1
+    unread = [msg for msg in window() if msg['user_id'] != 'U0']
+    service.summarize_unread_messages(unread, 'general', 'alice.smith', channel_id='C1')
+    assert SegmentSummary.objects.filter(variant='unread:alice.smith').count() == 3
+    assert not SegmentSummary.objects.filter(variant='').exists()
+
+    caches['summaries'].clear()
+    service.prompts.clear()
+    service.summarize_unread_messages(unread, 'general', 'alice.smith', channel_id='C1')
+    assert len(service.prompts) == 1
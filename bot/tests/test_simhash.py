@@ -0,0 +1,48 @@
+import pytest
+from bot.services.prompt_canonicalizer import PromptCanonicalizer
+from bot.utils.simhash import cluster_near_duplicates, simhash
+
+ALERTS = [f"CPU usage on web-{host} is at {load}% for the last 5 minutes" for host, load in ((1, 91), (2, 97), (7, 93))]
+
+
+def test_simhash_ignores_case_and_digits():
+    assert simhash('Deploy 42 finished') == simhash('deploy 17 finished')
+    assert simhash('deploy finished') != simhash('rollback started now')
+
+
+def test_exact_and_near_duplicates_cluster_in_input_order():
+    texts = ['lunch at noon?', 'the build is green again after the flaky test fix landed today',
+             'lunch at noon?', 'the build is green again after the flaky test fix landed today!']
+    assert cluster_near_duplicates(texts) == [[0, 2], [1, 3]]
+
+
+def test_distinct_texts_stay_apart():
+    texts = ['lunch at noon?', 'who owns the billing migration', 'ship it']
+    assert cluster_near_duplicates(texts) == [[0], [1], [2]]
+
+
+def test_numbers_must_match_unless_templated():
+    assert cluster_near_duplicates(ALERTS) == [[0], [1], [2]]
+    assert cluster_near_duplicates(ALERTS, templated=[True] * 3) == [[0, 1, 2]]
+    assert cluster_near_duplicates(['Approved PR 12', 'Approved PR 99']) == [[0], [1]]
+
+
+@pytest.mark.django_db
+def test_canonicalizer_collapses_bot_storms_but_not_human_numbers():
+    messages = [
+        {'ts': '1700000000.000000', 'user_id': 'U1', 'username': 'alice', 'text': 'Approved PR 12'},
+        {'ts': '1700000060.000000', 'user_id': 'U2', 'username': 'bob', 'text': 'Approved PR 99'},
+    ] + [
+        {'ts': f"{1700000120 + 60 * index}.000000", 'user_id': 'B1', 'username': 'alertbot', 'bot_id': 'B1', 'text': text}
+        for index, text in enumerate(ALERTS)
+    ]
+    body = PromptCanonicalizer().canonicalize(messages).lines[1:]
+    assert body[:2] == ['+0 alice: Approved PR 12', '+1 bob: Approved PR 99']
+    assert body[2:] == [f"+2..+4 alertbot x3: {ALERTS[0]}"]
+
+
+@pytest.mark.django_db
+def test_canonicalizer_treats_an_authors_repeated_template_as_an_alert():
+    messages = [{'ts': f"{1700000000 + 60 * index}.000000", 'user_id': 'U9', 'username': 'monitor', 'text': text}
+                for index, text in enumerate(ALERTS)]
+    assert PromptCanonicalizer().canonicalize(messages).lines[1:] == [f"+0..+2 monitor x3: {ALERTS[0]}"]
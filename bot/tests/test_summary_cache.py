@@ -0,0 +1,46 @@
+from datetime import datetime
+from unittest.mock import patch
+import pytest
+from django.core.cache import caches
+from bot.services.gemini_service import GeminiService
+from bot.utils.summary_cache import SummaryCache, fingerprint_messages
+
+MESSAGES = [
+    {'ts': '1700000000.000100', 'user_id': 'U1', 'username': 'alice', 'text': 'ship it'},
+    {'ts': '1700000060.000100', 'user_id': 'U2', 'username': 'bob', 'text': 'shipped'},
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    caches['summaries'].clear()
+    yield
+    caches['summaries'].clear()
+
+
+def test_fingerprint_changes_on_edit():
+    edited = [dict(MESSAGES[0], edited={'ts': '1700000100.000000'}), MESSAGES[1]]
+    assert fingerprint_messages(MESSAGES) == fingerprint_messages(list(MESSAGES))
+    assert fingerprint_messages(MESSAGES) != fingerprint_messages(edited)
+
+
+def test_round_trip_is_keyed_by_kind_scope_and_prompt_version():
+    cache = SummaryCache()
+    key = cache.key('report', ['general'], MESSAGES, 1)
+    cache.set(key, 'Summary Report – #general')
+    assert cache.get(key) == 'Summary Report – #general'
+    assert cache.get(cache.key('report', ['general'], MESSAGES, 2)) is None
+    assert cache.get(cache.key('report', ['random'], MESSAGES, 1)) is None
+
+
+@pytest.mark.django_db
+def test_cached_report_is_stamped_when_served():
+    service = GeminiService()
+    key = SummaryCache().key('report', ['general'], MESSAGES, service.PROMPT_VERSION)
+    SummaryCache().set(key, 'Summary Report – #general\n\nSummary Details\nMessages analyzed: 2')
+    with patch.object(service, '_generate') as generate:
+        text = service.generate_summary(MESSAGES, 'general')['text']
+    generate.assert_not_called()
+    generated = datetime.strptime(text.rsplit('Generated: ', 1)[1], '%Y-%m-%d %H:%M')
+    assert abs((datetime.now() - generated).total_seconds()) < 120
+    assert text.count('Generated:') == 1
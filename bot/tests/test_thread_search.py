@@ -0,0 +1,48 @@
+import pytest
+from bot.models import ThreadIndex
+from bot.services.thread_search_service import ThreadSearchService
+from bot.utils.bm25 import BM25Index, tokenize
+
+
+def test_tokenize_stems_and_drops_stopwords_and_markup():
+    assert tokenize('The <@U123> deployments failed') == ['deploy', 'fail']
+
+
+def test_coverage_filter_applies_before_top_k():
+    index = BM25Index()
+    # 'narrow' scores highest on one rare query term; 'broad' covers more of the query
+    index.add('narrow', 'rollback rollback rollback')
+    index.add('broad', 'database migration')
+    for doc_id in range(3):
+        index.add(doc_id, 'database migration notes')
+    assert [doc for doc, _, _ in index.search('database migration rollback', k=1)] == ['narrow']
+    assert [doc for doc, _, _ in index.search('database migration rollback', k=1, min_coverage=0.5)] == ['broad']
+
+
+def test_remove_drops_postings():
+    index = BM25Index()
+    index.add('a', 'release notes')
+    index.remove('a')
+    assert len(index) == 0 and index.postings == {} and index.total_length == 0
+
+
+@pytest.mark.django_db
+def test_index_evicts_threads_that_left_the_window():
+    ThreadIndex.objects.create(channel_id='C1', thread_ts='1700000100.000000', parent_text='release checklist')
+    ThreadIndex.objects.create(channel_id='C1', thread_ts='1700000900.000000', parent_text='release retro')
+    service = ThreadSearchService()
+
+    assert len(service.search('C1', 'release', '1700000000.000000')) == 2
+    hits = service.search('C1', 'release', '1700000500.000000')
+    assert [hit['thread_ts'] for hit in hits] == ['1700000900.000000']
+    assert list(service._channel('C1').index) == ['1700000900.000000']
+
+
+@pytest.mark.django_db
+def test_deleted_top_hit_falls_through_to_the_next_match():
+    ThreadIndex.objects.create(channel_id='C1', thread_ts='1700000100.000000', parent_text='release release release')
+    ThreadIndex.objects.create(channel_id='C1', thread_ts='1700000200.000000', parent_text='release notes')
+    service = ThreadSearchService()
+    service.search('C1', 'release', '1700000000.000000')
+    ThreadIndex.objects.filter(thread_ts='1700000100.000000').delete()
+    assert [hit['thread_ts'] for hit in service.search('C1', 'release', '1700000000.000000', k=1)] == ['1700000200.000000']
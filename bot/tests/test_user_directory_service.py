@@ -0,0 +1,52 @@
+from unittest.mock import Mock, patch
+import pytest
+from django.core.cache import cache
+from bot.models import SlackUser
+from bot.services.user_directory_service import UserDirectoryService
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def directory():
+    return UserDirectoryService(Mock())
+
+
+def test_stale_directory_serves_stored_names_and_syncs_in_background(directory):
+    SlackUser.objects.create(user_id='U1', display_name='alice')
+    with patch('bot.services.user_directory_service.threading.Thread') as thread:
+        assert directory.get_names(['U1']) == {'U1': 'alice'}
+    directory.slack_service._call.assert_not_called()
+    thread.return_value.start.assert_called_once()
+
+
+def test_only_one_background_sync_at_a_time(directory):
+    with patch('bot.services.user_directory_service.threading.Thread') as thread:
+        directory.refresh_if_stale()
+        directory.refresh_if_stale()
+    assert thread.return_value.start.call_count == 1
+
+
+def test_failed_sync_backs_off_instead_of_retrying_on_every_lookup(directory):
+    directory.slack_service._call.side_effect = RuntimeError('ratelimited')
+    directory._background_sync()
+    with patch('bot.services.user_directory_service.threading.Thread') as thread:
+        directory.refresh_if_stale()
+    thread.assert_not_called()
+
+
+def test_sync_writes_only_changed_profiles(directory):
+    SlackUser.objects.create(user_id='U1', display_name='alice', profile_updated=10)
+    directory.slack_service._call.return_value = {'members': [
+        {'id': 'U1', 'updated': 10, 'profile': {'display_name': 'renamed'}},
+        {'id': 'U2', 'updated': 5, 'profile': {'display_name': 'bob'}},
+    ]}
+    directory.sync()
+    assert dict(SlackUser.objects.values_list('user_id', 'display_name')) == {'U1': 'alice', 'U2': 'bob'}
@@ -0,0 +1,100 @@
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Hashable, Iterator, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9_'-]*")
+
+# Slack markup (<@U123>, <#C123|name>, <https://...|label>) carries no topic words
+MARKUP_PATTERN = re.compile(r'<[^>]*>')
+
+STOPWORDS = frozenset("""
+a about an and are as at be but by for from has have how i in is it its me my of on or our so that the
+their them there this to us was we were what when where which who why will with you your
+""".split())
+
+SUFFIXES = ('ments', 'ment', 'ing', 'ed', 'es', 's')
+
+
+def stem(token: str) -> str:
+    """Strip a common English suffix so 'deploys', 'deployed' and 'deployment' share a term"""
+    for suffix in SUFFIXES:
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase, stemmed terms with stopwords removed"""
+    text = MARKUP_PATTERN.sub(' ', text.lower())
+    return [stem(token) for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring and incremental add/remove"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[Hashable, int]] = {}
+        self.doc_terms: Dict[Hashable, Counter] = {}
+        self.doc_lengths: Dict[Hashable, int] = {}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_lengths
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self.doc_lengths))
+
+    def add(self, doc_id: Hashable, text: str):
+        """Index a document, replacing any previous version with the same id"""
+        self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+        self.doc_terms[doc_id] = terms
+        self.doc_lengths[doc_id] = sum(terms.values())
+        self.total_length += self.doc_lengths[doc_id]
+
+    def remove(self, doc_id: Hashable):
+        """Drop a document from the index if present"""
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def search(self, query: str, k: int = 5, min_coverage: float = 0.0) -> List[Tuple[Hashable, float, float]]:
+        """Return the top-k (doc_id, score, coverage) matches covering more than min_coverage of the query terms"""
+        query_terms = set(tokenize(query))
+        if not query_terms or not self.doc_lengths:
+            return []
+
+        doc_count = len(self.doc_lengths)
+        average_length = self.total_length / doc_count or 1.0
+        scores: Dict[Hashable, float] = {}
+        matched: Counter = Counter()
+        for term in query_terms:
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, frequency in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+                matched[doc_id] += 1
+
+        # Filter before ranking so a high-scoring but narrow match cannot take the last top-k slot
+        candidates = ((doc_id, score) for doc_id, score in scores.items() if matched[doc_id] / len(query_terms) > min_coverage)
+        top = heapq.nlargest(k, candidates, key=lambda item: item[1])
+        return [(doc_id, score, matched[doc_id] / len(query_terms)) for doc_id, score in top]
+
@@ -0,0 +1,76 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, List, Optional
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutResult:
+    """Outcome of one fanned-out job: its input item plus either a value or an error"""
+
+    __slots__ = ('item', 'value', 'error')
+
+    def __init__(self, item, value=None, error: Optional[BaseException] = None):
+        self.item = item
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def fan_out(fn: Callable[[Any], Any], items: Iterable, workers: Optional[int] = None, deadline: Optional[float] = None) -> List[FanOutResult]:
+    """Run fn over items on a bounded pool, returning per-item results in input order"""
+    # Each job gets `deadline` seconds from when it starts. An overrunning job is
+    # reported as a TimeoutError and no longer waited on (its thread finishes in
+    # the background); errors are captured per job so one item never fails the rest.
+    items = list(items)
+    if not items:
+        return []
+    workers = min(len(items), workers or settings.FANOUT_WORKERS)
+    deadline = deadline or settings.FANOUT_DEADLINE_SECONDS
+    results: List[Optional[FanOutResult]] = [None] * len(items)
+    started = {}
+
+    def run(index, item):
+        started[index] = time.monotonic()
+        try:
+            return fn(item)
+        finally:
+            # Worker threads open their own DB connections; don't leave them behind
+            connections.close_all()
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(run, index, item): index for index, item in enumerate(items)}
+        pending = set(futures)
+        while pending:
+            done, _ = wait(pending, timeout=_next_expiry(pending, futures, started, deadline), return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures[future]
+                error = future.exception()
+                results[index] = FanOutResult(items[index], None if error else future.result(), error)
+                pending.discard(future)
+
+            now = time.monotonic()
+            for future in list(pending):
+                index = futures[future]
+                if index in started and now - started[index] >= deadline:
+                    logger.warning(f"[FAN_OUT] Job {index} exceeded its {deadline}s deadline")
+                    results[index] = FanOutResult(items[index], error=TimeoutError(f"exceeded {deadline}s deadline"))
+                    pending.discard(future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+def _next_expiry(pending, futures, started, deadline) -> float:
+    """Seconds until the earliest running job hits its deadline (or a full deadline if none has started)"""
+    now = time.monotonic()
+    remaining = [started[futures[future]] + deadline - now for future in pending if futures[future] in started]
+    return max(0.05, min(remaining, default=deadline))
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60
+
+
+class GeminiQuotaExceeded(Exception):
+    """Raised when a Gemini call is shed because the quota had no room for it in time"""
+
+
+class GeminiGovernor:
+    """Keep Gemini calls under the per-minute request and token quotas shared by all workers"""
+    # Usage is counted per minute window in the cache (shared across workers with a
+    # shared backend such as Redis) and smoothed with the previous window, so a burst
+    # right after a window rolls over is still held back. Callers queue until their
+    # prompt fits or GEMINI_QUEUE_SECONDS pass, after which the call is shed.
+
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, namespace: str = 'gemini_governor'):
+        self.namespace = namespace
+        self._slots = threading.BoundedSemaphore(settings.GEMINI_MAX_CONCURRENCY)
+
+    async def acquire_async(self, prompt_tokens: int, timeout: Optional[float] = None) -> bool:
+        """Reserve one request and prompt_tokens of quota, waiting up to timeout seconds (GEMINI_QUEUE_SECONDS by default)"""
+        timeout = settings.GEMINI_QUEUE_SECONDS if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while not self._slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                logger.warning(f"[GEMINI_GOVERNOR] Shedding call: {settings.GEMINI_MAX_CONCURRENCY} calls already in flight")
+                return False
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+        try:
+            while True:
+                outcome = self._reserve_or_shed(prompt_tokens, deadline, timeout)
+                if outcome is not None:
+                    break
+                await asyncio.sleep(min(self.POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+        except BaseException:
+            # Cancelled (a hedge lost, a deadline hit) or failed while queued: give the slot back
+            self._slots.release()
+            raise
+        if not outcome:
+            self._slots.release()
+        return outcome
+
+    def release(self, response_tokens: int = 0):
+        """Finish a call started with acquire_async, charging the tokens of its response"""
+        self._slots.release()
+        if response_tokens:
+            self._add(self._keys(self._window())[1], response_tokens)
+
+    def on_quota_error(self, retry_after: Optional[float] = None):
+        """Pause all workers after the provider rejected a call for quota"""
+        retry_after = retry_after or settings.GEMINI_QUOTA_COOLDOWN_SECONDS
+        logger.warning(f"[GEMINI_GOVERNOR] Quota exceeded at the provider, pausing calls for {retry_after}s")
+        cache.set(f"{self.namespace}:cooldown", True, retry_after)
+
+    def headroom(self) -> Dict[str, float]:
+        """Requests and tokens still available in the current minute, and the smaller of the two as a fraction"""
+        rpm, tpm = self._limits()
+        requests, tokens = self._usage()
+        if self._cooling_down():
+            requests, tokens = rpm, tpm
+        free_requests = max(0.0, rpm - requests)
+        free_tokens = max(0.0, tpm - tokens)
+        return {
+            'requests': free_requests,
+            'tokens': free_tokens,
+            'ratio': min(free_requests / rpm, free_tokens / tpm),
+        }
+
+    def _reserve_or_shed(self, prompt_tokens: int, deadline: float, timeout: float) -> Optional[bool]:
+        """True once quota is reserved, False once the deadline passed, None to keep waiting"""
+        # A prompt larger than the whole budget would never fit; let it through alone
+        prompt_tokens = min(prompt_tokens, self._limits()[1])
+        if not self._cooling_down() and self._try_reserve(prompt_tokens):
+            return True
+        if time.monotonic() >= deadline:
+            logger.warning(f"[GEMINI_GOVERNOR] Shedding call of ~{prompt_tokens} tokens after {timeout}s in queue")
+            return False
+        return None
+
+    def _try_reserve(self, prompt_tokens: int) -> bool:
+        """Count the call against the current window, backing it out again if that overshoots a limit"""
+        rpm, tpm = self._limits()
+        window = self._window()
+        requests_key, tokens_key = self._keys(window)
+        requests = self._add(requests_key, 1)
+        tokens = self._add(tokens_key, prompt_tokens)
+        previous_requests, previous_tokens = self._carry_over(window)
+
+        # The first call of an idle window always goes through, whatever its size
+        if requests == 1 and previous_requests == 0:
+            return True
+        if requests + previous_requests <= rpm and tokens + previous_tokens <= tpm:
+            return True
+
+        self._add(requests_key, -1)
+        self._add(tokens_key, -prompt_tokens)
+        return False
+
+    def _usage(self) -> Tuple[float, float]:
+        window = self._window()
+        requests_key, tokens_key = self._keys(window)
+        values = cache.get_many([requests_key, tokens_key])
+        previous_requests, previous_tokens = self._carry_over(window)
+        return values.get(requests_key, 0) + previous_requests, values.get(tokens_key, 0) + previous_tokens
+
+    def _carry_over(self, window: int) -> Tuple[float, float]:
+        """Share of the previous window still counted, fading out as the current window progresses"""
+        weight = 1 - (time.time() % WINDOW_SECONDS) / WINDOW_SECONDS
+        requests_key, tokens_key = self._keys(window - 1)
+        values = cache.get_many([requests_key, tokens_key])
+        return values.get(requests_key, 0) * weight, values.get(tokens_key, 0) * weight
+
+    def _add(self, key: str, delta: int) -> int:
+        cache.add(key, 0, WINDOW_SECONDS * 2)
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            # Expired between add and incr; start the count again
+            cache.set(key, delta, WINDOW_SECONDS * 2)
+            return delta
+
+    def _cooling_down(self) -> bool:
+        return bool(cache.get(f"{self.namespace}:cooldown"))
+
+    def _limits(self) -> Tuple[float, float]:
+        """Effective requests and tokens per minute, keeping GEMINI_QUOTA_MARGIN of the quota in reserve"""
+        share = 1 - settings.GEMINI_QUOTA_MARGIN
+        return max(1.0, settings.GEMINI_RPM_LIMIT * share), max(1.0, settings.GEMINI_TPM_LIMIT * share)
+
+    def _window(self) -> int:
+        return int(time.time() // WINDOW_SECONDS)
+
+    def _keys(self, window: int) -> Tuple[str, str]:
+        return f"{self.namespace}:{window}:requests", f"{self.namespace}:{window}:tokens"
+
+
+# Shared by every GeminiService in the process so all calls draw from the same quota
+gemini_governor = GeminiGovernor()
@@ -0,0 +1,71 @@
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+MENTION_PATTERN = re.compile(r'<[@!][^>]*>')
+# Words that tend to mark decisions, asks and incidents
+KEYWORD_PATTERN = re.compile(
+    r'\b(decid\w*|agreed|approved|blocker|blocked|urgent|asap|incident|outage|down|rollback|deadline|'
+    r'action items?|todo|owner|eta|release|launch|fix(?:ed)?|bug|please|need)\b',
+    re.IGNORECASE,
+)
+
+REACTION_WEIGHT = 1.5
+REPLY_WEIGHT = 2.0
+MENTION_WEIGHT = 0.75
+KEYWORD_WEIGHT = 1.0
+QUESTION_WEIGHT = 0.5
+RARE_AUTHOR_WEIGHT = 1.0
+LENGTH_WEIGHT = 0.25
+
+
+def score_messages(messages: List[Dict]) -> List[float]:
+    """Importance score per message from reactions, replies, mentions, keywords and how rarely its author posts"""
+    author_counts = Counter(msg.get('user_id') or msg.get('user') or msg.get('username') for msg in messages)
+    scores = []
+    for msg in messages:
+        text = msg.get('text', '')
+        score = (
+            REACTION_WEIGHT * math.log1p(msg.get('reactions', 0))
+            + REPLY_WEIGHT * math.log1p(msg.get('reply_count', 0))
+            + MENTION_WEIGHT * min(3, len(MENTION_PATTERN.findall(text)))
+            + KEYWORD_WEIGHT * min(3, len(KEYWORD_PATTERN.findall(text)))
+            + QUESTION_WEIGHT * ('?' in text)
+            # Quiet participants get heard; one chatty author cannot crowd out everyone else
+            + RARE_AUTHOR_WEIGHT / author_counts[msg.get('user_id') or msg.get('user') or msg.get('username')]
+            + LENGTH_WEIGHT * math.log1p(len(text.split()))
+        )
+        scores.append(score)
+    return scores
+
+
+def select_top_k(messages: List[Dict], k: int, units: Optional[List[List[int]]] = None) -> List[Dict]:
+    """The k most important units plus the thread parents of any selected replies, in their original order"""
+    # A unit is a group of message indexes shown as one prompt line (a collapsed near-duplicate
+    # group); it costs one of the k and ranks by its best member. Without units, every message
+    # is its own unit. A back-filled parent counts toward k like any other unit.
+    if units is None:
+        units = [[index] for index in range(len(messages))]
+    if len(units) <= k:
+        return [messages[index] for index in sorted(index for unit in units for index in unit)]
+
+    scores = score_messages(messages)
+    unit_of = {index: position for position, unit in enumerate(units) for index in unit}
+    parents = {msg['ts']: index for index, msg in enumerate(messages) if msg.get('ts')}
+    # Max-heap by score; ties go to the later unit, which is usually the more current one
+    heap = [(-max(scores[index] for index in unit), -position) for position, unit in enumerate(units) if unit]
+    heapq.heapify(heap)
+
+    selected = set()
+    while heap and len(selected) < k:
+        _, position = heapq.heappop(heap)
+        selected.add(-position)
+        # A reply makes little sense without the message it answers
+        for index in units[-position]:
+            thread_ts = messages[index].get('thread_ts')
+            if thread_ts and thread_ts != messages[index].get('ts') and parents.get(thread_ts) in unit_of:
+                selected.add(unit_of[parents[thread_ts]])
+
+    return [messages[index] for index in sorted(index for position in selected for index in units[position])]
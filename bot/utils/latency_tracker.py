@@ -0,0 +1,25 @@
+import threading
+from collections import deque
+from typing import Optional
+
+
+class LatencyTracker:
+    """Rolling window of call latencies, used to pick hedging delays"""
+
+    MIN_SAMPLES = 20  # Percentiles of fewer samples are too noisy to act on
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """The pct-th percentile latency in seconds, or None until enough calls were seen"""
+        with self.lock:
+            if len(self.samples) < self.MIN_SAMPLES:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
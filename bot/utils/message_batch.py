@@ -0,0 +1,107 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+MICROS = 1_000_000
+
+
+def ts_to_micros(ts) -> int:
+    """Convert a Slack ts ('1700000000.000100') to integer microseconds without float rounding"""
+    seconds, _, fraction = str(ts).partition('.')
+    return int(seconds) * MICROS + int((fraction + '000000')[:6])
+
+
+def micros_to_ts(micros: int) -> str:
+    """Convert integer microseconds back to the 6-decimal Slack ts string"""
+    seconds, fraction = divmod(int(micros), MICROS)
+    return f"{seconds}.{fraction:06d}"
+
+
+def describe_span(messages: Iterable[Dict]) -> str:
+    """Readable local time range covered by messages, e.g. '09:12–14:30 on 2026-10-16'"""
+    stamps = [ts_to_micros(msg['ts']) // MICROS for msg in messages if msg.get('ts')]
+    if not stamps:
+        return 'Unknown'
+    first, last = datetime.fromtimestamp(min(stamps)), datetime.fromtimestamp(max(stamps))
+    if first.date() == last.date():
+        return f"{first:%H:%M}–{last:%H:%M} on {first:%Y-%m-%d}"
+    return f"{first:%Y-%m-%d %H:%M} to {last:%Y-%m-%d %H:%M}"
+
+
+class MessageBatch:
+    """Columnar batch of Slack messages: int64 microsecond ts, interned user codes and the raw payloads"""
+
+    __slots__ = ('ts', 'user_codes', 'users', 'texts', 'payloads')
+
+    def __init__(self, ts: np.ndarray, user_codes: np.ndarray, users: List[str], texts: List[str], payloads: List[Dict]):
+        self.ts = ts
+        self.user_codes = user_codes  # Index into users, -1 when the message has no user
+        self.users = users
+        self.texts = texts
+        self.payloads = payloads
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[Dict]) -> 'MessageBatch':
+        """Build a batch from raw Slack message dicts, skipping any without a ts"""
+        payloads = [msg for msg in messages if msg.get('ts')]
+        codes: Dict[str, int] = {}
+        user_codes = np.fromiter(
+            (codes.setdefault(msg['user'], len(codes)) if msg.get('user') else -1 for msg in payloads),
+            dtype=np.int32,
+            count=len(payloads)
+        )
+        ts = np.fromiter((ts_to_micros(msg['ts']) for msg in payloads), dtype=np.int64, count=len(payloads))
+        return cls(ts, user_codes, list(codes), [msg.get('text', '') for msg in payloads], payloads)
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def take(self, indices) -> 'MessageBatch':
+        """Select rows by index array (or boolean mask), sharing the interned user table"""
+        indices = np.flatnonzero(indices) if getattr(indices, 'dtype', None) == bool else np.asarray(indices, dtype=np.intp)
+        return MessageBatch(
+            self.ts[indices],
+            self.user_codes[indices],
+            self.users,
+            [self.texts[i] for i in indices],
+            [self.payloads[i] for i in indices]
+        )
+
+    def dedupe(self) -> 'MessageBatch':
+        """Keep the last copy of each ts (the freshest edit), returning rows in ts order"""
+        _, reversed_first = np.unique(self.ts[::-1], return_index=True)
+        return self.take(len(self) - 1 - reversed_first)
+
+    def has_user(self) -> 'MessageBatch':
+        """Keep rows that have a user"""
+        return self.take(self.user_codes >= 0)
+
+    def watermark(self, current_ts=None) -> Optional[str]:
+        """Return the highest ts among the rows and current_ts"""
+        newest = int(self.ts.max()) if len(self) else None
+        if current_ts is not None:
+            current = ts_to_micros(current_ts)
+            newest = current if newest is None else max(newest, current)
+        return micros_to_ts(newest) if newest is not None else None
+
+    def user_ids(self) -> List[str]:
+        """Distinct user IDs present in the batch"""
+        return [self.users[code] for code in np.unique(self.user_codes) if code >= 0]
+
+    def to_enriched(self, user_names: Dict[str, str]) -> List[Dict]:
+        """Dicts in the enriched shape the summarizers consume, built only at the edge"""
+        names = [user_names.get(user_id, f'User_{user_id}') for user_id in self.users]
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(int(ts) / MICROS),
+                'username': names[code],
+                'text': text,
+                'user_id': self.users[code],
+                'ts': payload['ts'],
+                'thread_ts': payload.get('thread_ts'),
+                'reply_count': payload.get('reply_count', 0),
+                'reactions': sum(reaction.get('count', 0) for reaction in payload.get('reactions', ()))
+            }
+            for ts, code, text, payload in zip(self.ts, self.user_codes, self.texts, self.payloads)
+            if code >= 0
+        ]
@@ -0,0 +1,52 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CURSOR = ' :writing_hand:'
+
+
+class ProgressiveMessage:
+    """A Slack message that is posted as a placeholder and rewritten as generated text streams in"""
+    # Updates are throttled to one per SUMMARY_STREAM_UPDATE_SECONDS so a fast stream
+    # does not burn through the chat.update rate limit; the final text always lands.
+
+    def __init__(self, slack_service, channel: str, placeholder: str):
+        self.slack_service = slack_service
+        self.channel = channel
+        self.placeholder = placeholder
+        self.ts: Optional[str] = None
+        self.last_update = 0.0
+        self.lock = threading.Lock()
+
+    def start(self) -> bool:
+        """Post the placeholder, returning False if the channel cannot be posted to"""
+        self.ts = self.slack_service.post_message(self.channel, self.placeholder)
+        return self.ts is not None
+
+    def update(self, text: str):
+        """Show the text generated so far, skipping updates that come too soon after the last one"""
+        current = time.monotonic()
+        with self.lock:
+            if not self.ts or current - self.last_update < settings.SUMMARY_STREAM_UPDATE_SECONDS:
+                return
+            self.last_update = current
+        self._write(text + CURSOR)
+
+    def finish(self, text: str, blocks: Optional[List[Dict]] = None) -> bool:
+        """Replace the message with its final content"""
+        if not self.ts:
+            return False
+        return self._write(text, blocks)
+
+    def _write(self, text: str, blocks: Optional[List[Dict]] = None) -> bool:
+        try:
+            self.slack_service.update_message(self.channel, self.ts, text, blocks=blocks)
+            return True
+        except Exception as e:
+            # A missed intermediate update is harmless; the next one carries the full text
+            logger.warning(f"[PROGRESSIVE] Could not update {self.channel}/{self.ts}: {str(e)}")
+            return False
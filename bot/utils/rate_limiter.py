@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Requests per minute allowed by each Slack Web API rate limit tier
+TIER_LIMITS = {
+    1: 1,
+    2: 20,
+    3: 50,
+    4: 100,
+    'special': 60,  # chat.postMessage: roughly one message per second
+}
+
+# Tier of each Web API method the bot calls
+METHOD_TIERS = {
+    'auth.test': 4,
+    'chat.postMessage': 'special',
+    'chat.update': 3,
+    'conversations.history': 3,
+    'conversations.info': 3,
+    'conversations.list': 2,
+    'conversations.members': 4,
+    'conversations.replies': 3,
+    'users.info': 4,
+    'users.list': 2,
+    'views.open': 4,
+}
+DEFAULT_TIER = 3
+
+
+def get_retry_after(response, default: float = 1.0) -> float:
+    """Read the Retry-After header (in seconds) from a rate-limited Slack response"""
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After', headers.get('retry-after'))
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    """Per-method rate bucket kept in the shared cache, so every worker draws from one allowance"""
+    # The allowance is handed out in windows of WINDOW_SECONDS (longer for methods allowed
+    # less than once per window). Each caller atomically counts itself into the earliest
+    # window that still has room and sleeps until that window opens. A 429 blocks the
+    # method for Retry-After and halves its rate for all workers; successes win it back.
+
+    RECOVERY_STEP = 0.05  # Fraction of the ceiling regained per successful call
+    BACKOFF_FACTOR = 0.5
+    MIN_FACTOR = 0.1
+    WINDOW_SECONDS = 15  # Burst allowed at once: a quarter of the per-minute limit
+    MAX_LOOKAHEAD = 40  # Windows searched for room before the caller just waits out the last one
+    FACTOR_TTL = 3600
+
+    def __init__(self, method: str, per_minute: float, namespace: str = 'slack_rate'):
+        self.window_seconds = max(self.WINDOW_SECONDS, 60.0 / per_minute)
+        self.per_window = per_minute * self.window_seconds / 60.0
+        self.prefix = f"{namespace}:{method}"
+
+    def reserve(self) -> float:
+        """Take one call from the allowance, returning how many seconds the caller must wait before making it"""
+        current = time.time()
+        start = max(current, cache.get(f"{self.prefix}:blocked_until", 0.0))
+        allowed = max(1, int(self.per_window * self._factor()))
+        window = int(start // self.window_seconds)
+        for _ in range(self.MAX_LOOKAHEAD):
+            if self._add(window) <= allowed:
+                break
+            window += 1
+        return max(0.0, max(start, window * self.window_seconds) - current)
+
+    def penalize(self, retry_after: float):
+        """Block the method for retry_after seconds and halve its rate"""
+        blocked_until = max(cache.get(f"{self.prefix}:blocked_until", 0.0), time.time() + retry_after)
+        cache.set(f"{self.prefix}:blocked_until", blocked_until, retry_after + 1)
+        cache.set(f"{self.prefix}:factor", max(self.MIN_FACTOR, self._factor() * self.BACKOFF_FACTOR), self.FACTOR_TTL)
+
+    def reward(self):
+        """Additively move the rate back towards the tier ceiling"""
+        factor = self._factor()
+        if factor < 1.0:
+            cache.set(f"{self.prefix}:factor", min(1.0, factor + self.RECOVERY_STEP), self.FACTOR_TTL)
+
+    def _factor(self) -> float:
+        """Share of the tier ceiling currently allowed, lowered by recent 429s"""
+        return cache.get(f"{self.prefix}:factor", 1.0)
+
+    def _add(self, window: int) -> int:
+        key = f"{self.prefix}:{window}"
+        timeout = int(self.window_seconds * (self.MAX_LOOKAHEAD + 2))
+        cache.add(key, 0, timeout)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Expired between add and incr; start the count again
+            cache.set(key, 1, timeout)
+            return 1
+
+
+class SlackRateLimiter:
+    """Per-method rate buckets sized by Slack rate limit tier and shared by all workers through the cache"""
+
+    def __init__(self, tier_limits: Optional[Dict] = None, method_tiers: Optional[Dict] = None):
+        self.tier_limits = tier_limits or TIER_LIMITS
+        self.method_tiers = method_tiers or METHOD_TIERS
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, method: str) -> TokenBucket:
+        """Get (or lazily create) the bucket for a Web API method"""
+        with self.lock:
+            if method not in self.buckets:
+                tier = self.method_tiers.get(method, DEFAULT_TIER)
+                self.buckets[method] = TokenBucket(method, self.tier_limits[tier])
+            return self.buckets[method]
+
+    def acquire(self, method: str):
+        """Block the calling thread until a call to method is allowed"""
+        wait = self.bucket(method).reserve()
+        if wait > 0:
+            logger.debug(f"[RATE_LIMIT] Waiting {wait:.2f}s before {method}")
+            time.sleep(wait)
+
+    async def acquire_async(self, method: str):
+        """Suspend the calling coroutine until a call to method is allowed"""
+        wait = self.bucket(method).reserve()
+        if wait > 0:
+            logger.debug(f"[RATE_LIMIT] Waiting {wait:.2f}s before {method}")
+            await asyncio.sleep(wait)
+
+    def on_rate_limited(self, method: str, retry_after: float):
+        """Learn from a 429 response for method"""
+        logger.warning(f"[RATE_LIMIT] {method} rate limited, retrying after {retry_after:.1f}s")
+        self.bucket(method).penalize(retry_after)
+
+    def on_success(self, method: str):
+        """Record a successful call to method"""
+        self.bucket(method).reward()
+
+
+# Shared by every Slack client in the process; the bucket state itself lives in the cache
+slack_rate_limiter = SlackRateLimiter()
@@ -0,0 +1,63 @@
+import hashlib
+import re
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+BITS = 64
+WORD_PATTERN = re.compile(r'\w+')
+# Alert bots repeat templates with varying ids, counts and times; digits are hashed alike
+DIGITS_PATTERN = re.compile(r'\d+')
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of a text's word trigrams (or words, for texts of under three words)"""
+    words = WORD_PATTERN.findall(DIGITS_PATTERN.sub('0', text.lower()))
+    features = [' '.join(words[i:i + 3]) for i in range(len(words) - 2)] or words
+    if not features:
+        return 0
+    digests = np.frombuffer(b''.join(hashlib.blake2b(feature.encode(), digest_size=8).digest() for feature in features), dtype=np.uint8)
+    # One row of 64 bits per feature; a bit is set where most features set it
+    votes = np.unpackbits(digests.reshape(len(features), 8), axis=1).sum(axis=0) * 2 > len(features)
+    return int.from_bytes(np.packbits(votes).tobytes(), 'big')
+
+
+def cluster_near_duplicates(texts: Sequence[str], max_distance: int = 3, templated: Optional[Sequence[bool]] = None) -> List[List[int]]:
+    """Group indexes of texts whose SimHashes differ in at most max_distance bits, each group in input order"""
+    # LSH banding: split the hash into max_distance + 1 bands. Two hashes within
+    # max_distance bits must agree on at least one whole band, so only texts sharing
+    # a band are compared, which keeps the work near-linear for distinct texts.
+    # Only texts flagged in templated (bot output, repeated templates) may differ in
+    # their numbers; other texts group only with ones carrying the same numbers, so
+    # "Approved PR 12" and "Approved PR 99" stay apart.
+    hashes = [simhash(text) for text in texts]
+    numbers = [None if templated and templated[index] else tuple(DIGITS_PATTERN.findall(text)) for index, text in enumerate(texts)]
+    bands = max_distance + 1
+    width = BITS // bands
+    mask = (1 << width) - 1
+    parent = list(range(len(texts)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    for band in range(bands):
+        buckets: Dict[int, List[int]] = {}
+        for index, value in enumerate(hashes):
+            buckets.setdefault(value >> (band * width) & mask, []).append(index)
+        for members in buckets.values():
+            # Compare each text with one representative per group already seen in this bucket
+            representatives = [members[0]]
+            for index in members[1:]:
+                match = next((rep for rep in representatives
+                              if numbers[index] == numbers[rep] and bin(hashes[index] ^ hashes[rep]).count('1') <= max_distance), None)
+                if match is None:
+                    representatives.append(index)
+                elif find(index) != find(match):
+                    parent[find(index)] = find(match)
+
+    clusters: Dict[int, List[int]] = {}
+    for index in range(len(texts)):
+        clusters.setdefault(find(index), []).append(index)
+    return sorted(clusters.values(), key=lambda members: members[0])
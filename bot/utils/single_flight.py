@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """One in-progress computation that other threads can wait on"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one computation.
+
+    Threads in a process wait on the leader's Event. Other workers see the
+    leader's lock in the cache backend and poll for the result it publishes,
+    so cross-worker coalescing needs a shared backend such as Redis.
+    """
+
+    POLL_INTERVAL = 0.25
+
+    def __init__(self, namespace: str = 'single_flight'):
+        self.namespace = namespace
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn once per key across concurrent callers and return its result to all of them"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            logger.info(f"[SINGLE_FLIGHT] Joining in-flight {key}")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._run_across_workers(key, fn)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _run_across_workers(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Compute under a cache lock, or wait for the worker holding it to publish its result"""
+        lock_key = f"{self.namespace}:lock:{key}"
+        result_key = f"{self.namespace}:result:{key}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_SECONDS
+        # Tokens of the flights we waited on; older published results are not reused
+        waited_on = set()
+
+        while not cache.add(lock_key, token, settings.SINGLE_FLIGHT_LOCK_SECONDS):
+            holder = cache.get(lock_key)
+            if holder:
+                waited_on.add(holder)
+            published = cache.get(result_key)
+            if published is not None and published['token'] in waited_on:
+                logger.info(f"[SINGLE_FLIGHT] Reusing result of {key} from another worker")
+                return published['value']
+            if time.monotonic() > deadline:
+                logger.warning(f"[SINGLE_FLIGHT] Gave up waiting for {key}, computing locally")
+                return fn()
+            time.sleep(self.POLL_INTERVAL)
+
+        try:
+            # The flight we waited on may have finished between two polls
+            published = cache.get(result_key)
+            if published is not None and published['token'] in waited_on:
+                return published['value']
+
+            value = fn()
+            cache.set(result_key, {'token': token, 'value': value}, settings.SINGLE_FLIGHT_RESULT_SECONDS)
+            return value
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,57 @@
+import hashlib
+import logging
+import zlib
+from typing import Dict, Iterable, Optional
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint_messages(messages: Iterable[Dict]) -> str:
+    """Hash the ts and content version of each message, so any new, edited or deleted message changes it"""
+    digest = hashlib.blake2b(digest_size=16)
+    for msg in messages:
+        edited = msg.get('edited', {}).get('ts', '') if isinstance(msg.get('edited'), dict) else ''
+        digest.update(f"{msg.get('ts', '')}|{edited}|{msg.get('user') or msg.get('user_id', '')}|".encode())
+        digest.update(msg.get('text', '').encode())
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """Compressed cache of generated summaries, keyed by what was summarized and how"""
+
+    def __init__(self, alias: str = 'summaries'):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def key(self, kind: str, scope: Iterable, messages: Iterable[Dict], prompt_version: int) -> str:
+        """Build a key from the summary kind, its scope (channel, user, topic...), the message set and prompt version"""
+        scope_part = hashlib.blake2b('|'.join(str(part) for part in scope).encode(), digest_size=8).hexdigest()
+        return f"summary:{kind}:v{prompt_version}:{scope_part}:{fingerprint_messages(messages)}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached summary text, or None on a miss"""
+        try:
+            blob = self.cache.get(key)
+            if blob is None:
+                return None
+            logger.info(f"[SUMMARY_CACHE] Hit {key}")
+            return zlib.decompress(blob).decode()
+        except Exception as e:
+            logger.error(f"[SUMMARY_CACHE] Error reading {key}: {str(e)}")
+            return None
+
+    def set(self, key: str, text: str):
+        """Store summary text compressed, for SUMMARY_CACHE_TTL_SECONDS"""
+        try:
+            self.cache.set(key, zlib.compress(text.encode()), settings.SUMMARY_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.error(f"[SUMMARY_CACHE] Error writing {key}: {str(e)}")
+
+
+summary_cache = SummaryCache()
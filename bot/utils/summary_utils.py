@@ -2,8 +2,7 @@ from django.http import JsonResponse
 import time
 import logging
 import re
-from ..services.slack_service import SlackService
-from ..services.gemini_service import GeminiService
+from ..services.registry import get_slack_service, get_gemini_service
 
 logger = logging.getLogger(__name__)
 
@@ -40,8 +39,8 @@ def handle_summary_command(text, user_name, request_id):
         logger.info(f"[{request_id}] 🔧 Step 2: Initializing services")
         
         try:
-            slack_service = SlackService()
-            gemini_service = GeminiService()
+            slack_service = get_slack_service()
+            gemini_service = get_gemini_service()
             step_duration = (time.time() - step_start) * 1000
             logger.info(f"[{request_id}] ✅ Step 2 completed in {step_duration:.2f}ms")
         except Exception as e:
@@ -177,7 +176,7 @@ def handle_summary_command(text, user_name, request_id):
                      f"💡 Try again for a detailed summary, or check a smaller/less active channel."
         else:
             try:
-                summary = gemini_service.summarize_messages(enriched_messages, channel_name)
+                summary = gemini_service.summarize_messages(enriched_messages, channel_name, channel_id=channel_id)
                 step_duration = (time.time() - step_start) * 1000
                 logger.info(f"[{request_id}] ✅ Step 7 completed in {step_duration:.2f}ms")
             except Exception as e:
@@ -210,9 +209,6 @@ def handle_summary_command(text, user_name, request_id):
 
 def handle_summary_command_background(text, user_name, request_id):
     """Handle summary command in background without timeout protection for full AI processing"""
-    from ..services.slack_service import SlackService
-    from ..services.gemini_service import GeminiService
-    
     start_time = time.time()
     
     try:
@@ -226,8 +222,8 @@ def handle_summary_command_background(text, user_name, request_id):
             })
         
         logger.info(f"[{request_id}] 🔧 Background processing: Initializing services")
-        slack_service = SlackService()
-        gemini_service = GeminiService()
+        slack_service = get_slack_service()
+        gemini_service = get_gemini_service()
         
         logger.info(f"[{request_id}] 🔍 Background processing: Looking up channel ID for: {channel_name}")
         channel_id = slack_service.find_channel_id(channel_name)
@@ -268,7 +264,7 @@ def handle_summary_command_background(text, user_name, request_id):
         logger.info(f"[{request_id}] 🤖 Background processing: Generating AI summary for {len(enriched_messages)} messages")
         
         # NO TIMEOUT PROTECTION HERE - let it run as long as needed
-        summary = gemini_service.summarize_messages(enriched_messages, channel_name)
+        summary = gemini_service.summarize_messages(enriched_messages, channel_name, channel_id=channel_id)
         
         total_elapsed = time.time() - start_time
         logger.info(f"[{request_id}] ✅ Background processing completed in {total_elapsed:.2f}s")
@@ -289,9 +285,6 @@ def handle_summary_command_background(text, user_name, request_id):
 
 def handle_unread_summary_command(text, user_name, user_id, request_id):
     """Handle the /unread command workflow to summarize only unread messages"""
-    from ..services.slack_service import SlackService
-    from ..services.gemini_service import GeminiService
-    
     # Track overall start time for timeout protection
     start_time = time.time()
     step_start = time.time()
@@ -323,8 +316,8 @@ def handle_unread_summary_command(text, user_name, user_id, request_id):
         logger.info(f"[{request_id}] 🔧 Unread Step 2: Initializing services")
         
         try:
-            slack_service = SlackService()
-            gemini_service = GeminiService()
+            slack_service = get_slack_service()
+            gemini_service = get_gemini_service()
             step_duration = (time.time() - step_start) * 1000
             logger.info(f"[{request_id}] ✅ Unread Step 2 completed in {step_duration:.2f}ms")
         except Exception as e:
@@ -453,7 +446,7 @@ def handle_unread_summary_command(text, user_name, user_id, request_id):
                      f"💡 Try again for a detailed unread summary."
         else:
             try:
-                summary = gemini_service.summarize_unread_messages(enriched_messages, channel_name, user_name)
+                summary = gemini_service.summarize_unread_messages(enriched_messages, channel_name, user_name, channel_id=channel_id)
                 step_duration = (time.time() - step_start) * 1000
                 logger.info(f"[{request_id}] ✅ Unread Step 7 completed in {step_duration:.2f}ms")
             except Exception as e:
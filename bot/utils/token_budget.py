@@ -0,0 +1,26 @@
+from typing import Iterable, List
+
+CHARS_PER_TOKEN = 4  # Rough average for English chat text
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for budgeting prompts (no tokenizer round trip)"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def chunk_lines(lines: Iterable[str], budget: int) -> List[List[str]]:
+    """Split lines into consecutive chunks of at most budget estimated tokens, truncating any single oversize line"""
+    max_chars = budget * CHARS_PER_TOKEN
+    chunks, current, current_tokens = [], [], 0
+    for line in lines:
+        if len(line) > max_chars:
+            line = line[:max_chars - 3] + '...'
+        tokens = estimate_tokens(line)
+        if current and current_tokens + tokens > budget:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
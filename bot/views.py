@@ -21,8 +21,7 @@ from .handlers.slack_commands import (
     slack_commands_ultra_fast_handler,
 )
 from .utils.channel_utils import parse_channel_name
-from .services.slack_service import SlackService
-from .services.gemini_service import GeminiService
+from .services.registry import get_slack_service
 from .services.category_service import CategoryService
 from .services.filter_service import FilterService
 from .services.block_kit_service import BlockKitService
@@ -145,7 +144,7 @@ def send_summary_to_slack(channel_id, user_id, command_text):
     # Your existing summary logic here
     summary = handle_summary_command(command_text, user_id, channel_id)
     # Use your SlackService or Slack client to send the summary back
-    SlackService().post_message(channel_id, summary)
+    get_slack_service().post_message(channel_id, summary)
 
 def slack_command_view(request):
     # ...existing code to parse request...
@@ -179,7 +178,7 @@ def handle_block_actions(request):
         category_service = CategoryService()
         filter_service = FilterService()
         block_kit_service = BlockKitService()
-        slack_service = SlackService()
+        slack_service = get_slack_service()
         
         # Get user info
         user_id = payload.get('user', {}).get('id')
@@ -256,12 +255,9 @@ def handle_block_actions(request):
                     categories = category_service.get_user_categories(user_id)
                     category = next((c for c in categories if c['id'] == category_id), None)
                     category_name = category['name'] if category else f"ID {category_id}"
+                    channel_infos = slack_service.channels.get_many(selected_channels)
                     for ch in selected_channels:
-                        try:
-                            channel_info = slack_service.get_channel_info(ch)
-                            channel_name = channel_info.get('name', ch)
-                        except Exception:
-                            channel_name = ch
+                        channel_name = channel_infos.get(ch, {}).get('name', ch)
                         category_service.add_channel_to_category(category_id, ch, channel_name, user_id)
                     slack_service.send_message(
                         channel=user_id,
@@ -594,14 +590,11 @@ def handle_block_actions(request):
             # Open a modal to select channels to remove
             # FIX: Show channel names, not IDs
             category_channels = category_service.get_category_channels(category_id)
-            # Fetch channel names for each channel_id
+            # Resolve all channel names in one directory lookup
+            channel_infos = slack_service.channels.get_many(category_channels)
             channel_options = []
             for ch_id in category_channels:
-                try:
-                    channel_info = slack_service.get_channel_info(ch_id)
-                    channel_name = channel_info.get('name', ch_id)
-                except Exception:
-                    channel_name = ch_id
+                channel_name = channel_infos.get(ch_id, {}).get('name', ch_id)
                 channel_options.append({
                     "text": {"type": "plain_text", "text": f"#{channel_name}", "emoji": True},
                     "value": ch_id
@@ -3,4 +3,7 @@
 
 echo "📦 Running Django migrations..."
 /Library/Frameworks/Python.framework/Versions/3.13/bin/python3 manage.py migrate
-echo "✅ Migrations completed!" 
\ No newline at end of file
+echo "✅ Migrations completed!" 
+echo "👥 Syncing the user and channel directories..."
+/Library/Frameworks/Python.framework/Versions/3.13/bin/python3 manage.py sync_directories
+echo "✅ Directory sync completed!"
@@ -83,9 +83,92 @@ SLACK_BOT_TOKEN = os.getenv('SLACK_BOT_TOKEN')
 SLACK_SIGNING_SECRET = os.getenv('SLACK_SIGNING_SECRET')
 SLACK_APP_TOKEN = os.getenv('SLACK_APP_TOKEN')
 
+# Maximum number of channels fetched in parallel by AsyncSlackService
+SLACK_FETCH_CONCURRENCY = int(os.getenv('SLACK_FETCH_CONCURRENCY', '10'))
+
+# How often the user directory is re-synced from users.list (seconds)
+USER_DIRECTORY_REFRESH_SECONDS = int(os.getenv('USER_DIRECTORY_REFRESH_SECONDS', '21600'))
+
+# How long to wait before retrying a failed directory sync (seconds)
+DIRECTORY_SYNC_RETRY_SECONDS = int(os.getenv('DIRECTORY_SYNC_RETRY_SECONDS', '300'))
+
+# How often the channel directory is re-synced from conversations.list (seconds)
+CHANNEL_DIRECTORY_REFRESH_SECONDS = int(os.getenv('CHANNEL_DIRECTORY_REFRESH_SECONDS', '3600'))
+
+# For channels fed by message events, how long the archive is trusted
+# before conversations_history is polled again to reconcile (seconds)
+ARCHIVE_RECONCILE_SECONDS = int(os.getenv('ARCHIVE_RECONCILE_SECONDS', '900'))
+
+# For channels without message events, how far back archived messages are
+# re-pulled (at most once per ARCHIVE_RECONCILE_SECONDS) so thread parents
+# pick up replies posted after they were archived (hours)
+ARCHIVE_THREAD_REFRESH_HOURS = int(os.getenv('ARCHIVE_THREAD_REFRESH_HOURS', '24'))
+
+# Thread topic search: how far back to look (hours) and the minimum share
+# of topic terms a thread must contain to count as a match
+THREAD_SEARCH_WINDOW_HOURS = int(os.getenv('THREAD_SEARCH_WINDOW_HOURS', '24'))
+THREAD_SEARCH_MIN_COVERAGE = float(os.getenv('THREAD_SEARCH_MIN_COVERAGE', '0.3'))
+
 # Gemini Configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 
+# Model tiers picked by ModelRouter: small for follow-ups and multi-channel parts,
+# large for inputs of at least ROUTER_LARGE_MIN_TOKENS, which it takes in one call
+# without chunking (so keep SUMMARY_MAX_INPUT_TOKENS within its context). Summaries of at most
+# ROUTER_LOCAL_MAX_TOKENS are answered locally, and every tier drops one step
+# while less than ROUTER_LOW_HEADROOM of the Gemini quota is free
+GEMINI_MODEL_SMALL = os.getenv('GEMINI_MODEL_SMALL', 'gemini-1.5-flash-8b')
+GEMINI_MODEL_DEFAULT = os.getenv('GEMINI_MODEL_DEFAULT', 'gemini-1.5-flash')
+GEMINI_MODEL_LARGE = os.getenv('GEMINI_MODEL_LARGE', 'gemini-1.5-pro')
+ROUTER_LOCAL_MAX_TOKENS = int(os.getenv('ROUTER_LOCAL_MAX_TOKENS', '120'))
+ROUTER_LARGE_MIN_TOKENS = int(os.getenv('ROUTER_LARGE_MIN_TOKENS', '30000'))
+ROUTER_LOW_HEADROOM = float(os.getenv('ROUTER_LOW_HEADROOM', '0.2'))
+
+# Messages whose SimHashes differ in at most this many of 64 bits are collapsed into
+# one prompt line with a count and time range (with differing numbers only for bot
+# output and templates an author repeats)
+DEDUPE_MAX_DISTANCE = int(os.getenv('DEDUPE_MAX_DISTANCE', '3'))
+
+# Gemini quota per minute (requests and prompt+response tokens) shared by all
+# workers; GEMINI_QUOTA_MARGIN of it is kept in reserve. Calls queue for up to
+# GEMINI_QUEUE_SECONDS before being shed, with at most GEMINI_MAX_CONCURRENCY in
+# flight per process, and all calls pause GEMINI_QUOTA_COOLDOWN_SECONDS after a 429
+GEMINI_RPM_LIMIT = int(os.getenv('GEMINI_RPM_LIMIT', '60'))
+GEMINI_TPM_LIMIT = int(os.getenv('GEMINI_TPM_LIMIT', '1000000'))
+GEMINI_QUOTA_MARGIN = float(os.getenv('GEMINI_QUOTA_MARGIN', '0.1'))
+GEMINI_QUEUE_SECONDS = int(os.getenv('GEMINI_QUEUE_SECONDS', '20'))
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+GEMINI_QUOTA_COOLDOWN_SECONDS = int(os.getenv('GEMINI_QUOTA_COOLDOWN_SECONDS', '30'))
+
+# Streamed summaries rewrite their Slack message at most once per this many seconds
+SUMMARY_STREAM_UPDATE_SECONDS = float(os.getenv('SUMMARY_STREAM_UPDATE_SECONDS', '1.0'))
+
+# Every Gemini call is cancelled after GEMINI_DEADLINE_SECONDS. With hedging on, a
+# call slower than the recent p95 latency is sent a second time (only while at least
+# GEMINI_HEDGE_MIN_HEADROOM of the quota is free) and the first answer is kept
+GEMINI_DEADLINE_SECONDS = int(os.getenv('GEMINI_DEADLINE_SECONDS', '60'))
+GEMINI_HEDGE_ENABLED = os.getenv('GEMINI_HEDGE_ENABLED', 'True').lower() == 'true'
+GEMINI_HEDGE_MIN_HEADROOM = float(os.getenv('GEMINI_HEDGE_MIN_HEADROOM', '0.25'))
+
+# Conversations above this many estimated tokens are summarized map-reduce
+# style, with up to SUMMARY_MAP_CONCURRENCY chunk calls in flight
+SUMMARY_CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', '6000'))
+SUMMARY_MAP_CONCURRENCY = int(os.getenv('SUMMARY_MAP_CONCURRENCY', '4'))
+
+# Windows above this many estimated tokens are cut down to their most important
+# messages (reactions, replies, mentions, keywords, author diversity) before summarizing
+SUMMARY_MAX_INPUT_TOKENS = int(os.getenv('SUMMARY_MAX_INPUT_TOKENS', '40000'))
+
+# Channel summaries are assembled from per-bucket notes (seconds per bucket);
+# buckets under SUMMARY_SEGMENT_MIN_TOKENS are passed through verbatim
+SUMMARY_SEGMENT_SECONDS = int(os.getenv('SUMMARY_SEGMENT_SECONDS', '3600'))
+SUMMARY_SEGMENT_MIN_TOKENS = int(os.getenv('SUMMARY_SEGMENT_MIN_TOKENS', '400'))
+
+# Multi-channel summaries (/summary all, categories) run up to FANOUT_WORKERS
+# channels at once; a channel taking longer than FANOUT_DEADLINE_SECONDS is reported as failed
+FANOUT_WORKERS = int(os.getenv('FANOUT_WORKERS', '6'))
+FANOUT_DEADLINE_SECONDS = int(os.getenv('FANOUT_DEADLINE_SECONDS', '90'))
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
@@ -128,15 +211,59 @@ LOGGING = {
 CSRF_TRUSTED_ORIGINS = ['https://*.ngrok.io', 'https://*.ngrok-free.app']
 CSRF_EXEMPT_URLS = [r'^slack/.*$']  # Exempt all URLs starting with /slack/
 
-# Cache configuration for Slack API responses
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'slack-bot-cache',
-        'TIMEOUT': 3600,  # 1 hour default timeout
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000,
+# Generated summaries: how long one is reused for an unchanged message set
+# (seconds) and how many are kept before the oldest are evicted
+SUMMARY_CACHE_TTL_SECONDS = int(os.getenv('SUMMARY_CACHE_TTL_SECONDS', '600'))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv('SUMMARY_CACHE_MAX_ENTRIES', '500'))
+
+# Single-flight coalescing of identical summary requests: how long a worker's
+# lock lives, how long others wait on it, and how long its result is shared (seconds)
+SINGLE_FLIGHT_LOCK_SECONDS = int(os.getenv('SINGLE_FLIGHT_LOCK_SECONDS', '120'))
+SINGLE_FLIGHT_WAIT_SECONDS = int(os.getenv('SINGLE_FLIGHT_WAIT_SECONDS', '90'))
+SINGLE_FLIGHT_RESULT_SECONDS = int(os.getenv('SINGLE_FLIGHT_RESULT_SECONDS', '30'))
+
+# Caches. Rate buckets, the Gemini quota governor, single-flight locks and
+# cached summaries all coordinate gunicorn workers through them, so set
+# REDIS_URL in production. Without it each worker process has its own
+# in-memory caches and those limits and caches apply per process.
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'TIMEOUT': 3600,  # 1 hour default timeout
+            'KEY_PREFIX': 'slack-bot',
+        },
+        # Generated summaries, stored zlib-compressed (Redis' maxmemory policy evicts them)
+        'summaries': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'TIMEOUT': SUMMARY_CACHE_TTL_SECONDS,
+            'KEY_PREFIX': 'slack-bot-summaries',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'slack-bot-cache',
+            'TIMEOUT': 3600,  # 1 hour default timeout
+            'OPTIONS': {
+                # Roomy enough that quota and rate counters are not culled with the rest
+                'MAX_ENTRIES': 10000,
+            }
+        },
+        # Generated summaries, stored zlib-compressed and evicted once full
+        'summaries': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'slack-bot-summaries',
+            'TIMEOUT': SUMMARY_CACHE_TTL_SECONDS,
+            'OPTIONS': {
+                'MAX_ENTRIES': SUMMARY_CACHE_MAX_ENTRIES,
+            }
         }
     }
-} 
+ 
 